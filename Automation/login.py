@@ -1,9 +1,8 @@
 # Automation/login.py
-import json
 import time
 import threading
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import (
@@ -13,6 +12,15 @@ from selenium.common.exceptions import (
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from src.utils.command_tracer import CommandTracer
+from src.core.popup_sweeper import PopupSweeper
+from src.core.session_manager import SessionKeeper
+import src.core.selectors as selectors
+from src.core.driver_arbiter import DriverArbiter, CRITICAL, BACKGROUND
+from src.config import POPUP_RULES, RELOGIN_RULE
+from src.utils.booking_store import BookingStore
+from src.utils.time_utils import booking_window_open
+
 # optional OCR module (if present)
 try:
     from Automation.ocr import CaptchaSolver
@@ -25,9 +33,10 @@ class IRCTCLogin:
     Robust, blocking login helper.
     - automation_folder: Path to Automation folder (used to find Form/Saved_Details)
     - gui: gui_status.FloatingGUI instance (optional)
+    - trace_commands: time every WebDriver command, grouped by the issuing thread
     """
 
-    def __init__(self, automation_folder, gui=None, use_gpu=False):
+    def __init__(self, automation_folder, gui=None, use_gpu=False, trace_commands=False):
         self.automation_folder = Path(automation_folder)
         self.gui = gui
         self.driver = None
@@ -35,6 +44,12 @@ class IRCTCLogin:
         self._lock = threading.Lock()
         self.ocr = CaptchaSolver() if CaptchaSolver else None
         self.use_gpu = use_gpu
+        self._store = None  # BookingStore over Form/Saved_Details, opened on first use
+        # Popup closer and re-login watchdog run at background priority so they never delay the login flow.
+        self.arbiter = DriverArbiter()
+        # Same window as the bots, so the keep-alive pauses once booking starts
+        self.session = SessionKeeper(window_open=self._booking_window_open)
+        self.tracer = CommandTracer(state_getter=lambda: threading.current_thread().name) if trace_commands else None
 
     def _log(self, msg):
         stamp = datetime.now().strftime("%H:%M:%S")
@@ -84,16 +99,22 @@ class IRCTCLogin:
         return False
 
     def get_latest_json(self):
-        saved_folder = self.automation_folder.parent / "Form" / "Saved_Details"
-        files = list(saved_folder.glob("*.json"))
-        if not files:
-            return None
-        latest = max(files, key=lambda f: f.stat().st_mtime)
+        if self._store is None:
+            self._store = BookingStore(str(self.automation_folder.parent / "Form" / "Saved_Details"))
         try:
-            return json.loads(latest.read_text(encoding="utf-8"))
+            return self._store.latest()
         except Exception:
             return None
 
+    def _booking_window_open(self):
+        """The Tatkal window of the latest saved booking (see booking_window_open), or None."""
+        data = self.get_latest_json() or {}
+        try:
+            day = datetime.strptime(str(data.get("train", {}).get("date", "")).strip(), "%d%m%Y").date() - timedelta(days=1)
+        except ValueError:
+            day = None
+        return booking_window_open(data.get("preferences", {}), day=day)
+
     def launch_browser(self, brave_path=None, profile_path=None):
         opts = uc.ChromeOptions()
         if brave_path:
@@ -109,104 +130,42 @@ class IRCTCLogin:
             "profile.password_manager_enabled": False
         })
         self.driver = uc.Chrome(options=opts)
+        if self.tracer:
+            self.tracer.install(self.driver)
+        self.arbiter.install(self.driver)
         time.sleep(1)
         self._log("Browser launched")
 
     def _auto_close_popups(self):
         """
-        Runs in background. Closes:
-         - Aadhaar OK popup matching aria-label containing 'Aadhaar'
-         - DISHA close button with id dша-banner-close or img#disha-banner-close
-         - overlay masks (attempts removal)
-         - extension/other overlays
+        Runs in background. Keeps the in-page popup sweeper installed; it closes
+        the Aadhaar popup, the DISHA banner, overlay masks and re-login links as
+        soon as they appear (see src/core/popup_sweeper.py and config.POPUP_RULES).
+        Each tick is a single WebDriver call that re-installs the sweeper after a
+        navigation and reports what it dismissed.
         """
+        sweeper = None
+        self.arbiter.set_thread_priority(BACKGROUND)
         while not self._stop_event.is_set():
             try:
                 if not self.driver:
                     time.sleep(0.2)
                     continue
-
-                # Aadhaar
-                try:
-                    btn = self.driver.find_element(By.XPATH, "//button[contains(@aria-label,'Aadhaar') or contains(.,'Aadhaar')]")
-                    if btn.is_displayed() and btn.is_enabled():
-                        try:
-                            btn.click()
-                        except Exception:
-                            try:
-                                self.driver.execute_script("arguments[0].click();", btn)
-                            except Exception:
-                                pass
-                        self._log("Closed Aadhaar popup")
-                except Exception:
-                    pass
-
-                # DISHA close
-                try:
-                    btn = self.driver.find_element(By.ID, "disha-banner-close")
-                    if btn.is_displayed():
-                        try:
-                            btn.click()
-                        except Exception:
-                            try:
-                                self.driver.execute_script("arguments[0].click();", btn)
-                            except Exception:
-                                pass
-                        self._log("Closed DISHA popup")
-                except Exception:
-                    try:
-                        btn = self.driver.find_element(By.CSS_SELECTOR, "img#disha-banner-close, svg#disha-banner-close")
-                        if btn.is_displayed():
-                            try:
-                                btn.click()
-                            except Exception:
-                                try:
-                                    self.driver.execute_script("arguments[0].click();", btn)
-                                except Exception:
-                                    pass
-                            self._log("Closed DISHA popup")
-                    except Exception:
-                        pass
-
-                # Generic overlay cleanup (best-effort)
-                try:
-                    overlays = self.driver.find_elements(By.CSS_SELECTOR, "div.ui-dialog-mask, div.ui-widget-overlay, .modal-backdrop, div.popup-overlay")
-                    for ov in overlays:
-                        try:
-                            self.driver.execute_script("arguments[0].parentNode.removeChild(arguments[0]);", ov)
-                        except Exception:
-                            pass
-                    if overlays:
-                        self._log("Removed overlays")
-                except Exception:
-                    pass
-
-                # If logged-out link appears, click it to go back to login
-                try:
-                    relinks = self.driver.find_elements(By.XPATH, "//a[contains(.,'Click here to login') or normalize-space(.)='Click Here']")
-                    for r in relinks:
-                        if r.is_displayed():
-                            try:
-                                r.click()
-                                self._log("Clicked re-login link")
-                            except Exception:
-                                try:
-                                    self.driver.execute_script("arguments[0].click();", r)
-                                    self._log("Clicked re-login link (js)")
-                                except Exception:
-                                    pass
-                except Exception:
-                    pass
-
+                if sweeper is None or sweeper.driver is not self.driver:
+                    sweeper = PopupSweeper(self.driver, POPUP_RULES + [RELOGIN_RULE])
+                for action in sweeper.poll(force=True):
+                    self._log(f"Closed {action['rule']} (x{action['count']})")
             except Exception:
                 pass
-            time.sleep(0.25)
+            time.sleep(1)
 
     def _relogin_watchdog(self):
         """
         If logout occurs unexpectedly, attempt to re-enter login flow.
         This thread will attempt the login button to re-initiate.
+        While logged in it keeps the session warm so the logout does not happen.
         """
+        self.arbiter.set_thread_priority(BACKGROUND)
         while not self._stop_event.is_set():
             try:
                 if not self.driver:
@@ -217,7 +176,17 @@ class IRCTCLogin:
                     login_link = self.driver.find_element(By.CSS_SELECTOR, "a.loginText")
                     # if displayed and clickable try clicking (tolerant)
                     if login_link.is_displayed():
+                        message = self.session.on_state("LOGGED_OUT")
+                        if message:
+                            self._log(message)
                         self._click_with_retries(By.CSS_SELECTOR, "a.loginText", timeout=10, retry_interval=0.5)
+                except NoSuchElementException:
+                    # No login link could also mean the page hasn't loaded; only a visible logout link means logged in
+                    logout_links = self.driver.find_elements(By.CSS_SELECTOR, selectors.LOGOUT_BUTTON)
+                    if any(link.is_displayed() for link in logout_links):
+                        self.session.on_state("AT_DASHBOARD")
+                        if self.session.next_action() == 'keepalive':
+                            self.session.keep_alive(self.driver)
                 except Exception:
                     pass
             except Exception:
@@ -238,12 +207,13 @@ class IRCTCLogin:
 
     def login(self, brave_path=None, profile_path=None, max_captcha_attempts=20):
         """Launch browser (if needed), close popups continuously, click login, fill creds, solve captcha."""
+        self.arbiter.set_thread_priority(CRITICAL)
         if not self.driver:
             self.launch_browser(brave_path=brave_path or None, profile_path=profile_path or None)
 
         # start helper threads
-        threading.Thread(target=self._auto_close_popups, daemon=True).start()
-        threading.Thread(target=self._relogin_watchdog, daemon=True).start()
+        threading.Thread(target=self._auto_close_popups, name="popup_closer", daemon=True).start()
+        threading.Thread(target=self._relogin_watchdog, name="relogin_watchdog", daemon=True).start()
 
         # go to train-search
         try:
@@ -368,3 +338,11 @@ class IRCTCLogin:
                 self.driver.quit()
         except Exception:
             pass
+        if self.tracer:
+            try:
+                self.tracer.dump(
+                    report_path=self.automation_folder / "command_latency.txt",
+                    trace_path=self.automation_folder / "command_trace.json"
+                )
+            except Exception:
+                pass
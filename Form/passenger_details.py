@@ -1,5 +1,5 @@
 import streamlit as st
-import json, os
+import json, os, sys
 from datetime import date, datetime, timedelta
 
 # ---------- Styling ----------
@@ -194,17 +194,17 @@ def all_filled():
 SAVE_DIR = "saved_details"
 os.makedirs(SAVE_DIR, exist_ok=True)  # Create folder if not exists
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+@st.cache_resource
+def get_booking_store():
+    from src.utils.booking_store import BookingStore
+    return BookingStore(SAVE_DIR)
+
 def next_available_filename(base_name: str) -> str:
-    name, ext = os.path.splitext(base_name)
-    candidate_path = os.path.join(SAVE_DIR, base_name)
-    if not os.path.exists(candidate_path):
-        return candidate_path
-    i = 1
-    while True:
-        candidate_path = os.path.join(SAVE_DIR, f"{name}_{i}{ext}")
-        if not os.path.exists(candidate_path):
-            return candidate_path
-        i += 1
+    return os.path.join(SAVE_DIR, get_booking_store().next_available_name(base_name))
 
 def make_output_name(dt: date, train_no: str, from_opt: str, to_opt: str) -> str:
     ddmmyy = dt.strftime("%d%m%y")
@@ -236,8 +236,7 @@ if st.button("Save Booking Details"):
             "saved_at": datetime.now().isoformat(timespec="seconds")
         }
         out_path = make_output_name(travel_date, train_no, from_station, to_station)
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        get_booking_store().save(os.path.basename(out_path), data)
         st.success(f"Booking details saved to {out_path}")
         st.json(data)
 
@@ -0,0 +1,53 @@
+import os
+import sys
+import glob
+import argparse
+from datetime import timedelta
+from src.core.batch_runner import BatchRunner, open_progress, load_jobs, load_accounts, DEFAULT_LEAD_MINUTES, DEFAULT_JOB_TIMEOUT
+
+# --- Constants ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SAVE_DIR = os.path.join(BASE_DIR, "saved_details")
+
+def main():
+    """
+    Books several journeys in one morning on a shared fleet of browsers.
+    Progress is streamed to stdout (or --progress-file) as JSON lines; console logs
+    go to stderr and logs/.
+
+        python3 run_batch.py saved_details/ac_job.json saved_details/sl_job.json --browsers 4
+    """
+    parser = argparse.ArgumentParser(description="Run several booking jobs across accounts and browsers.")
+    parser.add_argument("jobs", nargs="*", help="Booking files (default: every saved_details/*.json except config.json)")
+    parser.add_argument("--browsers", type=int, default=2, help="Browsers in the shared fleet")
+    parser.add_argument("--accounts", help="Credentials file used by jobs without their own logins")
+    parser.add_argument("--lead-minutes", type=float, default=DEFAULT_LEAD_MINUTES, help="Start a job's bots this long before its window")
+    parser.add_argument("--job-timeout", type=float, default=DEFAULT_JOB_TIMEOUT, help="Stop a job's bots this many seconds after its window")
+    parser.add_argument("--progress-file", help="Append the JSON progress lines to this file instead of stdout")
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=None, help="Override the jobs' headless setting")
+    args = parser.parse_args()
+
+    paths = args.jobs or sorted(p for p in glob.glob(os.path.join(SAVE_DIR, "*.json")) if os.path.basename(p) != "config.json")
+    progress = open_progress(args.progress_file)
+    jobs = load_jobs(paths, progress)
+    if not jobs:
+        progress.emit('batch_finished', jobs={}, error="no valid jobs")
+        sys.exit(1)
+
+    runner = BatchRunner(
+        jobs,
+        browsers=args.browsers,
+        accounts=load_accounts(args.accounts) if args.accounts else (),
+        lead=timedelta(minutes=args.lead_minutes),
+        job_timeout=args.job_timeout,
+        headless=args.headless,
+        progress=progress
+    )
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        progress.emit('batch_interrupted')
+        sys.exit(130)
+
+if __name__ == "__main__":
+    main()
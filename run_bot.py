@@ -3,6 +3,7 @@ import sys
 import glob
 import json
 from src.core.bot_runner import BotRunner
+from src.core.run_config import RunConfig, ConfigError
 
 # --- Constants ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -29,10 +30,18 @@ def main():
     print(f"[*] Using configuration from: {os.path.basename(config_file)}")
 
     with open(config_file, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+        raw_config = json.load(f)
 
+    # Fail now, before any browser starts, rather than halfway through a booking.
     try:
-        runner = BotRunner(config)
+        config = RunConfig.from_dict(raw_config)
+    except ConfigError as e:
+        print(f"[FATAL] {e}")
+        sys.exit(1)
+
+    try:
+        # config.json is watched while the bots run; safe edits apply without a restart
+        runner = BotRunner(config, config_path=config_file)
         runner.start()
         print("[*] Bot run finished.")
     except Exception as e:
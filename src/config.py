@@ -9,5 +9,51 @@ USE_GPU = False # Defaulting to CPU as requested
 TIMED_BOOKING = True # True for Tatkal/Premium Tatkal, False for General
 IS_AC = True         # True for AC classes (10 AM)
 IS_SL = False        # True for Sleeper classes (11 AM)
+DEFAULT_FIRE_OFFSET_MS = 0 # Fire this many ms after the window opens (negative fires early); `preferences.fire_offset_ms`
 
 DEFAULT_BROWSER_COUNT = 1
+IRCTC_BASE_URL = "https://www.irctc.co.in" # Overridden by `preferences.base_url`, e.g. for the local mock site
+DEFAULT_LAUNCH_CONCURRENCY = 3 # Browsers started at the same time; more causes CPU spikes
+CONFIG_POLL_INTERVAL = 1.0 # Seconds between checks of config.json for changes to apply to running bots
+
+# --- Waitlist Polling ---
+# Used when `preferences.poll_availability` is set (a dict there overrides any of these).
+# Seconds: the gap between refreshes is `load_factor` x the smoothed server response
+# time, kept within [min_interval, max_interval]; failed refreshes back off up to
+# `max_backoff`. Polling gives up after `timeout`.
+DEFAULT_AVAILABILITY_POLLING = {
+    "min_interval": 0.5,
+    "max_interval": 5.0,
+    "load_factor": 2.0,
+    "max_backoff": 30.0,
+    "request_timeout": 10.0,
+    "timeout": 900.0,
+}
+
+# --- Page Load Profile ---
+# Applied by webdriver_factory when `preferences.block_resources` is true.
+# `resource_types` are turned into URL patterns. Network.setBlockedURLs has no
+# exceptions, so keep "image" out of `resource_types` and any captcha host out
+# of `url_patterns`; the login/review captchas are inline data URIs today.
+PAGE_LOAD_STRATEGY = "normal" # "normal", "eager" (DOMContentLoaded) or "none"
+DEFAULT_BLOCKING_PROFILE = {
+    "url_patterns": [
+        "*googlesyndication.com*", "*doubleclick.net*", "*googletagmanager.com*",
+        "*googletagservices.com*", "*google-analytics.com*", "*adservice.google.*",
+        "*facebook.net*", "*hotjar.com*", "*disha*",
+    ],
+    "resource_types": ["font", "media"],
+}
+
+# --- Popup Rules ---
+# Applied in-page by src/core/popup_sweeper.py (see its docstring for the rule format).
+POPUP_RULES = [
+    {"name": "Aadhaar popup", "selector": "button[aria-label*='Aadhaar']", "action": "click"},
+    {"name": "Aadhaar popup", "tag": "button", "text": ["Aadhaar"], "action": "click"},
+    {"name": "DISHA banner", "selector": "#disha-banner-close", "action": "click"},
+    {"name": "overlay", "selector": "div.ui-dialog-mask, div.ui-widget-overlay, .modal-backdrop, div.popup-overlay", "action": "remove"},
+]
+SESSION_KEEPALIVE_INTERVAL = 120 # Seconds between synthetic page activity while logged in and waiting
+SESSION_IDLE_TIMEOUT = 900 # Assumed idle logout; shortened automatically when the site logs out sooner
+
+RELOGIN_RULE = {"name": "re-login link", "tag": "a", "text": ["Click here to login", "Click Here"], "action": "click"}
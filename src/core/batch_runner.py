@@ -0,0 +1,255 @@
+import sys
+import json
+import threading
+import itertools
+from datetime import datetime, timedelta
+
+from src.core.bot import IRCTCBot
+from src.core.browser_pool import BrowserPool
+from src.core.webdriver_factory import driver_kwargs_from_preferences
+from src.core.run_config import RunConfig, Account
+from src.core.result_channel import ResultChannel
+from src.config import IRCTC_BASE_URL, TIMED_BOOKING, DEFAULT_LAUNCH_CONCURRENCY
+
+AC_CLASS_CODES = ("1A", "2A", "3A", "3E", "CC", "EC", "EA", "EV", "VC")
+DEFAULT_LEAD_MINUTES = 10  # Bots for a job start this long before its window, to log in and warm up
+DEFAULT_JOB_TIMEOUT = 900  # Seconds after the window (or the bot's start, if untimed) before its bots are stopped
+
+def with_window_defaults(raw, config):
+    """
+    Fills in the Tatkal window for a job that does not pick one: `timed` from
+    `config.TIMED_BOOKING`, then AC (10:00) for AC classes and the non-AC window
+    (11:00) for every other class (SL, 2S, FC, GN, ...).
+    """
+    prefs = raw.get("preferences", {})
+    if not config.journey or not config.journey.is_tatkal or prefs.get("ac") or prefs.get("sl"):
+        return config
+    prefs = dict(prefs)
+    prefs.setdefault("timed", TIMED_BOOKING)
+    if not prefs["timed"]:
+        return config
+    if config.journey.class_code in AC_CLASS_CODES:
+        prefs["ac"] = True
+    else:
+        prefs["sl"] = True
+    return RunConfig.from_dict(dict(raw, preferences=prefs))
+
+class ProgressStream:
+    """Writes one JSON object per line (`{"ts", "event", ...}`) for whatever is driving the batch."""
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        line = json.dumps({'ts': datetime.now().isoformat(timespec="milliseconds"), 'event': event, **fields}, default=str)
+        with self._lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+def open_progress(path=None):
+    """
+    The batch's progress stream: `path` when given, else the process's stdout.
+    Console output (bot loggers and print calls) is moved to stderr either way,
+    so the stream carries nothing but JSON lines.
+    """
+    out = open(path, "a", encoding="utf-8") if path else sys.stdout
+    sys.stdout = sys.stderr
+    return ProgressStream(out)
+
+class BatchRunner:
+    """
+    Runs several booking jobs on one shared fleet of `browsers` warm browsers.
+
+    Each job contributes one bot per account it may use (its own `logins`, or the
+    shared `accounts` when it has none), up to its `browser_count`. A bot starts
+    `lead` before its job's window and is stopped `job_timeout` seconds after it.
+    An account is only ever logged in on one browser at a time, and a browser
+    goes back to the fleet as soon as its bot stops, so a later window reuses it.
+    When one bot confirms a job, its other bots are cancelled at a safe point and
+    the job's unstarted bots are dropped, freeing those browsers for other jobs.
+    Thread execution only: warm drivers can't be shared across processes.
+    """
+    def __init__(self, jobs, browsers, accounts=(), lead=timedelta(minutes=DEFAULT_LEAD_MINUTES),
+                 job_timeout=DEFAULT_JOB_TIMEOUT, headless=None, progress=None):
+        self.jobs = jobs  # [(name, RunConfig), ...]
+        self.browsers = max(1, browsers)
+        self.accounts = tuple(accounts)
+        self.lead = lead
+        self.job_timeout = job_timeout
+        self.headless = headless
+        self.progress = progress or ProgressStream()
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.pool = None
+        self.launch_slot = None
+        self.tasks = []  # [(start_at, seq, job_name, RunConfig, Account), ...] not yet running
+        self.busy_accounts = set()
+        self.job_remaining = {}
+        self.job_results = {}  # job name -> {instance_id: final state name}
+        self.running = {}  # instance_id -> (job name, IRCTCBot)
+        self.channel = ResultChannel()
+        self.channel.win_listeners.append(self._on_win)
+        self._instance_ids = itertools.count(1)
+        self._cond = threading.Condition()
+
+    def _plan(self):
+        now = datetime.now()
+        seq = itertools.count()
+        for name, config in self.jobs:
+            accounts = [a for a in (config.logins or self.accounts) if a.complete][:config.browser_count]
+            if not accounts:
+                self.progress.emit('job_skipped', job=name, reason="no complete login for this job")
+                continue
+            start_at = max(now, config.window_open - self.lead) if config.window_open else now
+            for account in accounts:
+                self.tasks.append((start_at, next(seq), name, config, account))
+            self.job_remaining[name] = len(accounts)
+            self.job_results[name] = {}
+            self.progress.emit('job_scheduled', job=name, window_open=config.window_open, fire_at=config.fire_at,
+                               start_at=start_at, accounts=[a.username for a in accounts])
+        self.tasks.sort(key=lambda t: (t[0], t[1]))
+
+    def run(self):
+        """
+        Runs every job to completion and returns {job name: summary}, each summary
+        holding the winning bot (if any), its latency and every bot's outcome.
+        """
+        self._plan()
+        if not self.tasks:
+            self.progress.emit('batch_finished', jobs={})
+            return {}
+        prefs = dict(self.tasks[0][3].preferences)
+        if self.headless is not None:
+            prefs["headless"] = self.headless
+        # One launch limit for the pool's warm-up and any bot that has to start its own browser
+        self.launch_slot = threading.BoundedSemaphore(DEFAULT_LAUNCH_CONCURRENCY)
+        self.pool = BrowserPool(
+            size=self.browsers,
+            driver_kwargs=driver_kwargs_from_preferences(prefs),
+            warm_url=prefs.get("base_url", IRCTC_BASE_URL) + "/nget/train-search",
+            launch_slot=self.launch_slot
+        )
+        self.pool.start()
+        self.progress.emit('fleet_starting', browsers=self.browsers, jobs=len(self.job_remaining), bots=len(self.tasks))
+        workers = [threading.Thread(target=self._worker, name=f"fleet-{i}") for i in range(1, self.browsers + 1)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.pool.shutdown()
+        summaries = {name: self.channel.summary(name) for name in self.job_results}
+        self.progress.emit('batch_finished', jobs=summaries)
+        return summaries
+
+    def _next_task(self):
+        """Blocks until a task is due and its account is free; None once all are taken."""
+        with self._cond:
+            while self.tasks:
+                now = datetime.now()
+                for i, task in enumerate(self.tasks):
+                    if task[0] <= now and task[4].username not in self.busy_accounts:
+                        self.busy_accounts.add(task[4].username)
+                        return self.tasks.pop(i)
+                due = [t[0] for t in self.tasks if t[4].username not in self.busy_accounts]
+                wait = min((min(due) - now).total_seconds(), 1.0) if due else 1.0
+                self._cond.wait(max(wait, 0.05))
+            return None
+
+    def _worker(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            self._run_task(task)
+
+    def _run_task(self, task):
+        _, _, name, config, account = task
+        instance_id = next(self._instance_ids)
+        with self._cond:
+            # The job may have been won after this task was taken but before _on_win could see it
+            won = self.channel.winner(name) is not None
+            if won:
+                self.busy_accounts.discard(account.username)
+                self.job_remaining[name] -= 1
+                job_done = self.job_remaining[name] == 0
+                self._cond.notify_all()
+            else:
+                bot = IRCTCBot(config.bot_config(account, self.run_id), instance_id=instance_id,
+                               launch_slot=self.launch_slot, browser_pool=self.pool)
+                bot.state_listeners.append(self._state_listener(name))
+                self.channel.register(name, instance_id, config.fire_at, account.username)
+                self.running[instance_id] = (name, bot)
+        if won:
+            self.progress.emit('bot_dropped', job=name, account=account.username, reason="job already booked")
+            if job_done:
+                self._finish_job(name)
+            return
+        self.progress.emit('bot_started', job=name, instance=instance_id, account=account.username)
+        deadline = (config.window_open or datetime.now()) + timedelta(seconds=self.job_timeout)
+        timer = threading.Timer(max(0, (deadline - datetime.now()).total_seconds()), bot.stop)
+        timer.daemon = True
+        timer.start()
+        try:
+            bot.run()
+        except Exception as e:
+            self.progress.emit('bot_error', job=name, instance=instance_id, error=str(e))
+        finally:
+            timer.cancel()
+        result = (bot.outcome or bot.current_state).name
+        self.channel.finish(name, instance_id, result)
+        self.progress.emit('bot_finished', job=name, instance=instance_id, account=account.username, result=result)
+        with self._cond:
+            self.running.pop(instance_id, None)
+            self.busy_accounts.discard(account.username)
+            self.job_results[name][instance_id] = result
+            self.job_remaining[name] -= 1
+            job_done = self.job_remaining[name] == 0
+            self._cond.notify_all()
+        if job_done:
+            self._finish_job(name)
+
+    def _state_listener(self, name):
+        def listener(instance_id, state):
+            self.progress.emit('state', job=name, instance=instance_id, state=state.name)
+            self.channel.report(name, instance_id, state.name)
+        return listener
+
+    def _on_win(self, name, instance_id, latency_seconds):
+        """Cancels the job's other running bots and drops its bots that have not started."""
+        reason = f"bot {instance_id} already booked job {name}"
+        with self._cond:
+            others = [bot for iid, (job, bot) in self.running.items() if job == name and iid != instance_id]
+            dropped = [t for t in self.tasks if t[2] == name]
+            self.tasks = [t for t in self.tasks if t[2] != name]
+            self.job_remaining[name] -= len(dropped)
+            job_done = self.job_remaining[name] == 0
+            self._cond.notify_all()
+        self.progress.emit('job_won', job=name, instance=instance_id, latency_seconds=latency_seconds,
+                           cancelling=len(others), dropped=len(dropped))
+        for bot in others:
+            bot.request_cancel(reason)
+        if job_done:
+            self._finish_job(name)
+
+    def _finish_job(self, name):
+        summary = self.channel.summary(name)
+        self.progress.emit('job_finished', job=name, booked=summary['booked'], winner=summary['winner'], results=summary['outcomes'])
+
+def load_jobs(paths, progress):
+    """Validates each booking file; invalid ones are reported on `progress` and left out."""
+    jobs = []
+    for path in paths:
+        name = path.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            config = with_window_defaults(raw, RunConfig.from_dict(raw))
+        except Exception as e:
+            progress.emit('job_invalid', job=name, path=path, error=str(e))
+            continue
+        jobs.append((name, config))
+    return jobs
+
+def load_accounts(path):
+    """Shared accounts from a `[{"username", "password"}, ...]` file such as saved_logins/user_credentials.json."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [Account(str(l.get("username", "")).strip(), str(l.get("password", ""))) for l in json.load(f)]
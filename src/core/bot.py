@@ -2,10 +2,10 @@ import time
 import os
 import re
 import json
-import random
 import threading
-from datetime import datetime
+from datetime import datetime, timedelta
 from collections import deque
+from contextlib import nullcontext
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,31 +13,119 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
 
-from src.core.webdriver_factory import create_webdriver
+from src.core.webdriver_factory import create_webdriver, driver_kwargs_from_preferences
 from src.utils.logger import setup_logger
 from src.utils.time_utils import wait_until
+from src.utils.state_timing import StateTimeline
+from src.utils.run_recorder import RunRecorder
+from src.utils.command_tracer import CommandTracer
 from src.core.ocr_solver import solve_captcha
 from src.core.state import BotState
 import src.core.selectors as selectors
+from src.core.form_filler import fill_passenger_form, ensure_passenger_rows, read_passenger_form, verify_passenger_form, SET_VALUE_SCRIPT
+from src.core.master_list import register_master_passengers, select_master_passengers
+from src.core.input_strategies import TypingConfig, type_text
+from src.config import IRCTC_BASE_URL, POPUP_RULES
+from src.core.popup_sweeper import PopupSweeper
+from src.core.train_list import snapshot_train_list, select_and_book, is_bookable, refresh_availability, AvailabilityPoller
+from src.core.session_manager import SessionKeeper
+from src.core.run_config import RunConfig
+from src.core.driver_arbiter import DriverArbiter, CRITICAL, BACKGROUND
+
+# A bot in one of these is mid-payment; a cancel waits until it leaves them
+PAYMENT_IN_FLIGHT_STATES = (
+    BotState.PROCEEDING_TO_PAYMENT, BotState.PAYMENT_PAGE, BotState.SELECTING_PAYMENT_METHOD,
+    BotState.INITIATING_PAYMENT, BotState.WAITING_FOR_UPI_MANDATE
+)
+FINAL_STATES = (BotState.BOOKING_CONFIRMED, BotState.BOOKING_FAILED, BotState.CANCELLED, BotState.FATAL_ERROR, BotState.STOPPED)
+
+def detect_page_state(is_visible):
+    """
+    Maps what is visible on the page to a BotState, or None if no known page matches.
+    `is_visible(by, selector)` is a predicate over the current page; the live bot passes
+    its driver-backed check and the offline replay tool passes one over a saved snapshot.
+    """
+    # Determine state by checking for unique elements on each page
+    if is_visible(By.CSS_SELECTOR, selectors.USERNAME_INPUT):
+        return BotState.LOGIN_STARTED
+    if is_visible(By.CSS_SELECTOR, selectors.PASSENGER_NAME_INPUT):
+        return BotState.PASSENGER_DETAILS_PAGE
+    if is_visible(By.CSS_SELECTOR, selectors.TRAIN_LIST_ITEM):
+        return BotState.TRAIN_LIST_PAGE
+    if is_visible(By.CSS_SELECTOR, selectors.LOGOUT_BUTTON):
+        return BotState.AT_DASHBOARD
+    if is_visible(By.XPATH, selectors.LOGIN_BUTTON_HOME):
+        return BotState.LOGGED_OUT
+    # Add other page checks here in future
+    return None
 
 class IRCTCBot:
     """
     An intelligent, state-driven bot for booking tickets on IRCTC,
     built on a resilient Supervisor/Worker model.
     """
-    def __init__(self, bot_config, instance_id=0):
+    def __init__(self, bot_config, instance_id=0, launch_slot=None, browser_pool=None):
         self.bot_config = bot_config
+        # Validated once up front; the hot paths read attributes instead of nested dicts
+        self.config = bot_config.get('run_config') or RunConfig.from_dict(bot_config, strict=False)
+        self.prefs = self.config.preferences
+        self.fire_at = self.config.fire_at
+        self.base_url = self.prefs.get('base_url', IRCTC_BASE_URL)
+        self.train_search_url = self.base_url + "/nget/train-search"
+        self.master_list_ready = False
+        self.popup_sweeper = None
+        self.launch_slot = launch_slot  # Optional semaphore bounding concurrent browser launches
+        self.browser_pool = browser_pool  # Optional BrowserPool handing out pre-warmed drivers
+        self.pool_slot = None  # Pool slot of the driver, which goes back to the pool on stop
+        self._threads = []
         self.account = bot_config.get('account', {})
         self.instance_id = instance_id
         self.logger = setup_logger(self.instance_id)
         self.driver = None
         self.stop_event = threading.Event()
-        self.state_lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.cancel_reason = None
+        self._stop_lock = threading.Lock()
+        self._stopped = False
+        self.outcome = None  # Last state before STOPPED, e.g. BOOKING_CONFIRMED or CANCELLED
+        self.state_lock = threading.RLock()
         self._current_state = BotState.INITIALIZED
         self.last_processed_state = None
         self.action_log = deque(maxlen=30)
+        self.state_listeners = []
+        self.ready_listeners = []
+        self.driver_startup_seconds = None
+        self.timeline = StateTimeline(
+            instance_id,
+            run_id=bot_config.get('run_id'),
+            window_open=self.config.window_open
+        )
+        self.state_listeners.append(lambda iid, state: self.timeline.enter(state.name))
+        self.session = SessionKeeper.from_preferences(self.prefs, self.config.window_open)
+        self.state_listeners.append(self._on_session_state)
+        self.typing = TypingConfig.from_preferences(self.prefs)
+        self.typing_timings = {}  # (field, strategy) -> [seconds, ...]
+        self.recorder = None
+        if self.prefs.get('record_run', False):
+            self.recorder = RunRecorder(os.path.join('logs', f"run_{bot_config.get('run_id', 'adhoc')}_bot_{instance_id}.zip"))
+            self.state_listeners.append(self._record_state_snapshot)
+        self.arbiter = DriverArbiter() if self.prefs.get('driver_arbiter', True) else None
+        self.tracer = None
+        if self.prefs.get('trace_commands', False):
+            self.tracer = CommandTracer(state_getter=lambda: self.current_state.name, process_id=instance_id)
         self._log_action(f"Bot initialized for user: {self.account.get('username')}")
 
+    def apply_config(self, config, changes):
+        """Takes a reloaded RunConfig (safe fields only, see RunConfig.reload) without restarting."""
+        with self.state_lock:
+            if config.passengers != self.config.passengers:
+                # Registered master-list names may no longer match; type them instead
+                self.master_list_ready = False
+            self.config = config
+            self.prefs = config.preferences
+            self.fire_at = config.fire_at
+        self._log_action(f"Config reloaded: {', '.join(changes)}")
+
     @property
     def current_state(self):
         with self.state_lock:
@@ -46,81 +134,236 @@ class IRCTCBot:
     @current_state.setter
     def current_state(self, new_state):
         with self.state_lock:
-            if self._current_state != new_state:
-                self._current_state = new_state
-                self._log_action(f"State changed to: {new_state.name}", is_state_change=True)
+            if self._current_state == new_state:
+                return
+            self._current_state = new_state
+            self._log_action(f"State changed to: {new_state.name}", is_state_change=True)
+        for listener in self.state_listeners:
+            try:
+                listener(self.instance_id, new_state)
+            except Exception as e:
+                self.logger.warning(f"State listener failed: {e}")
 
     def run(self):
         self.current_state = BotState.STARTING
         try:
-            prefs = self.bot_config.get("preferences", {})
-            self.driver = create_webdriver(self.instance_id, is_headless=prefs.get("headless", False))
+            self.driver = self._launch_driver()
             if not self.driver:
                 self.current_state = BotState.FATAL_ERROR
                 return
+            if self.tracer:
+                self.tracer.install(self.driver)
+            if self.arbiter:
+                self.arbiter.install(self.driver)
 
             # The Supervisor thread is the only place that changes the bot's state
-            supervisor_thread = threading.Thread(target=self._supervisor_loop, daemon=True)
+            supervisor_thread = threading.Thread(target=self._supervisor_loop, name="supervisor", daemon=True)
             # The Worker thread only reads the state and acts
-            worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+            worker_thread = threading.Thread(target=self._worker_loop, name="worker", daemon=True)
+
+            # Keeps the logged-in session warm until the booking window
+            session_thread = threading.Thread(target=self._session_keeper_loop, name="session_keeper", daemon=True)
 
-            supervisor_thread.start()
-            worker_thread.start()
+            self._threads = [supervisor_thread, worker_thread, session_thread]
+            for thread in self._threads:
+                thread.start()
 
-            self.driver.get("https://www.irctc.co.in/nget/train-search")
+            if not self._is_prewarmed():
+                self.driver.get(self.train_search_url)
             # The supervisor will take over from here to set the first real state
 
             while not self.stop_event.is_set():
-                if self.current_state in [BotState.BOOKING_CONFIRMED, BotState.FATAL_ERROR, BotState.STOPPED]:
+                state = self.current_state
+                if state in FINAL_STATES:
                     break
-                time.sleep(1)
+                if self.cancel_event.is_set():
+                    if state not in PAYMENT_IN_FLIGHT_STATES:
+                        self._log_action(f"Cancelled at {state.name}: {self.cancel_reason}")
+                        self.current_state = BotState.CANCELLED
+                        break
+                    time.sleep(0.2)  # Never abandon a payment in flight; cancel once it settles
+                else:
+                    self.cancel_event.wait(1)
         except Exception as e:
             self.logger.error(f"A fatal error occurred: {e}", exc_info=True)
             self.current_state = BotState.FATAL_ERROR
         finally:
             self.stop()
 
+    def _launch_driver(self):
+        """
+        Takes a warm driver from the browser pool if there is one, otherwise creates
+        a WebDriver inside the shared launch slot. Reports how long it took.
+        """
+        start = time.monotonic()
+        driver = None
+        if self.browser_pool:
+            slot_id, driver = self.browser_pool.acquire(timeout=120)
+            if driver:
+                self.pool_slot = slot_id
+                self._log_action(f"Took pre-warmed browser {slot_id} from pool")
+        if not driver:
+            if self.launch_slot: self.launch_slot.acquire()
+            try:
+                driver = create_webdriver(self.instance_id, **driver_kwargs_from_preferences(self.prefs))
+            finally:
+                if self.launch_slot: self.launch_slot.release()
+        self.driver_startup_seconds = time.monotonic() - start
+        if driver:
+            self._log_action(f"Browser ready in {self.driver_startup_seconds:.2f}s")
+            for listener in self.ready_listeners:
+                try:
+                    listener(self.instance_id, self.driver_startup_seconds)
+                except Exception as e:
+                    self.logger.warning(f"Ready listener failed: {e}")
+        return driver
+
+    def _is_prewarmed(self):
+        try:
+            return "/nget/" in self.driver.current_url
+        except Exception:
+            return False
+
+    def request_cancel(self, reason):
+        """Asks the bot to stop at the next safe point (not while a payment is in flight)."""
+        self.cancel_reason = reason
+        self.cancel_event.set()
+
     def stop(self):
         self._log_action("Stopping bot...")
         self.stop_event.set()
-        if self.driver:
+        if self.outcome is None:
+            self.outcome = self.current_state
+        # stop() runs again from run()'s finally after an external stop; report the run only once
+        with self._stop_lock:
+            driver, self.driver = self.driver, None
+            first_stop, self._stopped = not self._stopped, True
+        if driver and self.pool_slot is not None:
+            # Let our threads finish their current command before the browser is reused
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join(timeout=5)
+            busy = [t.name for t in self._threads if t is not threading.current_thread() and t.is_alive()]
+            if busy:
+                # A thread still inside a handler could act on the next bot's page; don't recycle
+                self._log_action(f"Threads still running ({', '.join(busy)}); quitting the browser instead of returning it to the pool", is_error=True)
+                self.browser_pool.discard(driver)
+            else:
+                self.browser_pool.release(self.pool_slot, driver)
+        elif driver:
             try:
-                self.driver.quit()
+                driver.quit()
             except Exception: pass
         self.current_state = BotState.STOPPED
+        if not first_stop:
+            return
+        self._record_state_timings()
+        self._report_typing_timings()
+        self._dump_command_trace()
+        if self.arbiter:
+            self.logger.info(f"Driver queueing delay: {self.arbiter.report()}")
+        if self.recorder:
+            self.recorder.close()
+
+    def _record_state_snapshot(self, instance_id, state):
+        html = url = None
+        if self.driver and not self.stop_event.is_set():
+            try:
+                html, url = self.driver.page_source, self.driver.current_url
+            except Exception: pass
+        self.recorder.record_state(state.name, html, url)
+
+    def _record_state_timings(self):
+        self.timeline.close()
+        try:
+            self.timeline.append_to_history()
+            summary = self.timeline.summary()
+            self.logger.info(f"Time in each state (s): { {k: round(v, 3) for k, v in summary['time_in_state'].items()} }")
+            if summary['time_to_login'] is not None:
+                self.logger.info(f"Time to login: {summary['time_to_login']:.2f}s")
+        except Exception as e:
+            self.logger.warning(f"Could not record state timings: {e}")
+
+    def _report_typing_timings(self):
+        if not self.typing_timings:
+            return
+        report = {f"{field}/{strategy}": f"{len(times)}x, avg {sum(times) / len(times) * 1000:.0f} ms"
+                  for (field, strategy), times in sorted(self.typing_timings.items())}
+        self.logger.info(f"Typing time per field/strategy: {report}")
+
+    def _dump_command_trace(self):
+        if not self.tracer:
+            return
+        try:
+            self.tracer.dump(
+                report_path=os.path.join('logs', f'bot_{self.instance_id}_commands.txt'),
+                trace_path=os.path.join('logs', f'bot_{self.instance_id}_trace.json')
+            )
+            self.logger.info(f"WebDriver command latency by state:\n{self.tracer.report()}")
+        except Exception as e:
+            self.logger.warning(f"Could not write command trace: {e}")
+
+    def _critical_section(self):
+        return self.arbiter.critical_section() if self.arbiter else nullcontext()
+
+    def _span(self, name, selector=None):
+        return self.tracer.span(name, selector) if self.tracer else nullcontext()
 
     def _supervisor_loop(self):
+        if self.arbiter: self.arbiter.set_thread_priority(BACKGROUND)
         while not self.stop_event.is_set():
             try:
                 if not self.driver: time.sleep(0.1); continue
                 self._close_popups()
-                # Determine state by checking for unique elements on each page
-                if self._is_visible(By.CSS_SELECTOR, selectors.USERNAME_INPUT):
-                    self.current_state = BotState.LOGIN_STARTED
-                elif self._is_visible(By.CSS_SELECTOR, selectors.LOGOUT_BUTTON):
-                    self.current_state = BotState.AT_DASHBOARD
-                elif self._is_visible(By.XPATH, selectors.LOGIN_BUTTON_HOME):
-                    self.current_state = BotState.LOGGED_OUT
-                # Add other page checks here in future
+                state = detect_page_state(self._is_visible)
+                if state:
+                    self.current_state = state
             except Exception as e:
                 if not isinstance(e, (StaleElementReferenceException, NoSuchElementException, TimeoutException)):
                     self.logger.warning(f"Supervisor loop exception: {e}")
             time.sleep(0.2)
 
+    def _on_session_state(self, instance_id, state):
+        message = self.session.on_state(state.name)
+        if message:
+            self._log_action(message)
+
+    def _session_keeper_loop(self):
+        if self.arbiter: self.arbiter.set_thread_priority(BACKGROUND)
+        while not self.stop_event.wait(1):
+            try:
+                action = self.session.next_action()
+                if action == 'keepalive':
+                    self.session.keep_alive(self.driver)
+                elif action == 'relogin':
+                    self._log_action(f"Session is {self.session.age():.0f}s old and would expire inside the window; logging in again now")
+                    self.driver.find_element(By.CSS_SELECTOR, selectors.LOGOUT_BUTTON).click()
+            except Exception as e:
+                if not isinstance(e, (StaleElementReferenceException, NoSuchElementException, TimeoutException)):
+                    self.logger.warning(f"Session keeper exception: {e}")
+
     def _worker_loop(self):
         state_handlers = {
             BotState.LOGGED_OUT: self._handle_open_login_modal,
             BotState.LOGIN_STARTED: self._handle_login_flow,
+            BotState.AT_DASHBOARD: self._handle_dashboard_flow,
+            BotState.TRAIN_LIST_PAGE: self._handle_train_selection_flow,
+            BotState.PASSENGER_DETAILS_PAGE: self._handle_passenger_details_flow,
             # Add other state handlers here
         }
+        if self.arbiter: self.arbiter.set_thread_priority(CRITICAL)
         while not self.stop_event.is_set():
             state = self.current_state
+            if self.cancel_event.is_set() and state not in PAYMENT_IN_FLIGHT_STATES:
+                time.sleep(0.1)  # Safe point: start nothing new, run() will stop the bot
+                continue
             if state != self.last_processed_state:
                 handler = state_handlers.get(state)
                 if handler:
                     try:
                         self._log_action(f"Worker acting on new state: {state.name}")
-                        handler()
+                        with self._critical_section():
+                            handler()
                         self.last_processed_state = state
                     except Exception as e:
                         self._log_action(f"ERROR in {state.name}: {e}", is_error=True)
@@ -132,6 +375,9 @@ class IRCTCBot:
 
     def _log_action(self, message, is_state_change=False, is_error=False):
         log_entry = { 'timestamp': datetime.now().isoformat(), 'message': message, 'is_state_change': is_state_change, 'is_error': is_error, 'state': self.current_state.name }
+        session = getattr(self, 'session', None)
+        if session and session.logged_in:
+            log_entry['session_age'] = round(session.age())
         self.action_log.append(log_entry)
         if is_error: self.logger.error(message)
         else: self.logger.info(message)
@@ -143,7 +389,8 @@ class IRCTCBot:
 
     def _wait_for_element(self, by, value, timeout=10, condition=EC.element_to_be_clickable):
         try:
-            return WebDriverWait(self.driver, timeout).until(condition((by, value)))
+            with self._span("WebDriverWait", value):
+                return WebDriverWait(self.driver, timeout).until(condition((by, value)))
         except TimeoutException:
             self._log_action(f"TIMEOUT waiting for element: {value}", is_error=True)
             return None
@@ -153,7 +400,8 @@ class IRCTCBot:
         try:
             element = self._wait_for_element(by, value, timeout=timeout)
             if not element: return False
-            ActionChains(self.driver).move_to_element(element).pause(0.1).click().perform()
+            with self._span("ActionChains.click", value):
+                ActionChains(self.driver).move_to_element(element).pause(0.1).click().perform()
             self._log_action(f"Successfully clicked: {value}")
             return True
         except Exception as e:
@@ -166,31 +414,30 @@ class IRCTCBot:
                 self._log_action(f"JS click also failed for {value}. Error: {js_e}", is_error=True)
                 return False
 
-    def _human_type(self, by, value, text: str):
+    def _type(self, field, by, value, text: str):
+        """Types into `field` with the strategy configured for it (see input_strategies)."""
         element = self._wait_for_element(by, value, timeout=10)
         if not element: raise TimeoutException(f"Could not find element {value} to type into.")
-        ActionChains(self.driver).move_to_element(element).pause(0.1).click().perform()
-        element.clear()
-        for char in text:
-            element.send_keys(char)
-            time.sleep(random.uniform(0.005, 0.01))
+        strategy = self.typing.strategy_for(field, self.current_state.name)
+        start = time.monotonic()
+        with self._span(f"type:{strategy}", value):
+            type_text(self.driver, element, text, strategy, self.typing.chunk_size)
+        seconds = time.monotonic() - start
+        self.typing_timings.setdefault((field, strategy), []).append(seconds)
+        self._log_action(f"Typed {field} ({strategy}) in {seconds * 1000:.0f} ms")
 
     def _is_visible(self, by, value, timeout=0.1):
         try:
-            WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located((by, value)))
+            with self._span("is_visible", value):
+                WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located((by, value)))
             return True
         except Exception: return False
 
     def _close_popups(self):
-        popups = [(By.CSS_SELECTOR, "button.btn-primary[aria-label*='Aadhaar authenticated users']")]
-        for by, selector in popups:
-            try:
-                elements = self.driver.find_elements(by, selector)
-                for element in elements:
-                    if element.is_displayed() and element.is_enabled():
-                        element.click()
-                        self._log_action(f"Closed popup: {selector}")
-            except Exception: continue
+        if not self.popup_sweeper or self.popup_sweeper.driver is not self.driver:
+            self.popup_sweeper = PopupSweeper(self.driver, self.prefs.get('popup_rules', POPUP_RULES))
+        for action in self.popup_sweeper.poll():
+            self._log_action(f"Closed popup: {action['rule']} (x{action['count']})")
 
     def _handle_open_login_modal(self):
         self._click_with_retries(By.XPATH, selectors.LOGIN_BUTTON_HOME)
@@ -200,37 +447,203 @@ class IRCTCBot:
             try:
                 captcha_img = self._wait_for_element(By.CSS_SELECTOR, selectors.CAPTCHA_IMAGE_LOGIN, 10, EC.presence_of_element_located)
                 if captcha_img:
-                    result_container['solved_text'] = solve_captcha(captcha_img.get_attribute("src"), logger=self.logger)
+                    src = captcha_img.get_attribute("src")
+                    start = time.monotonic()
+                    result_container['solved_text'] = solve_captcha(src, logger=self.logger)
+                    if self.recorder:
+                        result_container['captcha_seq'] = self.recorder.record_captcha(src, result_container['solved_text'], time.monotonic() - start)
             except Exception as e:
                 self._log_action(f"Captcha solver thread failed: {e}", is_error=True)
 
         for attempt in range(1, 6):
             self._log_action(f"Login attempt {attempt}/5")
-            captcha_result = {'solved_text': None}
-            captcha_thread = threading.Thread(target=solve_captcha_in_background, args=(captcha_result,))
+            captcha_result = {'solved_text': None, 'captcha_seq': None}
+            captcha_thread = threading.Thread(target=solve_captcha_in_background, args=(captcha_result,), name="captcha")
             captcha_thread.start()
-            self._human_type(By.CSS_SELECTOR, selectors.USERNAME_INPUT, self.account["username"])
-            self._human_type(By.CSS_SELECTOR, selectors.PASSWORD_INPUT, self.account["password"])
+            self._type("username", By.CSS_SELECTOR, selectors.USERNAME_INPUT, self.account["username"])
+            self._type("password", By.CSS_SELECTOR, selectors.PASSWORD_INPUT, self.account["password"])
             captcha_thread.join(timeout=20)
             solved_text = captcha_result.get('solved_text')
             if not solved_text:
                 self._log_action("Captcha solving failed. Retrying.", is_error=True)
                 self._click_with_retries(By.CSS_SELECTOR, selectors.CAPTCHA_REFRESH_BUTTON, timeout=5)
                 continue
-            self._human_type(By.CSS_SELECTOR, selectors.CAPTCHA_INPUT_LOGIN, solved_text)
+            self._type("captcha", By.CSS_SELECTOR, selectors.CAPTCHA_INPUT_LOGIN, solved_text)
             self._click_with_retries(By.CSS_SELECTOR, selectors.SIGN_IN_BUTTON_MODAL)
             if self._wait_for_element(By.CSS_SELECTOR, selectors.LOGOUT_BUTTON, timeout=2, condition=EC.visibility_of_element_located):
                 self._log_action("Login successful!")
+                if self.recorder: self.recorder.record_login_outcome(captcha_result['captcha_seq'], True)
                 return
             error_element = self._wait_for_element(By.XPATH, "//div[contains(@class, 'loginError')]", 1, EC.visibility_of_element_located)
-            if error_element: self._log_action(f"Login failed: {error_element.text}", is_error=True)
+            error_text = error_element.text if error_element else ""
+            if error_element: self._log_action(f"Login failed: {error_text}", is_error=True)
+            if self.recorder: self.recorder.record_login_outcome(captcha_result['captcha_seq'], False, error_text)
             self._click_with_retries(By.CSS_SELECTOR, selectors.CAPTCHA_REFRESH_BUTTON, timeout=5)
         self._log_action("All login attempts failed.", is_error=True)
         self.current_state = BotState.LOGIN_FAILED
         # In a real scenario, you'd add handlers for these states
-    def _handle_dashboard_flow(self): self._log_action("TODO: Implement dashboard handling"); time.sleep(5)
-    def _handle_train_selection_flow(self): self._log_action("TODO: Implement train selection"); time.sleep(5)
-    def _handle_passenger_details_flow(self): self._log_action("TODO: Implement passenger details"); time.sleep(5)
+    def _handle_passenger_details_flow(self):
+        passengers = self.config.passenger_dicts
+        mobile = self.config.phone
+        if not passengers:
+            self._log_action("No passengers configured.", is_error=True)
+            return
+        start = time.monotonic()
+        if self.master_list_ready and self._select_from_master_list(passengers, mobile):
+            self._log_action(f"Selected {len(passengers)} passenger(s) from master list in {time.monotonic() - start:.2f}s")
+            self._click_with_retries(By.CSS_SELECTOR, selectors.SUBMIT_PASSENGER_DETAILS_BUTTON)
+            return
+        problems, seconds = fill_passenger_form(self.driver, passengers, mobile)
+        if problems:
+            raise RuntimeError(f"Passenger form did not verify: {'; '.join(problems)}")
+        self._log_action(f"Filled {len(passengers)} passenger(s) in {seconds:.2f}s")
+        self._click_with_retries(By.CSS_SELECTOR, selectors.SUBMIT_PASSENGER_DETAILS_BUTTON)
+
+    def _select_from_master_list(self, passengers, mobile):
+        """Picks pre-registered passengers via autocomplete. Returns False if the form did not verify."""
+        ensure_passenger_rows(self.driver, len(passengers))
+        picked = select_master_passengers(self.driver, passengers)
+        if mobile:
+            mobile_input = self._wait_for_element(By.CSS_SELECTOR, selectors.PASSENGER_MOBILE_INPUT, 2, EC.presence_of_element_located)
+            if mobile_input: self.driver.execute_script(SET_VALUE_SCRIPT, mobile_input, mobile)
+        problems = verify_passenger_form(read_passenger_form(self.driver, len(passengers)), passengers, mobile)
+        if problems or not all(picked):
+            self._log_action(f"Master list selection incomplete, filling form instead: {'; '.join(problems)}", is_error=True)
+            return False
+        return True
+
+    def _in_pre_window_idle(self, margin_seconds=120):
+        window_open = self.config.window_open
+        return window_open is None or datetime.now() < window_open - timedelta(seconds=margin_seconds)
+
+    def _handle_dashboard_flow(self):
+        if self.prefs.get('use_master_list', False) and not self.master_list_ready and self._in_pre_window_idle():
+            passengers = self.config.passenger_dicts
+            try:
+                registered = register_master_passengers(self.driver, self.base_url, passengers)
+                self.master_list_ready = len(registered) == len(passengers)
+                self._log_action(f"Master list has {len(registered)}/{len(passengers)} passenger(s)")
+            except Exception as e:
+                self._log_action(f"Could not pre-register passengers: {e}", is_error=True)
+            self.driver.get(self.train_search_url)
+            return
+        if "/nget/train-search" not in (self.driver.current_url or ""):
+            self._log_action("Logged in; opening the train search page")
+            self.driver.get(self.train_search_url)
+        else:
+            self._log_action("Logged in on the train search page")
+    def _handle_train_selection_flow(self):
+        journey = self.config.journey
+        if not journey:
+            self._log_action("No train configured.", is_error=True)
+            return
+        if not self._wait_for_fire_time():
+            return
+        start = time.monotonic()
+        train, cls = self._read_train_class(journey, start)
+        confirm_only = self.prefs.get('confirm_only', False)
+        if self.prefs.get('poll_availability') and not is_bookable(cls['availability'], confirm_only):
+            booked = self._poll_until_bookable(journey, confirm_only)
+            if booked is None:
+                return
+            if booked:
+                self._log_action(f"Clicked Book Now for {journey.train_no} {journey.class_code} in {time.monotonic() - start:.2f}s")
+                return
+            # Polling gave up; the list may have been re-rendered since the snapshot
+            train, cls = self._read_train_class(journey, time.monotonic())
+        if confirm_only and not is_bookable(cls['availability'], confirmed_only=True):
+            if cls['availability']:
+                self._log_action(f"{journey.class_code} is '{cls['availability']}', not bookable with confirm_only; not booking.", is_error=True)
+                return
+            # The status has not loaded yet: select the class and only book if its answer is a confirmed berth
+            with self._span("train_list.refresh_availability", journey.class_selector):
+                result = refresh_availability(self.driver, journey.train_no, journey.class_code, confirmed_only=True)
+            if not result['booked']:
+                self._log_action(f"{journey.class_code} is '{result['availability'] or '?'}'"
+                                 f"{' (' + result['error'] + ')' if result['error'] else ''}, not bookable with confirm_only; not booking.", is_error=True)
+                return
+            self._log_action(f"Clicked Book Now for {journey.train_no} {journey.class_code} in {time.monotonic() - start:.2f}s")
+            return
+        with self._span("train_list.select_and_book", journey.class_selector):
+            booked = select_and_book(self.driver, cls['cell'], train['book'])
+        if not booked:
+            raise RuntimeError("Book Now did not become clickable")
+        self._log_action(f"Clicked Book Now for {journey.train_no} {journey.class_code} in {time.monotonic() - start:.2f}s")
+
+    def _wait_for_fire_time(self):
+        """
+        Holds the first booking action until `fire_at` (window open + fire_offset_ms),
+        re-reading it so a reloaded offset applies. Background threads may use the
+        driver meanwhile. Returns False if the bot is stopped or cancelled first.
+        """
+        if self.fire_at and datetime.now() < self.fire_at:
+            self._log_action(f"Waiting to fire at {self.fire_at.strftime('%H:%M:%S.%f')[:-3]}")
+        while self.fire_at and datetime.now() < self.fire_at:
+            if self.stop_event.is_set() or self.cancel_event.is_set():
+                return False
+            remaining = (self.fire_at - datetime.now()).total_seconds()
+            if remaining <= 0.05:
+                wait_until(self.fire_at)  # Spin the last few ms for precision
+                break
+            with self.arbiter.outside_critical_section() if self.arbiter else nullcontext():
+                self.stop_event.wait(min(remaining - 0.05, 0.5))
+        return not (self.stop_event.is_set() or self.cancel_event.is_set())
+
+    def _read_train_class(self, journey, start):
+        """Snapshots the list (switching to Tatkal first if needed) and returns the configured (train, class) entries."""
+        with self._span("train_list.snapshot"):
+            snapshot = snapshot_train_list(self.driver)
+        if journey.is_tatkal and snapshot.get('tatkal') and not snapshot.get('tatkal_selected'):
+            # Switching quota re-renders the list, so the handles are taken again afterwards
+            self.driver.execute_script("arguments[0].click();", snapshot['tatkal'])
+            with self._span("train_list.snapshot"):
+                snapshot = snapshot_train_list(self.driver)
+        trains = snapshot['trains']
+        train = trains.get(journey.train_no)
+        if not train:
+            raise RuntimeError(f"Train {journey.train_no} is not in the list ({', '.join(sorted(trains)) or 'empty'})")
+        cls = train['classes'].get(journey.class_code)
+        if not cls:
+            raise RuntimeError(f"Train {journey.train_no} has no {journey.class_code} class ({', '.join(sorted(train['classes']))})")
+        self._log_action(f"Parsed {len(trains)} train(s) in {time.monotonic() - start:.2f}s; "
+                         f"{journey.train_no} {journey.class_code}: {cls['availability'] or '?'} {cls['fare']}")
+        return train, cls
+
+    def _poll_until_bookable(self, journey, confirmed_only=False):
+        """
+        Refreshes the class's availability in the page until it turns bookable (a
+        confirmed berth with `confirmed_only`), which books it in the same call. Returns True once Book Now is clicked, False when
+        polling times out or is switched off, and None if the bot is stopped or
+        cancelled or the page moves on. Background threads may use the driver
+        between refreshes.
+        """
+        poller = AvailabilityPoller.from_preferences(self.prefs)
+        deadline = time.monotonic() + poller.timeout
+        last = None
+        self._log_action(f"Polling {journey.train_no} {journey.class_code} availability until it turns bookable")
+        while time.monotonic() < deadline and self.prefs.get('poll_availability'):
+            if self.stop_event.is_set() or self.cancel_event.is_set() or self.current_state != BotState.TRAIN_LIST_PAGE:
+                return None
+            with self._span("train_list.refresh_availability", journey.class_selector):
+                result = refresh_availability(self.driver, journey.train_no, journey.class_code, poller.request_timeout,
+                                              confirmed_only=confirmed_only)
+            poller.record(result['elapsed_ms'] / 1000, not result['error'])
+            delay = poller.next_delay()
+            if result['booked']:
+                self._log_action(f"{journey.class_code} turned '{result['availability']}' after {poller.polls} refresh(es); booking")
+                return True
+            if result['error']:
+                self._log_action(f"Availability refresh failed ({poller.errors} in a row, retrying in {delay:.1f}s): {result['error']}", is_error=True)
+            elif result['availability'] != last:
+                self._log_action(f"{journey.class_code} availability: {result['availability'] or '?'} "
+                                 f"(server {result['elapsed_ms']} ms, next refresh in {delay:.1f}s)")
+                last = result['availability']
+            with self.arbiter.outside_critical_section() if self.arbiter else nullcontext():
+                if self.stop_event.wait(delay):
+                    return None
+        self._log_action(f"Stopped polling {journey.class_code} after {poller.polls} refresh(es); still '{last or '?'}'", is_error=True)
+        return False
+
     def _handle_review_flow(self): self._log_action("TODO: Implement review handling"); time.sleep(5)
     def _handle_payment_flow(self): self._log_action("TODO: Implement payment"); time.sleep(5)
     def _handle_wait_for_payment(self): self._log_action("TODO: Implement payment wait"); time.sleep(5)
@@ -1,82 +1,399 @@
 import threading
+import multiprocessing
+import os
+import json
+import queue
 import time
+from datetime import datetime
 from src.core.bot import IRCTCBot
+from src.core.browser_pool import BrowserPool
+from src.core.webdriver_factory import driver_kwargs_from_preferences
+from src.core.state import BotState
+from src.core.run_config import RunConfig, ConfigError, EXECUTION_MODES
+from src.core.result_channel import ResultChannel
+from src.config import DEFAULT_LAUNCH_CONCURRENCY, IRCTC_BASE_URL, CONFIG_POLL_INTERVAL
+from src.utils.state_timing import load_history, funnel_report
+
+def _run_bot_process(bot_config, instance_id, control_queue, stop_event, launch_slot=None, update_queue=None):
+    """
+    Entry point of a bot running in its own process (process execution mode).
+    State changes, browser readiness and the final result are reported on
+    `control_queue`; setting `stop_event` from the runner stops the bot.
+    Runner messages arrive on `update_queue`: ('config', RunConfig, applied changes)
+    for a reloaded config and ('cancel', reason) when another bot has booked.
+    """
+    bot = IRCTCBot(bot_config=bot_config, instance_id=instance_id, launch_slot=launch_slot)
+    bot.state_listeners.append(lambda iid, state: control_queue.put(('state', iid, state.name)))
+    bot.ready_listeners.append(lambda iid, seconds: control_queue.put(('ready', iid, seconds)))
+
+    def watch_stop():
+        stop_event.wait()
+        bot.stop()
+    threading.Thread(target=watch_stop, daemon=True).start()
+
+    def watch_updates():
+        while True:
+            message = update_queue.get()
+            if message[0] == 'config':
+                bot.apply_config(message[1], message[2])
+            elif message[0] == 'cancel':
+                bot.request_cancel(message[1])
+    if update_queue is not None:
+        threading.Thread(target=watch_updates, daemon=True).start()
+
+    try:
+        bot.run()
+    except Exception as e:
+        control_queue.put(('error', instance_id, str(e)))
+    finally:
+        control_queue.put(('finished', instance_id, (bot.outcome or bot.current_state).name))
 
 class BotRunner:
     """
     Manages the creation and execution of multiple IRCTCBot instances,
-    each in its own thread.
+    each in its own thread or, with `preferences.execution_mode = "process"`,
+    in its own process.
     """
-    def __init__(self, config):
+    def __init__(self, config, config_path=None):
         """
         Initializes the BotRunner with the booking configuration.
 
         Args:
-            config (dict): The configuration dictionary loaded from the JSON file.
+            config (RunConfig | dict): The validated run configuration, or the raw
+                dictionary loaded from the JSON file (validated here; raises ConfigError).
+            config_path (str): Optional file the config came from. It is watched while
+                the bots run and safe changes are applied without restarting them.
         """
-        self.config = config
+        self.config = config if isinstance(config, RunConfig) else RunConfig.from_dict(config)
+        self.config_path = config_path
         self.threads = []
+        self.bots = {}
+        self.processes = {}
+        self.stop_events = {}
+        self.control_queue = None
+        self.statuses = {}
+        self.results = {}
+        self.startup_times = {}
+        self.launch_started_at = None
+        self.browser_pool = None
+        self.update_queues = {}
+        self.launched_ids = set()
+        self.launched_accounts = {}  # username -> instance_id of the bot using it in this run
+        self.mode = None
+        self._launch_slot = None
+        self._launch_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # All bots of a run book the same journey; the first confirmation cancels the rest
+        self.channel = ResultChannel()
+        self.channel.win_listeners.append(self._on_win)
+
+    def _build_bot_config(self, credentials):
+        return self.config.bot_config(credentials, self.run_id)
 
-    def _run_bot_instance(self, credentials, instance_id):
+    def _run_bot_instance(self, credentials, instance_id, launch_slot=None, browser_pool=None):
         """
         The target function for each bot thread. Instantiates and runs a single bot.
         """
-        print(f"[BotRunner] Starting bot instance {instance_id} for user '{credentials.get('username', 'N/A')}'.")
+        print(f"[BotRunner] Starting bot instance {instance_id} for user '{credentials.username or 'N/A'}'.")
         try:
-            # The new bot just needs its own config and instance id
-            bot_config = {
-                'account': credentials,
-                'train': self.config.get('train', {}),
-                'passengers': self.config.get('passengers', []),
-                'preferences': self.config.get('preferences', {})
-            }
             bot = IRCTCBot(
-                bot_config=bot_config,
-                instance_id=instance_id
+                bot_config=self._build_bot_config(credentials),
+                instance_id=instance_id,
+                launch_slot=launch_slot,
+                browser_pool=browser_pool
             )
+            bot.state_listeners.append(self._on_state_change)
+            bot.ready_listeners.append(self._on_ready)
+            self.bots[instance_id] = bot
+            if self.channel.winner(self.run_id):
+                bot.request_cancel("journey already booked")
             bot.run()
+            self.results[instance_id] = (bot.outcome or bot.current_state).name
         except Exception as e:
             print(f"[BotRunner] Thread for Bot {instance_id} crashed: {e}")
+            self.results[instance_id] = BotState.FATAL_ERROR.name
 
-    def start(self):
-        """
-        Starts the bot instances based on the configuration.
-        """
-        preferences = self.config.get("preferences", {})
-        logins = self.config.get("logins", [])
+    def _on_state_change(self, instance_id, state):
+        self.statuses[instance_id] = state.name
+        self.channel.report(self.run_id, instance_id, state.name)
+
+    def _on_win(self, job, instance_id, latency_seconds):
+        print(f"[BotRunner] Bot {instance_id} confirmed the booking {latency_seconds:.2f}s after firing; cancelling the others.")
+        reason = f"bot {instance_id} already booked this journey"
+        for iid, bot in list(self.bots.items()):
+            if iid != instance_id:
+                bot.request_cancel(reason)
+        for iid, update_queue in self.update_queues.items():
+            if iid != instance_id:
+                update_queue.put(('cancel', reason))
+
+    def _on_ready(self, instance_id, startup_seconds):
+        self.startup_times[instance_id] = startup_seconds
+        since_launch = time.monotonic() - self.launch_started_at
+        print(f"[BotRunner] Bot {instance_id} browser ready: started in {startup_seconds:.2f}s, "
+              f"{since_launch:.2f}s after launch ({len(self.startup_times)} ready).")
+
+    def _launch_concurrency(self, num_instances):
+        limit = self.config.preferences.get("launch_concurrency", DEFAULT_LAUNCH_CONCURRENCY)
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = DEFAULT_LAUNCH_CONCURRENCY
+        return max(1, min(limit, num_instances))
 
-        browser_count = preferences.get("browser_count", 1)
+    def _instances_to_launch(self):
+        """Returns (instance_id, credentials) pairs for the bots that should be started."""
+        logins = self.config.logins
+        browser_count = self.config.browser_count
 
         if not logins:
             print("[BotRunner] Error: No login credentials found in the configuration file.")
-            return
+            return []
 
         # Determine the number of bots to launch
         num_to_launch = min(browser_count, len(logins))
 
         if num_to_launch == 0:
             print("[BotRunner] No bots to launch. Check browser count and credentials.")
-            return
-
-        print(f"[BotRunner] Launching {num_to_launch} bot instance(s).")
+            return []
 
+        instances, usernames = [], set()
         for i in range(num_to_launch):
             credentials = logins[i]
-            if not credentials.get("username") or not credentials.get("password"):
+            if not credentials.complete:
                 print(f"[BotRunner] Skipping instance {i+1} due to missing username or password.")
                 continue
+            if credentials.username in usernames:
+                print(f"[BotRunner] Skipping instance {i+1}: '{credentials.username}' is already used by another bot.")
+                continue
+            usernames.add(credentials.username)
+            instances.append((i + 1, credentials))
+        return instances
+
+    def start(self):
+        """
+        Starts the bot instances based on the configuration.
+        """
+        instances = self._instances_to_launch()
+        if not instances:
+            return
+
+        mode = self.mode = self.config.execution_mode
+
+        concurrency = self._launch_concurrency(len(instances))
+        print(f"[BotRunner] Launching {len(instances)} bot instance(s) in {mode} mode, "
+              f"up to {concurrency} browser(s) starting at once.")
+        self.launch_started_at = time.monotonic()
+
+        if self.config_path:
+            threading.Thread(target=self._watch_config, name="config_watcher", daemon=True).start()
+        if mode == "process":
+            self._start_processes(instances, concurrency)
+        else:
+            self._start_threads(instances, concurrency)
 
-            thread = threading.Thread(
-                target=self._run_bot_instance,
-                args=(credentials, i + 1)
+        print("[BotRunner] All bot instances have finished their execution.")
+        self._report_state_timings()
+        return self._report_result()
+
+    def _report_result(self):
+        """Prints and saves which bot booked (if any), its latency, and every bot's outcome."""
+        for instance_id, outcome in self.results.items():
+            self.channel.finish(self.run_id, instance_id, outcome)
+        result = self.channel.summary(self.run_id)
+        if result['winner']:
+            winner = result['winner']
+            print(f"[BotRunner] Booked by bot {winner['instance_id']} ('{winner['account']}') in {winner['latency_seconds']:.2f}s.")
+        else:
+            print("[BotRunner] No bot confirmed a booking.")
+        try:
+            with open(os.path.join('logs', f'run_result_{self.run_id}.json'), 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, default=str)
+        except Exception as e:
+            print(f"[BotRunner] Could not write run result: {e}")
+        return result
+
+    def _report_state_timings(self):
+        """Prints this run's state timings aggregated across bots and saves them to logs/."""
+        report = funnel_report(load_history(run_id=self.run_id))
+        print(f"[BotRunner] {report}")
+        try:
+            with open(os.path.join('logs', f'funnel_report_{self.run_id}.txt'), 'w', encoding='utf-8') as f:
+                f.write(report)
+        except Exception as e:
+            print(f"[BotRunner] Could not write funnel report: {e}")
+
+    def _start_threads(self, instances, concurrency):
+        # All threads start at once; the semaphore bounds how many create a browser concurrently.
+        launch_slot = self._launch_slot = threading.BoundedSemaphore(concurrency)
+        preferences = self.config.preferences
+        if preferences.get("prewarm_browsers", False):
+            self.browser_pool = BrowserPool(
+                size=len(instances),
+                driver_kwargs=driver_kwargs_from_preferences(preferences),
+                warm_url=preferences.get("base_url", IRCTC_BASE_URL) + "/nget/train-search",
+                launch_concurrency=concurrency,
+                launch_slot=launch_slot
             )
-            self.threads.append(thread)
-            thread.start()
-            time.sleep(2) # Stagger browser launches slightly
+            self.browser_pool.start()
+        with self._launch_lock:
+            for instance_id, credentials in instances:
+                self._launch_thread(instance_id, credentials, self.browser_pool)
 
-        # Wait for all threads to complete
+        # Wait for all threads to complete, including any added by a config reload
         print("[BotRunner] All bot threads have been started. Waiting for them to complete.")
-        for thread in self.threads:
+        joined = 0
+        while True:
+            with self._launch_lock:
+                if joined == len(self.threads):
+                    self._watch_stop.set()
+                    break
+                thread = self.threads[joined]
             thread.join()
+            joined += 1
+        if self.browser_pool:
+            self.browser_pool.shutdown()
 
-        print("[BotRunner] All bot instances have finished their execution.")
+    def _launch_thread(self, instance_id, credentials, browser_pool=None):
+        self.launched_ids.add(instance_id)
+        self.launched_accounts[credentials.username] = instance_id
+        self.channel.register(self.run_id, instance_id, self.config.fire_at, credentials.username)
+        thread = threading.Thread(
+            target=self._run_bot_instance,
+            args=(credentials, instance_id, self._launch_slot, browser_pool)
+        )
+        self.threads.append(thread)
+        thread.start()
+
+    def _start_processes(self, instances, concurrency):
+        # 'spawn' gives every bot a clean interpreter (no inherited driver/OCR state).
+        # A WebDriver can't be handed across processes, so `prewarm_browsers` only applies in thread mode.
+        ctx = self._ctx = multiprocessing.get_context("spawn")
+        self.control_queue = ctx.Queue()
+        self._launch_slot = ctx.BoundedSemaphore(concurrency)
+
+        with self._launch_lock:
+            for instance_id, credentials in instances:
+                self._launch_process(instance_id, credentials)
+
+        print("[BotRunner] All bot processes have been started. Waiting for them to complete.")
+        self._drain_control_queue()
+
+    def _launch_process(self, instance_id, credentials):
+        print(f"[BotRunner] Starting bot process {instance_id} for user '{credentials.username or 'N/A'}'.")
+        self.launched_ids.add(instance_id)
+        self.launched_accounts[credentials.username] = instance_id
+        self.channel.register(self.run_id, instance_id, self.config.fire_at, credentials.username)
+        stop_event = self._ctx.Event()
+        update_queue = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_run_bot_process,
+            args=(self._build_bot_config(credentials), instance_id, self.control_queue, stop_event, self._launch_slot, update_queue),
+            daemon=True
+        )
+        self.stop_events[instance_id] = stop_event
+        self.update_queues[instance_id] = update_queue
+        self.processes[instance_id] = process
+        process.start()
+
+    def _drain_control_queue(self):
+        """Consumes status/result messages until every bot process has exited."""
+        while True:
+            try:
+                kind, instance_id, payload = self.control_queue.get(timeout=0.5)
+            except queue.Empty:
+                with self._launch_lock:
+                    if not any(p.is_alive() for p in self.processes.values()):
+                        self._watch_stop.set()
+                        break
+                continue
+            if kind == 'state':
+                self.statuses[instance_id] = payload
+                self.channel.report(self.run_id, instance_id, payload)
+            elif kind == 'ready':
+                self._on_ready(instance_id, payload)
+            elif kind == 'error':
+                print(f"[BotRunner] Process for Bot {instance_id} crashed: {payload}")
+            elif kind == 'finished':
+                self.results[instance_id] = payload
+
+        for instance_id, process in self.processes.items():
+            process.join()
+            if instance_id not in self.results:
+                print(f"[BotRunner] Process for Bot {instance_id} exited with code {process.exitcode}.")
+                self.results[instance_id] = BotState.FATAL_ERROR.name
+
+    def _watch_config(self):
+        """Polls the config file's mtime and applies safe changes to the running bots."""
+        try:
+            last_mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            last_mtime = None
+        while not self._watch_stop.wait(CONFIG_POLL_INTERVAL):
+            try:
+                mtime = os.path.getmtime(self.config_path)
+            except OSError:
+                continue
+            if mtime == last_mtime:
+                continue
+            try:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+            except (OSError, ValueError):
+                continue  # Half-written; try again on the next poll
+            last_mtime = mtime
+            try:
+                self.reload_config(RunConfig.from_dict(raw))
+            except ConfigError as e:
+                print(f"[BotRunner] Ignoring config change: {e}")
+
+    def reload_config(self, new_config):
+        """
+        Applies the safe parts of `new_config` (see RunConfig.reload) to every running bot
+        and starts extra bots when the browser count went up.
+        """
+        with self._launch_lock:
+            if self._watch_stop.is_set():
+                return
+            old_count = self.config.browser_count
+            self.config, applied, ignored = self.config.reload(new_config)
+            if ignored:
+                print(f"[BotRunner] Config changes that need a restart were ignored: {', '.join(ignored)}")
+            if not applied:
+                return
+            print(f"[BotRunner] Applying config changes to running bots: {', '.join(applied)}")
+            for bot in list(self.bots.values()):
+                bot.apply_config(self.config, applied)
+            for update_queue in self.update_queues.values():
+                update_queue.put(('config', self.config, applied))
+            if self.config.browser_count > old_count:
+                self._launch_additional_bots()
+
+    def _launch_additional_bots(self):
+        """
+        Starts bots for logins not yet in use until `browser_count` bots have been
+        started. Logins are matched by username, not position, so reordering or
+        editing the list never puts a second bot on a busy account. Caller holds
+        _launch_lock.
+        """
+        for credentials in self.config.logins:
+            if len(self.launched_accounts) >= self.config.browser_count:
+                break
+            if not credentials.complete or credentials.username in self.launched_accounts:
+                continue
+            instance_id = max(self.launched_ids, default=0) + 1
+            print(f"[BotRunner] Browser count raised; adding bot instance {instance_id} for '{credentials.username}'.")
+            if self.mode == "process":
+                self._launch_process(instance_id, credentials)
+            else:
+                self._launch_thread(instance_id, credentials)
+
+    def stop(self, instance_id=None):
+        """Stops one bot (or all of them when `instance_id` is None), in either mode."""
+        targets = [instance_id] if instance_id is not None else list(set(self.bots) | set(self.stop_events))
+        for iid in targets:
+            if iid in self.stop_events:
+                self.stop_events[iid].set()
+            elif iid in self.bots:
+                self.bots[iid].stop()
@@ -0,0 +1,157 @@
+import time
+import threading
+from urllib.parse import urlsplit
+from src.core.webdriver_factory import create_webdriver
+
+IRCTC_HOME_URL = "https://www.irctc.co.in/nget/train-search"
+# The IRCTC app keeps its login state in web storage as well as cookies
+CLEAR_STORAGE_SCRIPT = "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {} return location.origin;"
+
+class BrowserPool:
+    """
+    Starts Chrome instances ahead of time, pre-navigates them to the IRCTC
+    train-search page so its assets are cached, keeps idle ones warm with a
+    cheap in-page script, and hands a ready driver to each bot on demand.
+    """
+    def __init__(self, size, driver_kwargs=None, launch_concurrency=3, warm_url=IRCTC_HOME_URL, keepalive_interval=60, launch_slot=None):
+        self.size = size
+        self.driver_kwargs = driver_kwargs or {}
+        self.warm_url = warm_url
+        self._warm_origin = "{0.scheme}://{0.netloc}".format(urlsplit(warm_url))
+        self.keepalive_interval = keepalive_interval
+        # Pass the runner's semaphore as `launch_slot` so pool and bot launches share one limit
+        self._launch_slot = launch_slot or threading.BoundedSemaphore(max(1, launch_concurrency))
+        self._idle = []  # (slot_id, driver) tuples that are warm and not handed out
+        self._pending = 0
+        self._checking = 0  # Idle drivers taken out briefly by the keep-alive check
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._all_drivers = []
+
+    def start(self):
+        """Begins warming `size` browsers in the background and returns immediately."""
+        with self._cond:
+            self._pending = self.size
+        for slot_id in range(1, self.size + 1):
+            threading.Thread(target=self._warm_one, args=(slot_id,), daemon=True).start()
+        threading.Thread(target=self._keepalive_loop, daemon=True).start()
+
+    def _warm_one(self, slot_id):
+        driver = None
+        try:
+            with self._launch_slot:
+                start = time.monotonic()
+                # Own profile namespace, so a bot's fallback create_webdriver(instance_id) never shares it
+                driver = create_webdriver(f"pool-{slot_id}", **self.driver_kwargs)
+                if driver:
+                    driver.get(self.warm_url)
+            if driver:
+                print(f"[BrowserPool] Browser {slot_id} warm in {time.monotonic() - start:.2f}s.")
+        except Exception as e:
+            print(f"[BrowserPool] Could not warm browser {slot_id}: {e}")
+        with self._cond:
+            self._pending -= 1
+            if driver:
+                self._all_drivers.append(driver)
+                self._idle.append((slot_id, driver))
+            self._cond.notify_all()
+
+    def acquire(self, timeout=None):
+        """
+        Returns `(slot_id, driver)` for a warm browser, waiting for one that is
+        still starting. Returns `(None, None)` if none can be provided in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._idle:
+                if (self._pending == 0 and self._checking == 0) or self._stop_event.is_set():
+                    return None, None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None, None
+                self._cond.wait(remaining)
+            return self._idle.pop(0)
+
+    def release(self, slot_id, driver):
+        """
+        Returns a driver a bot has finished with, so the next bot (possibly on another
+        account or job) gets a warm browser with no trace of the previous session:
+        cookies, local and session storage are cleared and any per-bot `execute`
+        wrappers (arbiter, tracer) are dropped. Broken drivers, and any driver
+        released after shutdown(), are quit.
+        """
+        if self._stop_event.is_set():
+            self.discard(driver)
+            return
+        try:
+            self._reset(driver)
+        except Exception as e:
+            print(f"[BrowserPool] Browser {slot_id} could not be reset, quitting it: {e}")
+            self.discard(driver)
+            return
+        with self._cond:
+            if not self._stop_event.is_set():
+                self._idle.append((slot_id, driver))
+                self._cond.notify_all()
+                return
+        self.discard(driver)  # shutdown() ran while the browser was being reset
+
+    def _reset(self, driver):
+        driver.__dict__.pop("execute", None)
+        if driver.execute_script(CLEAR_STORAGE_SCRIPT) != self._warm_origin:
+            # sessionStorage belongs to the tab and origin, so it can only be cleared from the site's own page
+            driver.get(self.warm_url)
+            driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": self._warm_origin, "storageTypes": "all"})
+        except AttributeError:  # Not a Chromium driver
+            driver.delete_all_cookies()
+        driver.get(self.warm_url)
+
+    def discard(self, driver):
+        """Quits a driver that must not go back to the pool."""
+        try:
+            driver.quit()
+        except Exception: pass
+        with self._cond:
+            if driver in self._all_drivers:
+                self._all_drivers.remove(driver)
+            self._cond.notify_all()
+
+    def _keepalive_loop(self):
+        while not self._stop_event.wait(self.keepalive_interval):
+            with self._cond:
+                idle = list(self._idle)
+            for entry in idle:
+                # Take the driver out while it is checked so the lock isn't held across a WebDriver call
+                with self._cond:
+                    if entry not in self._idle:
+                        continue
+                    self._idle.remove(entry)
+                    self._checking += 1
+                slot_id, driver = entry
+                try:
+                    driver.execute_script("return document.readyState;")
+                    alive = True
+                except Exception as e:
+                    print(f"[BrowserPool] Browser {slot_id} went stale, dropping it: {e}")
+                    alive = False
+                with self._cond:
+                    self._checking -= 1
+                    if alive and not self._stop_event.is_set():
+                        self._idle.append(entry)
+                    self._cond.notify_all()
+                if not alive:
+                    self.discard(driver)
+
+    def shutdown(self):
+        """Quits every browser the pool started, including ones handed out."""
+        self._stop_event.set()
+        with self._cond:
+            drivers, self._all_drivers, self._idle = self._all_drivers, [], []
+            self._cond.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception: pass
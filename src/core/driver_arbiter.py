@@ -0,0 +1,194 @@
+"""
+Per-driver command scheduling.
+
+chromedriver runs one command at a time, so when a background thread (popup
+poll, state probe, re-login watchdog) and the booking thread both talk to the
+same driver, the booking click can end up queued behind a probe.
+`DriverArbiter` wraps `driver.execute` so that:
+
+  * only one command is in flight at a time and, when the driver frees up, the
+    waiting command with the highest priority (CRITICAL < NORMAL < BACKGROUND)
+    goes next;
+  * while a thread is inside `critical_section()`, BACKGROUND commands are held
+    back (for at most `max_background_defer` seconds) so they can't slip in
+    between two booking commands;
+  * identical read-only BACKGROUND commands issued within `coalesce_window`
+    seconds, or while one is already in flight, share a single round trip;
+  * the queueing delay of every command is measured per priority.
+
+Each thread declares its priority once with `set_thread_priority()`; threads
+that don't default to NORMAL.
+"""
+import json
+import time
+import heapq
+import itertools
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+CRITICAL, NORMAL, BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = {CRITICAL: "critical", NORMAL: "normal", BACKGROUND: "background"}
+
+COALESCIBLE_COMMANDS = {
+    "findElement", "findElements", "isElementDisplayed", "isElementEnabled",
+    "getElementText", "getElementAttribute", "getElementProperty", "getCurrentUrl", "getTitle",
+}
+
+class _Pending:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class DriverArbiter:
+    def __init__(self, coalesce_window=0.1, max_background_defer=0.5):
+        self.coalesce_window = coalesce_window
+        self.max_background_defer = max_background_defer
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._critical_sections = 0
+        self._in_flight = {}  # coalescing key -> _Pending
+        self._recent = {}  # coalescing key -> (finished_at, result)
+        self._waits = defaultdict(lambda: [0, 0.0, 0.0])  # priority -> [count, total, max]
+
+    def set_thread_priority(self, priority):
+        self._local.priority = priority
+
+    def _priority(self):
+        return getattr(self._local, 'priority', NORMAL)
+
+    @contextmanager
+    def critical_section(self):
+        """Holds BACKGROUND commands back while a multi-command booking action runs."""
+        self._local.critical_depth = getattr(self._local, 'critical_depth', 0) + 1
+        with self._cond:
+            self._critical_sections += 1
+        try:
+            yield
+        finally:
+            self._local.critical_depth -= 1
+            self._leave_critical_section()
+
+    @contextmanager
+    def outside_critical_section(self):
+        """
+        Lets BACKGROUND commands through again while a critical section sleeps between
+        actions. Only the calling thread's own critical section is released; outside
+        one this does nothing.
+        """
+        if not getattr(self._local, 'critical_depth', 0):
+            yield
+            return
+        self._local.critical_depth -= 1
+        self._leave_critical_section()
+        try:
+            yield
+        finally:
+            self._local.critical_depth += 1
+            with self._cond:
+                self._critical_sections += 1
+
+    def _leave_critical_section(self):
+        with self._cond:
+            # An unbalanced exit would make the arbiter think no section is active while one is
+            assert self._critical_sections > 0, "critical section exited more often than entered"
+            self._critical_sections = max(0, self._critical_sections - 1)
+            self._cond.notify_all()
+
+    def install(self, driver):
+        original_execute = driver.execute
+        def arbitrated_execute(driver_command, params=None):
+            return self._execute(original_execute, driver_command, params)
+        driver.execute = arbitrated_execute
+        return driver
+
+    def _coalesce_key(self, driver_command, params):
+        if driver_command not in COALESCIBLE_COMMANDS:
+            return None
+        try:
+            return driver_command + json.dumps(params, sort_keys=True, default=str)
+        except Exception:
+            return None
+
+    def _execute(self, original_execute, driver_command, params):
+        priority = self._priority()
+        key = self._coalesce_key(driver_command, params) if priority == BACKGROUND else None
+        if key is None:
+            return self._run(original_execute, driver_command, params, priority)
+
+        with self._cond:
+            recent = self._recent.get(key)
+            if recent and time.monotonic() - recent[0] <= self.coalesce_window:
+                return recent[1]
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[key] = _Pending()
+        if not owner:
+            pending.done.wait()
+            if pending.error:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = self._run(original_execute, driver_command, params, priority)
+            with self._cond:
+                self._recent[key] = (time.monotonic(), pending.result)
+                if len(self._recent) > 256:
+                    self._recent.clear()
+            return pending.result
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._cond:
+                self._in_flight.pop(key, None)
+            pending.done.set()
+
+    def _run(self, original_execute, driver_command, params, priority):
+        queued_at = time.monotonic()
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            while not self._may_run(entry, queued_at):
+                self._cond.wait(0.05)
+            heapq.heappop(self._waiting)
+            self._busy = True
+            self._record_wait(priority, time.monotonic() - queued_at)
+        try:
+            return original_execute(driver_command, params)
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _may_run(self, entry, queued_at):
+        if self._busy or self._waiting[0] != entry:
+            return False
+        if entry[0] == BACKGROUND and self._critical_sections:
+            return time.monotonic() - queued_at >= self.max_background_defer
+        return True
+
+    def _record_wait(self, priority, seconds):
+        stat = self._waits[priority]
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] = max(stat[2], seconds)
+
+    def queue_stats(self):
+        """Returns {priority name: {'count', 'avg_ms', 'max_ms'}} of time spent waiting for the driver."""
+        with self._cond:
+            return {
+                PRIORITY_NAMES[p]: {'count': c, 'avg_ms': t * 1000 / c, 'max_ms': m * 1000}
+                for p, (c, t, m) in self._waits.items() if c
+            }
+
+    def report(self):
+        return ", ".join(
+            f"{name}: n={v['count']} avg={v['avg_ms']:.1f} ms max={v['max_ms']:.1f} ms"
+            for name, v in self.queue_stats().items()
+        ) or "no commands"
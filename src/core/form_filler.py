@@ -0,0 +1,175 @@
+"""
+Bulk form filling through `execute_script`.
+
+Instead of typing every character with `send_keys`, the passenger page is
+filled in a couple of in-page script calls: one to add passenger rows, one
+to set every field (dispatching the input/change/blur events Angular's
+reactive forms listen for) and read the values back for verification.
+"""
+import time
+import src.core.selectors as selectors
+
+# Shared helpers injected ahead of each script.
+_JS_HELPERS = r"""
+function setValue(el, value) {
+    var proto = el.tagName === 'SELECT' ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    ['input', 'change', 'blur'].forEach(function (type) {
+        el.dispatchEvent(new Event(type, {bubbles: true}));
+    });
+}
+function visible(el) { return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length); }
+function norm(text) { return (text || '').replace(/\s+/g, ' ').trim().toLowerCase(); }
+function selectIn(dd) { return dd.tagName === 'SELECT' ? dd : dd.querySelector('select'); }
+function dropdownLabel(dd) {
+    var select = selectIn(dd);
+    if (select) return select.options[select.selectedIndex] ? select.options[select.selectedIndex].text.trim() : '';
+    var label = dd.querySelector('label, .p-dropdown-label, .ui-dropdown-label');
+    return label ? label.textContent.trim() : dd.textContent.trim();
+}
+function chooseOption(dd, wanted) {
+    if (!dd || !wanted) return false;
+    var target = norm(wanted);
+    var select = selectIn(dd);
+    if (select) {
+        for (var i = 0; i < select.options.length; i++) {
+            if (norm(select.options[i].text) === target || norm(select.options[i].value) === target) {
+                setValue(select, select.options[i].value);
+                return true;
+            }
+        }
+    }
+    dd.click();
+    var spans = Array.prototype.filter.call(document.querySelectorAll('li span'), visible);
+    var match = spans.filter(function (s) { return norm(s.textContent) === target; })[0]
+             || spans.filter(function (s) { return norm(s.textContent).indexOf(target) !== -1; })[0];
+    if (match) { (match.closest('li') || match).click(); match.click(); return true; }
+    return false;
+}
+"""
+
+SET_VALUE_SCRIPT = _JS_HELPERS + r"""
+setValue(arguments[0], arguments[1]);
+return arguments[0].value;
+"""
+
+ADD_ROWS_SCRIPT = r"""
+var nameSel = arguments[0], addSel = arguments[1], wanted = arguments[2];
+var rows = document.querySelectorAll(nameSel).length;
+var guard = 0;
+while (rows < wanted && guard++ < 10) {
+    var add = document.querySelector(addSel);
+    if (!add) break;
+    add.click();
+    var now = document.querySelectorAll(nameSel).length;
+    if (now === rows) break;  // Rows are rendered asynchronously; let the caller poll.
+    rows = now;
+}
+return rows;
+"""
+
+FILL_SCRIPT = _JS_HELPERS + r"""
+var sel = arguments[0], passengers = arguments[1], mobile = arguments[2];
+var names = document.querySelectorAll(sel.name), ages = document.querySelectorAll(sel.age);
+var genders = document.querySelectorAll(sel.gender), berths = document.querySelectorAll(sel.berth);
+var nationalities = document.querySelectorAll(sel.nationality);
+var missing = [];
+passengers.forEach(function (p, i) {
+    if (names[i]) setValue(names[i], p.name); else missing.push('name' + i);
+    if (ages[i]) setValue(ages[i], String(p.age)); else missing.push('age' + i);
+    if (!chooseOption(genders[i], p.sex)) missing.push('gender' + i);
+    if (p.berth && !chooseOption(berths[i], p.berth)) missing.push('berth' + i);
+    if (p.nationality && nationalities[i]) chooseOption(nationalities[i], p.nationality);
+});
+var mobileInput = document.querySelector(sel.mobile);
+if (mobile && mobileInput) setValue(mobileInput, mobile);
+document.body.click();  // Close any dropdown panel left open.
+return {missing: missing};
+"""
+
+READ_BACK_SCRIPT = _JS_HELPERS + r"""
+var sel = arguments[0], count = arguments[1];
+var names = document.querySelectorAll(sel.name), ages = document.querySelectorAll(sel.age);
+var genders = document.querySelectorAll(sel.gender), berths = document.querySelectorAll(sel.berth);
+var nationalities = document.querySelectorAll(sel.nationality);
+var rows = [];
+for (var i = 0; i < count; i++) {
+    rows.push({
+        name: names[i] ? names[i].value : null,
+        age: ages[i] ? ages[i].value : null,
+        sex: genders[i] ? dropdownLabel(genders[i]) : null,
+        berth: berths[i] ? dropdownLabel(berths[i]) : null,
+        nationality: nationalities[i] ? dropdownLabel(nationalities[i]) : null
+    });
+}
+var mobileInput = document.querySelector(sel.mobile);
+return {rows: rows, mobile: mobileInput ? mobileInput.value : null};
+"""
+
+PASSENGER_SELECTORS = {
+    'name': selectors.PASSENGER_NAME_INPUT,
+    'age': selectors.PASSENGER_AGE_INPUT,
+    'gender': selectors.PASSENGER_GENDER_DROPDOWN,
+    'berth': selectors.PASSENGER_PREFERENCE_DROPDOWN,
+    'nationality': selectors.PASSENGER_NATIONALITY_DROPDOWN,
+    'mobile': selectors.PASSENGER_MOBILE_INPUT,
+}
+
+# Saved bookings say "Indian"; the site's nationality dropdown lists countries
+NATIONALITY_LABELS = {"indian": "India"}
+
+def _norm(value):
+    return " ".join(str(value or "").split()).lower()
+
+def nationality_label(value):
+    return NATIONALITY_LABELS.get(_norm(value), value)
+
+def verify_passenger_form(read_back, passengers, mobile):
+    """Returns a list of human-readable mismatches between the page and the wanted values."""
+    problems = []
+    for i, (row, p) in enumerate(zip(read_back['rows'], passengers)):
+        if _norm(row['name']) != _norm(p.get('name')):
+            problems.append(f"passenger {i+1} name is '{row['name']}'")
+        if _norm(row['age']) != _norm(p.get('age')):
+            problems.append(f"passenger {i+1} age is '{row['age']}'")
+        if _norm(row['sex']) != _norm(p.get('sex')):
+            problems.append(f"passenger {i+1} gender is '{row['sex']}'")
+        if p.get('berth') and _norm(row['berth']) != _norm(p['berth']):
+            problems.append(f"passenger {i+1} berth is '{row['berth']}'")
+        # Only pages that show a nationality dropdown can be checked
+        if p.get('nationality') and row.get('nationality') is not None and _norm(row['nationality']) != _norm(nationality_label(p['nationality'])):
+            problems.append(f"passenger {i+1} nationality is '{row['nationality']}'")
+    if mobile and _norm(read_back['mobile']) != _norm(mobile):
+        problems.append(f"mobile is '{read_back['mobile']}'")
+    return problems
+
+def ensure_passenger_rows(driver, count, timeout=2.0):
+    """Clicks "Add Passenger" in-page until `count` rows exist. Returns the row count."""
+    deadline = time.monotonic() + timeout
+    while True:
+        rows = driver.execute_script(ADD_ROWS_SCRIPT, selectors.PASSENGER_NAME_INPUT, selectors.ADD_PASSENGER_BUTTON, count)
+        if rows >= count or time.monotonic() > deadline:
+            return rows
+        time.sleep(0.05)
+
+def read_passenger_form(driver, count):
+    return driver.execute_script(READ_BACK_SCRIPT, PASSENGER_SELECTORS, count)
+
+def fill_passenger_form(driver, passengers, mobile, row_timeout=2.0, attempts=2):
+    """
+    Fills every passenger row and the mobile number in a few `execute_script` calls.
+    Returns (problems, seconds); `problems` is empty when the read-back matches.
+    """
+    start = time.monotonic()
+    ensure_passenger_rows(driver, len(passengers), row_timeout)
+
+    problems = []
+    for _ in range(attempts):
+        wanted = [dict(p, nationality=nationality_label(p['nationality'])) if p.get('nationality') else p for p in passengers]
+        result = driver.execute_script(FILL_SCRIPT, PASSENGER_SELECTORS, wanted, mobile)
+        read_back = read_passenger_form(driver, len(passengers))
+        problems = verify_passenger_form(read_back, passengers, mobile)
+        problems.extend(f"could not find {field}" for field in result.get('missing', []))
+        if not problems:
+            break
+    return problems, time.monotonic() - start
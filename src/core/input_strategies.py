@@ -0,0 +1,73 @@
+"""
+Pluggable ways of typing text into a field.
+
+    human    click via ActionChains, clear, then one send_keys per character with
+             a small random pause (the original behaviour)
+    chunked  click, clear, send_keys in chunks of `chunk_size` characters
+    single   click, clear, one send_keys call for the whole text
+    js       set the value in-page and fire input/change/blur events (one round trip)
+
+Which one is used is configured per field and per state under
+`preferences.typing`, e.g.
+
+    "typing": {"default": "human", "chunk_size": 4,
+               "states": {"LOGIN_STARTED": "chunked"},
+               "fields": {"captcha": "single", "password": "js"}}
+
+A field setting wins over a state setting, which wins over the default.
+"""
+import time
+import random
+from selenium.webdriver.common.action_chains import ActionChains
+from src.core.form_filler import SET_VALUE_SCRIPT
+
+def _type_human(driver, element, text, chunk_size):
+    ActionChains(driver).move_to_element(element).pause(0.1).click().perform()
+    element.clear()
+    for char in text:
+        element.send_keys(char)
+        time.sleep(random.uniform(0.005, 0.01))
+
+def _type_chunked(driver, element, text, chunk_size):
+    element.click()
+    element.clear()
+    for i in range(0, len(text), chunk_size):
+        element.send_keys(text[i:i + chunk_size])
+
+def _type_single(driver, element, text, chunk_size):
+    element.click()
+    element.clear()
+    element.send_keys(text)
+
+def _type_js(driver, element, text, chunk_size):
+    driver.execute_script(SET_VALUE_SCRIPT, element, text)
+
+STRATEGIES = {
+    'human': _type_human,
+    'chunked': _type_chunked,
+    'single': _type_single,
+    'js': _type_js,
+}
+
+class TypingConfig:
+    def __init__(self, default='human', fields=None, states=None, chunk_size=4):
+        self.default = default if default in STRATEGIES else 'human'
+        self.fields = {k: v for k, v in (fields or {}).items() if v in STRATEGIES}
+        self.states = {k: v for k, v in (states or {}).items() if v in STRATEGIES}
+        self.chunk_size = max(1, int(chunk_size))
+
+    @classmethod
+    def from_preferences(cls, prefs):
+        typing = prefs.get('typing', {})
+        return cls(
+            default=typing.get('default', 'human'),
+            fields=typing.get('fields'),
+            states=typing.get('states'),
+            chunk_size=typing.get('chunk_size', 4),
+        )
+
+    def strategy_for(self, field, state_name):
+        return self.fields.get(field) or self.states.get(state_name) or self.default
+
+def type_text(driver, element, text, strategy, chunk_size=4):
+    STRATEGIES[strategy](driver, element, text, chunk_size)
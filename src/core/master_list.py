@@ -0,0 +1,104 @@
+"""
+Moves passenger typing out of the booking window.
+
+During the idle period before the Tatkal window `register_master_passengers`
+adds the configured passengers to the account's master passenger list. On
+the passenger page `select_master_passengers` then picks every passenger
+from the name autocomplete in a single async script, which fills age,
+gender and berth from the master list.
+"""
+import time
+import src.core.selectors as selectors
+from src.core.form_filler import _JS_HELPERS
+
+LIST_NAMES_SCRIPT = r"""
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (td) { return td.textContent.trim(); });
+"""
+
+ADD_MASTER_SCRIPT = _JS_HELPERS + r"""
+var sel = arguments[0], p = arguments[1];
+var name = document.querySelector(sel.name), age = document.querySelector(sel.age);
+if (!name || !age) return null;
+var missing = [];
+setValue(name, p.name);
+setValue(age, String(p.age));
+if (!chooseOption(document.querySelector(sel.gender), p.sex)) missing.push('gender');
+if (p.berth && !chooseOption(document.querySelector(sel.berth), p.berth)) missing.push('berth');
+if (!missing.length) document.querySelector(sel.submit).click();
+return {missing: missing};
+"""
+
+SELECT_MASTER_SCRIPT = _JS_HELPERS + r"""
+var nameSel = arguments[0], optionSel = arguments[1], names = arguments[2], timeoutMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var inputs = document.querySelectorAll(nameSel), results = [];
+function pickRow(i) {
+    if (i >= names.length) { done(results); return; }
+    var input = inputs[i];
+    if (!input) { results.push(false); pickRow(i + 1); return; }
+    setValue(input, names[i]);
+    input.dispatchEvent(new KeyboardEvent('keyup', {bubbles: true, key: names[i].slice(-1)}));
+    var started = Date.now();
+    (function poll() {
+        var options = Array.prototype.filter.call(document.querySelectorAll(optionSel), visible);
+        var match = options.filter(function (o) { return norm(o.textContent).indexOf(norm(names[i])) === 0; })[0];
+        if (match) { match.click(); results.push(true); pickRow(i + 1); return; }
+        if (Date.now() - started > timeoutMs) { results.push(false); pickRow(i + 1); return; }
+        setTimeout(poll, 25);
+    })();
+}
+pickRow(0);
+"""
+
+MASTER_SELECTORS = {
+    'name': selectors.MASTER_NAME_INPUT,
+    'age': selectors.MASTER_AGE_INPUT,
+    'gender': selectors.MASTER_GENDER_SELECT,
+    'berth': selectors.MASTER_BERTH_SELECT,
+    'submit': selectors.MASTER_SUBMIT_BUTTON,
+}
+
+def _norm(name):
+    return " ".join(str(name or "").split()).lower()
+
+def _wait_for_names(driver, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        names = driver.execute_script(LIST_NAMES_SCRIPT, selectors.MASTER_LIST_ROW_NAME)
+        if names or time.monotonic() > deadline:
+            return names
+        time.sleep(0.1)
+
+def register_master_passengers(driver, base_url, passengers, timeout=10):
+    """
+    Adds every configured passenger missing from the master list.
+    Returns the list of passenger names that are on the master list afterwards.
+    """
+    driver.get(base_url + selectors.MASTER_LIST_PATH)
+    existing = {_norm(n) for n in _wait_for_names(driver, timeout=2)}
+    for p in passengers:
+        if _norm(p.get('name')) in existing:
+            continue
+        result = driver.execute_script(ADD_MASTER_SCRIPT, MASTER_SELECTORS, p)
+        if not result:
+            raise RuntimeError("Master list form not found.")
+        if result.get('missing'):
+            raise RuntimeError(f"Could not set {', '.join(result['missing'])} for passenger '{p.get('name')}'.")
+        deadline = time.monotonic() + timeout
+        while _norm(p.get('name')) not in existing:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Passenger '{p.get('name')}' did not appear on the master list.")
+            time.sleep(0.1)
+            existing = {_norm(n) for n in driver.execute_script(LIST_NAMES_SCRIPT, selectors.MASTER_LIST_ROW_NAME)}
+    return [p.get('name') for p in passengers if _norm(p.get('name')) in existing]
+
+def select_master_passengers(driver, passengers, option_timeout_ms=1500):
+    """
+    Picks each passenger from the name autocomplete on the passenger page.
+    Returns a list of booleans, one per passenger, telling which were selected.
+    """
+    names = [p.get('name', '') for p in passengers]
+    driver.set_script_timeout(max(5, option_timeout_ms * len(names) / 1000 + 2))
+    return driver.execute_async_script(
+        SELECT_MASTER_SCRIPT, selectors.PASSENGER_NAME_INPUT, selectors.AUTOCOMPLETE_OPTION, names, option_timeout_ms
+    )
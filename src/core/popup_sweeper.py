@@ -0,0 +1,103 @@
+"""
+In-page popup/overlay dismissal.
+
+All known popups are described by a rule list (see config.POPUP_RULES). One
+injected script applies every rule in the page and a MutationObserver re-runs
+it whenever the DOM changes, so popups are closed as soon as they appear
+without the Python side issuing find/click commands for each of them. The
+Python side only makes one cheap call per poll to re-install the observer
+after a navigation and collect what was dismissed.
+
+A rule is a dict with:
+    name      label used in logs
+    selector  CSS selector of the elements to act on, and/or
+    text      list of strings; matches elements (of `tag`, default any) whose
+              text or aria-label contains one of them. Links (`tag: "a"`)
+              must match one exactly, so a rule can't click any short link
+              that merely mentions the words
+    action    "click" (default), "remove" or "hide"
+"""
+import time
+
+_SWEEP_JS = r"""
+function __sweepPopups(rules) {
+    function visible(el) { return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length); }
+    function norm(t) { return (t || '').replace(/\s+/g, ' ').trim().toLowerCase(); }
+    var done = [];
+    rules.forEach(function (rule) {
+        var found = [];
+        try {
+            found = Array.prototype.slice.call(document.querySelectorAll(rule.selector || rule.tag || '*'));
+        } catch (e) { return; }
+        if (rule.text) {
+            var wanted = rule.text.map(norm), exact = norm(rule.tag) === 'a';
+            found = found.filter(function (el) {
+                var label = norm(el.getAttribute('aria-label')), text = norm(el.textContent);
+                return wanted.some(function (w) {
+                    if (exact) return label === w || text === w;
+                    return label.indexOf(w) !== -1 || text === w || (text.length < 80 && text.indexOf(w) !== -1);
+                });
+            });
+        }
+        var action = rule.action || 'click', count = 0;
+        found.forEach(function (el) {
+            if (action !== 'remove' && !visible(el)) return;
+            try {
+                if (action === 'remove') el.parentNode && el.parentNode.removeChild(el);
+                else if (action === 'hide') el.style.setProperty('display', 'none', 'important');
+                else el.click();
+                count++;
+            } catch (e) {}
+        });
+        if (count) done.push({rule: rule.name, count: count});
+    });
+    return done;
+}
+"""
+
+SWEEP_ONCE_SCRIPT = _SWEEP_JS + "return __sweepPopups(arguments[0]);"
+
+INSTALL_AND_COLLECT_SCRIPT = _SWEEP_JS + r"""
+var rules = arguments[0], installed = false;
+if (!window.__popupSweeper) {
+    var state = window.__popupSweeper = {log: [], rules: rules, pending: false};
+    var run = function () {
+        state.pending = false;
+        state.log.push.apply(state.log, __sweepPopups(state.rules));
+    };
+    new MutationObserver(function () {
+        if (state.pending) return;
+        state.pending = true;
+        setTimeout(run, 30);
+    }).observe(document.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class']});
+    run();
+    installed = true;
+}
+var log = window.__popupSweeper.log;
+window.__popupSweeper.log = [];
+return {installed: installed, log: log};
+"""
+
+class PopupSweeper:
+    """Keeps the in-page popup observer installed on a driver and reports what it closed."""
+    def __init__(self, driver, rules, poll_interval=1.0):
+        self.driver = driver
+        self.rules = rules
+        self.poll_interval = poll_interval
+        self._last_poll = 0.0
+
+    def sweep(self):
+        """Runs every rule once, right now. Returns [{'rule', 'count'}, ...]."""
+        return self.driver.execute_script(SWEEP_ONCE_SCRIPT, self.rules) or []
+
+    def poll(self, force=False):
+        """
+        Re-installs the observer if the page changed and returns what it has
+        dismissed since the last poll. Rate limited to `poll_interval` unless forced.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return []
+        self._last_poll = now
+        result = self.driver.execute_script(INSTALL_AND_COLLECT_SCRIPT, self.rules) or {}
+        return result.get('log', [])
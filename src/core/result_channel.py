@@ -0,0 +1,68 @@
+import threading
+from datetime import datetime
+
+from src.core.state import BotState
+
+class ResultChannel:
+    """
+    Shared outcome board for the bots working on the same jobs.
+
+    Runners feed it every state change. The first bot of a job to reach
+    BOOKING_CONFIRMED becomes the job's winner and `win_listeners` are called
+    with `(job, instance_id, latency_seconds)`, so the runner can cancel the
+    rest. Latency is measured from the job's fire time when it has one,
+    otherwise from when the bot was registered.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self.win_listeners = []
+
+    def register(self, job, instance_id, fire_at=None, account=None):
+        with self._lock:
+            entry = self._jobs.setdefault(job, {'fire_at': fire_at, 'winner': None, 'bots': {}})
+            entry['bots'][instance_id] = {'account': account, 'started_at': datetime.now(), 'last_state': None, 'outcome': None}
+
+    def report(self, job, instance_id, state_name):
+        """Records a state change; returns True if it made `instance_id` the job's winner."""
+        with self._lock:
+            entry = self._jobs.get(job)
+            if entry is None or instance_id not in entry['bots']:
+                return False
+            bot = entry['bots'][instance_id]
+            bot['last_state'] = state_name
+            if state_name != BotState.BOOKING_CONFIRMED.name or entry['winner'] is not None:
+                return False
+            now = datetime.now()
+            start = entry['fire_at'] if entry['fire_at'] and entry['fire_at'] < now else bot['started_at']
+            entry['winner'] = {'instance_id': instance_id, 'account': bot['account'], 'confirmed_at': now,
+                               'latency_seconds': round((now - start).total_seconds(), 3)}
+            latency = entry['winner']['latency_seconds']
+        for listener in self.win_listeners:
+            try:
+                listener(job, instance_id, latency)
+            except Exception as e:
+                print(f"[ResultChannel] Win listener failed: {e}")
+        return True
+
+    def winner(self, job):
+        with self._lock:
+            entry = self._jobs.get(job)
+            return dict(entry['winner']) if entry and entry['winner'] else None
+
+    def finish(self, job, instance_id, outcome):
+        with self._lock:
+            entry = self._jobs.get(job)
+            if entry and instance_id in entry['bots']:
+                entry['bots'][instance_id]['outcome'] = outcome
+
+    def summary(self, job):
+        """{'job', 'booked', 'winner', 'outcomes': {instance_id: outcome}} for one job."""
+        with self._lock:
+            entry = self._jobs.get(job, {'winner': None, 'bots': {}})
+            return {
+                'job': job,
+                'booked': entry['winner'] is not None,
+                'winner': dict(entry['winner']) if entry['winner'] else None,
+                'outcomes': {iid: b['outcome'] or b['last_state'] for iid, b in entry['bots'].items()}
+            }
@@ -0,0 +1,337 @@
+"""
+Typed, validated view of a booking config (`saved_details/config.json`).
+
+`RunConfig.from_dict` checks and normalises everything once at load and
+raises `ConfigError` listing every problem, so a bad class or date is
+reported before the browsers start rather than halfway through a booking.
+Derived values the bots need during the window (class code and its cell
+selector, the window opening and fire times, passenger dicts for the form
+filler) are computed here once.
+"""
+import re
+from dataclasses import dataclass, field, replace
+from datetime import datetime, date, timedelta
+
+import src.core.selectors as selectors
+from src.core.state import BotState
+from src.core.input_strategies import STRATEGIES as TYPING_STRATEGIES
+from src.config import DEFAULT_BROWSER_COUNT, DEFAULT_FIRE_OFFSET_MS, DEFAULT_AVAILABILITY_POLLING
+from src.utils.time_utils import booking_window_open
+
+CLASS_CODES = ("1A", "2A", "3A", "3E", "CC", "EC", "EA", "EV", "VC", "VS", "FC", "SL", "2S", "GN")
+QUOTAS = ("TATKAL", "PREMIUM TATKAL", "GENERAL", "LADIES", "LOWER BERTH/SR.CITIZEN", "PERSON WITH DISABILITY", "DUTY PASS")
+TATKAL_QUOTAS = ("TATKAL", "PREMIUM TATKAL")
+GENDERS = ("Male", "Female", "Transgender")
+BERTHS = ("No Preference", "Lower", "Middle", "Upper", "Side Lower", "Side Upper")
+EXECUTION_MODES = ("thread", "process")
+MAX_PASSENGERS = {True: 4, False: 6}  # keyed by "is a Tatkal quota"
+# Preferences a running bot can take without a restart (browser_count only upwards)
+HOT_RELOADABLE_PREFERENCES = ("payment", "upi_id", "auto_upgrade", "confirm_only", "fire_offset_ms", "browser_count", "poll_availability")
+
+_CODE_IN_PARENS = re.compile(r"\(([A-Z0-9]{2,5})\)\s*$")
+_STATION_CODE = re.compile(r"^[A-Z]{1,5}$")
+
+class ConfigError(ValueError):
+    """Raised with every problem found in a booking config."""
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("Invalid booking config:\n  - " + "\n  - ".join(self.problems))
+
+@dataclass(slots=True, frozen=True)
+class Account:
+    username: str
+    password: str
+
+    @property
+    def complete(self):
+        return bool(self.username and self.password)
+
+    def as_dict(self):
+        return {"username": self.username, "password": self.password}
+
+@dataclass(slots=True, frozen=True)
+class Passenger:
+    name: str
+    age: int
+    sex: str
+    berth: str = "No Preference"
+    nationality: str = "Indian"
+
+    def as_dict(self):
+        return {"name": self.name, "age": self.age, "sex": self.sex, "berth": self.berth, "nationality": self.nationality}
+
+@dataclass(slots=True, frozen=True)
+class Journey:
+    from_code: str
+    to_code: str
+    journey_date: date
+    train_no: str
+    class_code: str
+    quota: str
+    train_name: str = ""
+    class_selector: str = ""
+
+    @property
+    def date_str(self):
+        """DDMMYYYY, as the site and saved files use it."""
+        return self.journey_date.strftime("%d%m%Y")
+
+    @property
+    def is_tatkal(self):
+        return self.quota in TATKAL_QUOTAS
+
+    def as_dict(self):
+        return {
+            "from_code": self.from_code, "to_code": self.to_code, "date": self.date_str,
+            "train_no": self.train_no, "train_name": self.train_name,
+            "class": self.class_code, "quota": self.quota
+        }
+
+@dataclass(slots=True, frozen=True)
+class RunConfig:
+    journey: Journey | None
+    passengers: tuple
+    phone: str
+    logins: tuple
+    preferences: dict
+    browser_count: int = DEFAULT_BROWSER_COUNT
+    execution_mode: str = "thread"
+    window_open: datetime | None = None
+    fire_at: datetime | None = None
+    passenger_dicts: tuple = field(default=(), repr=False)
+
+    @classmethod
+    def from_dict(cls, raw, strict=True, today=None):
+        """
+        Builds a RunConfig from the UI's config dict. `strict` (live runs) also
+        requires a journey and passengers and rejects dates already in the past;
+        benchmarks against the mock site pass `strict=False`.
+        """
+        today = today or date.today()
+        problems = []
+        prefs = dict(raw.get("preferences", {}))
+
+        journey = _parse_journey(raw.get("train"), problems, strict, today)
+        passengers = tuple(_parse_passenger(i, p, problems) for i, p in enumerate(raw.get("passengers", []), start=1))
+        passengers = tuple(p for p in passengers if p)
+        if strict and not raw.get("passengers"):
+            problems.append("no passengers configured")
+        if journey and len(passengers) > MAX_PASSENGERS[journey.is_tatkal]:
+            problems.append(f"{len(passengers)} passengers exceed the {journey.quota} limit of {MAX_PASSENGERS[journey.is_tatkal]}")
+
+        phone = str(raw.get("contact", {}).get("phone", "")).strip()
+        if phone and not (phone.isdigit() and len(phone) == 10):
+            problems.append(f"contact.phone '{phone}' is not a 10-digit number")
+
+        logins = tuple(
+            Account(str(l.get("username", "")).strip(), str(l.get("password", "")))
+            for l in raw.get("logins", []) if isinstance(l, dict)
+        )
+
+        browser_count = _positive_int(prefs.get("browser_count", DEFAULT_BROWSER_COUNT), "preferences.browser_count", problems)
+        execution_mode = prefs.get("execution_mode", "thread")
+        if execution_mode not in EXECUTION_MODES:
+            problems.append(f"preferences.execution_mode '{execution_mode}' is not one of {', '.join(EXECUTION_MODES)}")
+        if prefs.get("timed") and prefs.get("ac") and prefs.get("sl"):
+            problems.append("preferences.ac and preferences.sl are both set; pick the window to book in")
+        try:
+            fire_offset = timedelta(milliseconds=float(prefs.get("fire_offset_ms", DEFAULT_FIRE_OFFSET_MS)))
+        except (TypeError, ValueError):
+            problems.append(f"preferences.fire_offset_ms '{prefs.get('fire_offset_ms')}' is not a number")
+            fire_offset = timedelta(0)
+        _check_polling(prefs.get("poll_availability"), problems)
+        _check_typing(prefs.get("typing"), problems)
+
+        if problems:
+            raise ConfigError(problems)
+
+        # Tatkal opens on the day before the journey
+        window_open = booking_window_open(prefs, day=journey.journey_date - timedelta(days=1) if journey else None)
+        return cls(
+            journey=journey,
+            passengers=passengers,
+            phone=phone,
+            logins=logins,
+            preferences=prefs,
+            browser_count=browser_count,
+            execution_mode=execution_mode,
+            window_open=window_open,
+            fire_at=window_open + fire_offset if window_open else None,
+            passenger_dicts=tuple(p.as_dict() for p in passengers)
+        )
+
+    def reload(self, new):
+        """
+        Merges the safe parts of a newly loaded config into this one for running bots.
+        Returns (merged RunConfig, names of applied changes, names of ignored changes).
+        The journey, timing window and browser settings need a restart and are kept;
+        logins are taken from `new` so extra browsers can be started, but running
+        bots keep their account.
+        """
+        applied, ignored = [], []
+        if new.passengers != self.passengers:
+            applied.append("passengers")
+        if new.phone != self.phone:
+            applied.append("contact.phone")
+        if new.journey != self.journey:
+            ignored.append("train")
+        prefs = dict(self.preferences)
+        for key in sorted(set(self.preferences) | set(new.preferences)):
+            if self.preferences.get(key) == new.preferences.get(key):
+                continue
+            if key in HOT_RELOADABLE_PREFERENCES and not (key == "browser_count" and new.browser_count < self.browser_count):
+                applied.append(f"preferences.{key}")
+                if key in new.preferences:
+                    prefs[key] = new.preferences[key]
+                else:
+                    prefs.pop(key, None)
+            else:
+                ignored.append(f"preferences.{key}")
+        fire_offset = timedelta(milliseconds=float(prefs.get("fire_offset_ms", DEFAULT_FIRE_OFFSET_MS)))
+        merged = replace(
+            self,
+            passengers=new.passengers,
+            passenger_dicts=new.passenger_dicts,
+            phone=new.phone,
+            logins=new.logins,
+            preferences=prefs,
+            browser_count=max(self.browser_count, new.browser_count),
+            fire_at=self.window_open + fire_offset if self.window_open else None
+        )
+        return merged, applied, ignored
+
+    def bot_config(self, account, run_id):
+        """The per-bot config handed to IRCTCBot (plain dicts for older readers, plus this object)."""
+        return {
+            'account': account.as_dict(),
+            'train': self.journey.as_dict() if self.journey else {},
+            'passengers': list(self.passenger_dicts),
+            'contact': {'phone': self.phone},
+            'preferences': self.preferences,
+            'run_id': run_id,
+            'run_config': self
+        }
+
+def _parse_code(value):
+    """Accepts a bare code ("HWH", "3A") or a UI label ending in one ("Howrah Jn (HWH)")."""
+    value = str(value or "").strip().upper()
+    match = _CODE_IN_PARENS.search(value)
+    return match.group(1) if match else value
+
+def _parse_journey(train, problems, strict, today):
+    if not train:
+        if strict:
+            problems.append("no train configured")
+        return None
+    count = len(problems)
+    from_code = _parse_code(train.get("from_code") or train.get("from_station"))
+    to_code = _parse_code(train.get("to_code") or train.get("to_station"))
+    for label, code in (("from", from_code), ("to", to_code)):
+        if not _STATION_CODE.match(code):
+            problems.append(f"train.{label}_code '{code}' is not a station code")
+    if from_code and from_code == to_code:
+        problems.append("train.from_code and train.to_code are the same station")
+
+    journey_date = None
+    raw_date = str(train.get("date", "")).strip()
+    try:
+        journey_date = datetime.strptime(raw_date, "%d%m%Y").date()
+        if strict and journey_date < today:
+            problems.append(f"train.date {raw_date} is in the past")
+    except ValueError:
+        problems.append(f"train.date '{raw_date}' is not DDMMYYYY")
+
+    train_no = str(train.get("train_no", "")).strip()
+    if not (train_no.isdigit() and len(train_no) == 5):
+        problems.append(f"train.train_no '{train_no}' is not a 5-digit train number")
+
+    class_code = _parse_code(train.get("class"))
+    if class_code == "GENERAL":
+        class_code = "GN"
+    if class_code not in CLASS_CODES:
+        problems.append(f"train.class '{train.get('class')}' is not a known class ({', '.join(CLASS_CODES)})")
+
+    quota = str(train.get("quota", "")).strip().upper()
+    if quota not in QUOTAS:
+        problems.append(f"train.quota '{train.get('quota')}' is not one of {', '.join(QUOTAS)}")
+
+    if len(problems) > count:
+        return None
+    return Journey(
+        from_code=from_code, to_code=to_code, journey_date=journey_date, train_no=train_no,
+        class_code=class_code, quota=quota, train_name=str(train.get("train_name", "")).strip(),
+        class_selector=selectors.CLASS_SELECTOR_TEMPLATE.format(class_code=class_code)
+    )
+
+def _parse_passenger(index, p, problems):
+    name = " ".join(str(p.get("name", "")).split())
+    if not name:
+        problems.append(f"passenger {index}: name is empty")
+    try:
+        age = int(p.get("age"))
+        if not 1 <= age <= 125:
+            raise ValueError
+    except (TypeError, ValueError):
+        problems.append(f"passenger {index}: age '{p.get('age')}' is not between 1 and 125")
+        age = None
+    sex = str(p.get("sex", "")).strip().capitalize()
+    if sex not in GENDERS:
+        problems.append(f"passenger {index}: sex '{p.get('sex')}' is not one of {', '.join(GENDERS)}")
+    berth = str(p.get("berth") or "No Preference").strip()
+    berth = next((b for b in BERTHS if b.lower() == berth.lower()), berth)
+    if berth not in BERTHS:
+        problems.append(f"passenger {index}: berth '{p.get('berth')}' is not one of {', '.join(BERTHS)}")
+    if not name or age is None or sex not in GENDERS or berth not in BERTHS:
+        return None
+    return Passenger(name=name, age=age, sex=sex, berth=berth, nationality=str(p.get("nationality") or "Indian").strip())
+
+def _check_polling(value, problems):
+    if value is None or isinstance(value, bool):
+        return
+    if not isinstance(value, dict):
+        problems.append(f"preferences.poll_availability '{value}' is not true/false or a settings object")
+        return
+    for key, setting in value.items():
+        if key not in DEFAULT_AVAILABILITY_POLLING:
+            problems.append(f"preferences.poll_availability.{key} is not one of {', '.join(DEFAULT_AVAILABILITY_POLLING)}")
+            continue
+        try:
+            if float(setting) <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            problems.append(f"preferences.poll_availability.{key} '{setting}' is not a positive number")
+
+def _check_typing(value, problems):
+    if value is None:
+        return
+    if not isinstance(value, dict):
+        problems.append(f"preferences.typing '{value}' is not a settings object")
+        return
+    for key in value:
+        if key not in ("default", "fields", "states", "chunk_size"):
+            problems.append(f"preferences.typing.{key} is not one of default, fields, states, chunk_size")
+    strategies = ", ".join(TYPING_STRATEGIES)
+    if "default" in value and value["default"] not in TYPING_STRATEGIES:
+        problems.append(f"preferences.typing.default '{value['default']}' is not one of {strategies}")
+    for group in ("fields", "states"):
+        entries = value.get(group) or {}
+        if not isinstance(entries, dict):
+            problems.append(f"preferences.typing.{group} '{entries}' is not an object")
+            continue
+        for name, strategy in entries.items():
+            if group == "states" and name not in BotState.__members__:
+                problems.append(f"preferences.typing.states.{name} is not a bot state")
+            if strategy not in TYPING_STRATEGIES:
+                problems.append(f"preferences.typing.{group}.{name} '{strategy}' is not one of {strategies}")
+    if "chunk_size" in value:
+        _positive_int(value["chunk_size"], "preferences.typing.chunk_size", problems)
+
+def _positive_int(value, label, problems):
+    try:
+        value = int(value)
+        if value < 1:
+            raise ValueError
+        return value
+    except (TypeError, ValueError):
+        problems.append(f"{label} '{value}' is not a positive whole number")
+        return 1
@@ -24,8 +24,16 @@ PASSENGER_GENDER_DROPDOWN = "p-dropdown[formcontrolname='passengerGender']"
 GENDER_OPTION_XPATH = "//span[contains(text(),'{gender}')]"
 PASSENGER_PREFERENCE_DROPDOWN = "p-dropdown[formcontrolname='passengerBerthChoice']"
 BERTH_OPTION_XPATH = "//span[contains(text(),'{berth}')]"
+PASSENGER_NATIONALITY_DROPDOWN = "p-dropdown[formcontrolname='passengerNationality']"
 ADD_PASSENGER_BUTTON = "button.psgn-smry-btn"
 PASSENGER_MOBILE_INPUT = "input[formcontrolname='mobileNumber']"
+MASTER_LIST_PATH = "/nget/profile/master-list"
+MASTER_LIST_ROW_NAME = "table.master-list td.psgn-name"
+MASTER_NAME_INPUT = "input[formcontrolname='name']"
+MASTER_AGE_INPUT = "input[formcontrolname='age']"
+MASTER_GENDER_SELECT = "select[formcontrolname='gender']"
+MASTER_BERTH_SELECT = "select[formcontrolname='berthChoice']"
+MASTER_SUBMIT_BUTTON = "button.master-list-submit"
 SUBMIT_PASSENGER_DETAILS_BUTTON = "button.train_Search.continue-booking-btn"
 CAPTCHA_INPUT_REVIEW = "input[formcontrolname='nlpAnswer']"
 CAPTCHA_IMAGE_REVIEW = "img.captcha-img"
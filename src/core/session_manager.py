@@ -0,0 +1,148 @@
+"""
+Keeps an IRCTC session alive through the Tatkal window.
+
+`SessionKeeper` follows the bot's login state and decides, once per tick,
+whether the session needs attention:
+
+  * keepalive  dispatch synthetic user activity in the page (resets the site's
+               client-side idle timer) and, if configured, touch a same-origin
+               URL so the server sees activity too. Done every
+               `keepalive_interval` seconds and once more shortly before the
+               window opens; never once it is open, so it can't disturb the
+               booking forms.
+  * relogin    if the session would exceed `max_session_age` before the window
+               closes, log out and back in `relogin_lead` seconds before the
+               window so the captcha is solved calmly instead of at 10:00:01.
+
+When the site logs the bot out anyway, the idle time that led to it is used to
+shorten the predicted idle timeout and the keep-alive interval.
+"""
+import threading
+from datetime import datetime, timedelta
+
+from src.config import SESSION_KEEPALIVE_INTERVAL, SESSION_IDLE_TIMEOUT
+
+LOGGED_IN_STATES = {
+    "LOGIN_SUCCESSFUL", "AT_DASHBOARD", "FILLING_JOURNEY_DETAILS", "SUBMITTING_JOURNEY",
+    "TRAIN_LIST_PAGE", "SELECTING_QUOTA", "SELECTING_CLASS", "CLICKING_BOOK_NOW",
+    "PASSENGER_DETAILS_PAGE", "FILLING_PASSENGER_DETAILS", "SUBMITTING_PASSENGERS",
+    "REVIEW_PAGE", "REVIEW_SOLVING_CAPTCHA", "PROCEEDING_TO_PAYMENT", "PAYMENT_PAGE",
+}
+LOGGED_OUT_STATES = {"LOGGED_OUT", "LOGIN_STARTED"}
+
+KEEPALIVE_SCRIPT = r"""
+var path = arguments[0];
+// Pointer moves and scrolls only: a synthetic click or key press can close open dropdowns and autocompletes
+document.dispatchEvent(new MouseEvent('mousemove', {bubbles: true}));
+window.dispatchEvent(new Event('scroll'));
+if (path) { fetch(path, {credentials: 'include', cache: 'no-store'}).catch(function () {}); }
+return true;
+"""
+
+class SessionKeeper:
+    """
+    `window_open` is the window's datetime, or a callable returning it (or None),
+    asked again on every tick so a window that becomes known later still pauses
+    the keep-alive. The bot's state listener and its keep-alive thread both use
+    one keeper, so its fields are only touched under `_lock`.
+    """
+    def __init__(self, window_open=None, window_length=600, keepalive_interval=SESSION_KEEPALIVE_INTERVAL, idle_timeout=SESSION_IDLE_TIMEOUT,
+                 max_session_age=None, relogin_lead=180, pre_window_touch=45, keepalive_path=None):
+        self.window_open = window_open
+        self.window_length = window_length
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.max_session_age = max_session_age
+        self.relogin_lead = relogin_lead
+        self.pre_window_touch = pre_window_touch
+        self.keepalive_path = keepalive_path
+        self.logged_in_at = None
+        self.last_activity_at = None
+        self.expected_logout = False
+        self._pre_window_touched = False
+        self._relogin_done = False
+        self._last_state = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_preferences(cls, prefs, window_open):
+        session = prefs.get('session', {})
+        return cls(window_open=window_open, **{k: v for k, v in session.items() if k in (
+            'window_length', 'keepalive_interval', 'idle_timeout', 'max_session_age',
+            'relogin_lead', 'pre_window_touch', 'keepalive_path')})
+
+    @property
+    def logged_in(self):
+        with self._lock:
+            return self.logged_in_at is not None
+
+    def _window_open(self):
+        return self.window_open() if callable(self.window_open) else self.window_open
+
+    def age(self, now=None):
+        """Seconds since login, or None when logged out."""
+        with self._lock:
+            if self.logged_in_at is None:
+                return None
+            return ((now or datetime.now()) - self.logged_in_at).total_seconds()
+
+    def on_state(self, state_name, now=None):
+        """
+        Feeds a bot state change. Returns a message describing an unexpected logout
+        (with the updated idle timeout prediction), or None.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if state_name == self._last_state:
+                return None
+            self._last_state = state_name
+            if state_name in LOGGED_IN_STATES and self.logged_in_at is None:
+                self.logged_in_at = self.last_activity_at = now
+                self.expected_logout = False
+            elif state_name in LOGGED_OUT_STATES and self.logged_in_at is not None:
+                idle = (now - self.last_activity_at).total_seconds()
+                self.logged_in_at = None
+                if self.expected_logout:
+                    self.expected_logout = False
+                    return None
+                if idle < self.idle_timeout:
+                    self.idle_timeout = idle
+                    self.keepalive_interval = min(self.keepalive_interval, max(10, idle / 2))
+                return (f"Session ended after {idle:.0f}s idle; predicting idle timeout {self.idle_timeout:.0f}s, "
+                        f"keep-alive every {self.keepalive_interval:.0f}s")
+            elif self.logged_in_at is not None:
+                self.last_activity_at = now
+            return None
+
+    def next_action(self, now=None):
+        """Returns 'relogin', 'keepalive' or None. Always None once the window has opened."""
+        now = now or datetime.now()
+        window_open = self._window_open()  # May read files; not done under the lock
+        with self._lock:
+            if self.logged_in_at is None or (window_open and now >= window_open):
+                return None
+            if window_open and now < window_open:
+                until_window = (window_open - now).total_seconds()
+                age = (now - self.logged_in_at).total_seconds()
+                if (self.max_session_age and not self._relogin_done and until_window <= self.relogin_lead
+                        and age + until_window + self.window_length > self.max_session_age):
+                    self._relogin_done = True
+                    self.expected_logout = True
+                    return 'relogin'
+                if until_window <= self.pre_window_touch and not self._pre_window_touched:
+                    self._pre_window_touched = True
+                    return 'keepalive'
+            if (now - self.last_activity_at).total_seconds() >= self.keepalive_interval:
+                return 'keepalive'
+            return None
+
+    def keep_alive(self, driver, now=None):
+        driver.execute_script(KEEPALIVE_SCRIPT, self.keepalive_path)
+        with self._lock:
+            self.last_activity_at = now or datetime.now()
+
+    def predicted_expiry(self):
+        with self._lock:
+            if self.logged_in_at is None:
+                return None
+            return self.last_activity_at + timedelta(seconds=self.idle_timeout)
@@ -53,6 +53,7 @@ class BotState(Enum):
     # Outcome States
     BOOKING_CONFIRMED = auto()      # PNR generated, booking is successful.
     BOOKING_FAILED = auto()         # Booking failed for any reason after payment.
+    CANCELLED = auto()              # Another instance booked this journey; stopped at a safe point.
 
     # Generic/Error States
     UNKNOWN = auto()                # The Supervisor cannot determine the page/state.
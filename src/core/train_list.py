@@ -0,0 +1,197 @@
+"""
+Reads the train list page in one round trip.
+
+`snapshot_train_list` runs a single script that walks every train row and
+returns, per train number, the name, the Book Now button and every class
+cell with its availability and fare. DOM nodes come back as WebElement
+handles, so picking the configured train and class is a dictionary lookup
+and clicking it needs no further find_element calls.
+
+For a class still on the waitlist, `refresh_availability` re-requests its
+status in the page (the same click on the class cell a user would make, no
+navigation) and books in that same call once it turns bookable;
+`AvailabilityPoller` decides how long to wait between refreshes.
+"""
+import re
+import random
+import src.core.selectors as selectors
+from src.core.run_config import CLASS_CODES
+from src.config import DEFAULT_AVAILABILITY_POLLING
+
+# Class code -> cell selector, from the same template the rest of the bot uses
+CLASS_CELL_SELECTORS = {code: selectors.CLASS_SELECTOR_TEMPLATE.format(class_code=code) for code in CLASS_CODES}
+
+SNAPSHOT_SCRIPT = r"""
+var rowSel = arguments[0], classSels = arguments[1], bookSel = arguments[2], tatkalSel = arguments[3];
+function text(el) { return el ? el.textContent.replace(/\s+/g, ' ').trim() : ''; }
+var trains = {};
+document.querySelectorAll(rowSel).forEach(function (row) {
+    var heading = row.querySelector('.train-heading, strong');
+    var match = /\((\d{5})\)/.exec(text(heading)) || /\((\d{5})\)/.exec(text(row));
+    var number = row.getAttribute('data-train') || (match && match[1]);
+    if (!number || trains[number]) return;
+    var classes = {};
+    row.querySelectorAll('td').forEach(function (td) {
+        for (var code in classSels) {
+            if (!classes[code] && td.matches(classSels[code])) {
+                classes[code] = {
+                    cell: td,
+                    availability: text(td.querySelector('.avl, .AVAILABLE, .WL')) || text(td),
+                    fare: text(td.querySelector('.fare'))
+                };
+                return;
+            }
+        }
+    });
+    trains[number] = {name: text(heading).replace(/\s*\(\d{5}\)\s*$/, ''), book: row.querySelector(bookSel), classes: classes};
+});
+var tatkal = document.querySelector(tatkalSel);
+return {
+    trains: trains,
+    tatkal: tatkal,
+    tatkal_selected: !!(tatkal && (tatkal.querySelector('input:checked, .p-highlight, .ui-state-active') || tatkal.classList.contains('selected')))
+};
+"""
+
+# Clicks the class cell, then the row's Book Now as soon as it is enabled (the
+# site enables it once the class's availability has loaded).
+SELECT_AND_BOOK_SCRIPT = r"""
+var cell = arguments[0], book = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+cell.click();
+var started = Date.now();
+(function poll() {
+    if (book && !book.disabled && !book.classList.contains('disable-book')) { book.click(); done(true); return; }
+    if (Date.now() - started > timeoutMs) { done(false); return; }
+    setTimeout(poll, 25);
+})();
+"""
+
+# Clicks the class cell of one train again so the site re-fetches its
+# availability, and waits for the answer: the spinner coming and going, the
+# status text changing, or (sites that refresh without a spinner) a quiet
+# `graceMs`. The row is looked up by train number on every call, so a
+# re-rendered list is fine. If the new status matches `pattern` and `book` is
+# set, Book Now is clicked before returning.
+REFRESH_AVAILABILITY_SCRIPT = r"""
+var rowSel = arguments[0], trainNo = arguments[1], cellSel = arguments[2], spinnerSel = arguments[3],
+    bookSel = arguments[4], pattern = new RegExp(arguments[5], 'i'), timeoutMs = arguments[6], book = arguments[7];
+var done = arguments[arguments.length - 1], graceMs = 300;
+function text(el) { return el ? el.textContent.replace(/\s+/g, ' ').trim() : ''; }
+function read() {
+    var rows = document.querySelectorAll(rowSel), row = null;
+    for (var i = 0; i < rows.length && !row; i++) {
+        if (rows[i].getAttribute('data-train') === trainNo || text(rows[i]).indexOf('(' + trainNo + ')') >= 0) row = rows[i];
+    }
+    var cell = row && row.querySelector(cellSel);
+    return {row: row, cell: cell, availability: cell ? (text(cell.querySelector('.avl, .AVAILABLE, .WL')) || text(cell)) : ''};
+}
+var before = read();
+if (!before.cell) { done({availability: '', elapsed_ms: 0, booked: false, error: 'class cell not found'}); return; }
+var started = Date.now(), sawSpinner = false;
+before.cell.click();
+(function poll() {
+    var spinning = !!document.querySelector(spinnerSel), now = read(), elapsed = Date.now() - started;
+    sawSpinner = sawSpinner || spinning;
+    var answered = now.cell && !spinning && (sawSpinner || now.availability !== before.availability || elapsed > graceMs);
+    if (answered) {
+        var bookable = pattern.test(now.availability), button = now.row.querySelector(bookSel);
+        var enabled = button && !button.disabled && !button.classList.contains('disable-book');
+        if (!(book && bookable) || enabled) {
+            if (book && bookable) button.click();
+            done({availability: now.availability, elapsed_ms: elapsed, booked: !!(book && bookable), error: null});
+            return;
+        }
+    }
+    if (elapsed > timeoutMs) {
+        done({availability: now.availability, elapsed_ms: elapsed, booked: false, error: 'no answer within ' + timeoutMs + ' ms'});
+        return;
+    }
+    setTimeout(poll, 20);
+})();
+"""
+
+# Anchored: "NOT AVAILABLE", "REGRET/WL", "GNWL12/WL5" and the like must not match
+AVAILABLE_PATTERN = re.compile(r"^\s*(AVAILABLE|AVL|CURR_AVBL|RAC)(?![A-Z_])", re.IGNORECASE)
+# The same without RAC, for `confirm_only` runs
+CONFIRMED_PATTERN = re.compile(r"^\s*(AVAILABLE|AVL|CURR_AVBL)(?![A-Z_])", re.IGNORECASE)
+
+def snapshot_train_list(driver):
+    """Returns {'trains': {train_no: {'name', 'book', 'classes': {code: {'cell', 'availability', 'fare'}}}}, 'tatkal', 'tatkal_selected'}."""
+    snapshot = driver.execute_script(
+        SNAPSHOT_SCRIPT, selectors.TRAIN_LIST_ITEM, CLASS_CELL_SELECTORS, selectors.BOOK_NOW_BUTTON, selectors.QUOTA_TATKAL_RADIO
+    )
+    snapshot['trains'] = snapshot.get('trains') or {}
+    return snapshot
+
+def is_bookable(availability, confirmed_only=False):
+    """True for AVAILABLE-nnnn / RAC style statuses (RAC excluded with `confirmed_only`); waitlists and REGRET are not."""
+    pattern = CONFIRMED_PATTERN if confirmed_only else AVAILABLE_PATTERN
+    return bool(pattern.search(availability or ""))
+
+def select_and_book(driver, cell, book_button, timeout=5):
+    """Clicks the class cell, then Book Now once enabled. Returns False if it never enabled."""
+    driver.set_script_timeout(timeout + 2)
+    return driver.execute_async_script(SELECT_AND_BOOK_SCRIPT, cell, book_button, int(timeout * 1000))
+
+def refresh_availability(driver, train_no, class_code, timeout=10, book=True, confirmed_only=False):
+    """
+    Refreshes one class's availability in the page and, with `book`, clicks Book Now
+    if it is now bookable (see `is_bookable`). Returns {'availability', 'elapsed_ms', 'booked', 'error'}.
+    """
+    pattern = CONFIRMED_PATTERN if confirmed_only else AVAILABLE_PATTERN
+    driver.set_script_timeout(timeout + 2)
+    return driver.execute_async_script(
+        REFRESH_AVAILABILITY_SCRIPT, selectors.TRAIN_LIST_ITEM, str(train_no), CLASS_CELL_SELECTORS[class_code],
+        selectors.SPINNER_OVERLAY, selectors.BOOK_NOW_BUTTON, pattern.pattern, int(timeout * 1000), book
+    )
+
+class AvailabilityPoller:
+    """
+    Paces availability refreshes by how the server is answering.
+
+    Response times are smoothed (EWMA); after a good answer the next refresh
+    waits `load_factor` times that, kept within [min_interval, max_interval], so
+    a slow, busy server is asked less often and a quick one nearly at
+    `min_interval`. Each failed refresh in a row doubles the wait (with jitter),
+    up to `max_backoff`.
+    """
+    def __init__(self, min_interval, max_interval, load_factor, max_backoff, request_timeout, timeout, smoothing=0.3):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.load_factor = load_factor
+        self.max_backoff = max_backoff
+        self.request_timeout = request_timeout
+        self.timeout = timeout
+        self.smoothing = smoothing
+        self.response_time = None  # EWMA, seconds
+        self.errors = 0  # failures in a row
+        self.polls = 0
+
+    @classmethod
+    def from_preferences(cls, prefs):
+        """None unless `preferences.poll_availability` is set; a dict there overrides the defaults."""
+        value = prefs.get("poll_availability")
+        if not value:
+            return None
+        settings = dict(DEFAULT_AVAILABILITY_POLLING, **(value if isinstance(value, dict) else {}))
+        return cls(**{k: float(v) for k, v in settings.items()})
+
+    def record(self, elapsed, ok):
+        """Feeds one refresh's response time (seconds) and whether it succeeded."""
+        self.polls += 1
+        if not ok:
+            self.errors += 1
+            return
+        self.errors = 0
+        if self.response_time is None:
+            self.response_time = elapsed
+        else:
+            self.response_time += self.smoothing * (elapsed - self.response_time)
+
+    def next_delay(self):
+        """Seconds to wait before the next refresh."""
+        base = min(self.max_interval, max(self.min_interval, self.load_factor * (self.response_time or 0)))
+        if not self.errors:
+            return base
+        return min(self.max_backoff, base * 2 ** self.errors * random.uniform(0.8, 1.2))
@@ -2,12 +2,61 @@ import sys
 import os
 from selenium import webdriver
 from selenium_stealth import stealth
+from src.config import DEFAULT_BLOCKING_PROFILE, PAGE_LOAD_STRATEGY
 
-def create_webdriver(instance_id, is_headless=False, use_gpu=True):
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*"],
+    "stylesheet": ["*.css*"],
+}
+
+def build_blocked_urls(profile):
+    """
+    Expands a blocking profile into the URL pattern list for Network.setBlockedURLs.
+    That command blocks every URL matching a pattern with no exceptions, so there is
+    no allowlist: a URL that must load must not match any pattern.
+    """
+    patterns = list(profile.get("url_patterns", []))
+    for resource_type in profile.get("resource_types", []):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+    blocked = []
+    for pattern in patterns:
+        if pattern not in blocked:
+            blocked.append(pattern)
+    return blocked
+
+def apply_blocking_profile(driver, profile):
+    """Installs the request-blocking profile on a live driver through CDP."""
+    if profile.get("allow_patterns"):
+        print("[WebDriverFactory] Ignoring allow_patterns: Network.setBlockedURLs can't make exceptions.")
+    blocked = build_blocked_urls(profile)
+    if not blocked:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+    print(f"[WebDriverFactory] Blocking {len(blocked)} URL pattern(s).")
+
+def driver_kwargs_from_preferences(prefs):
+    """Maps the `preferences` section of a booking config to create_webdriver keyword arguments."""
+    blocking_profile = None
+    if prefs.get("block_resources", False):
+        blocking_profile = dict(DEFAULT_BLOCKING_PROFILE, **prefs.get("blocking_profile", {}))
+    return {
+        "is_headless": prefs.get("headless", False),
+        "blocking_profile": blocking_profile,
+        "page_load_strategy": prefs.get("page_load_strategy", PAGE_LOAD_STRATEGY),
+    }
+
+def create_webdriver(instance_id, is_headless=False, use_gpu=True, blocking_profile=None, page_load_strategy=None):
     """
     Creates a stealthy webdriver instance using selenium-stealth.
+    `blocking_profile` (see config.DEFAULT_BLOCKING_PROFILE) blocks matching requests
+    via CDP; `page_load_strategy` sets how long navigation commands wait.
     """
     options = webdriver.ChromeOptions()
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
 
     # --- Base Options ---
     options.add_argument("--start-maximized")
@@ -62,6 +111,12 @@ def create_webdriver(instance_id, is_headless=False, use_gpu=True):
         )
 
         print("[WebDriverFactory] Stealth patches applied successfully.")
+
+        if blocking_profile:
+            try:
+                apply_blocking_profile(driver, blocking_profile)
+            except Exception as e:
+                print(f"[WebDriverFactory] WARNING: Could not apply blocking profile: {e}")
         return driver
 
     except Exception as e:
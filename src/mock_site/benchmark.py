@@ -0,0 +1,86 @@
+"""
+Drives N bots against the local mock IRCTC site and reports end-to-end timing.
+
+    python3 -m src.mock_site.benchmark --bots 4 --latency-ms 300 --popup-rate 0.3
+
+Each bot gets a throwaway login; the run stops once every bot has reached
+`--until` (default AT_DASHBOARD, the furthest state the bot currently
+automates) or after `--timeout` seconds. Per-state timings for the run are
+printed from the same history the live runs use.
+"""
+import json
+import time
+import argparse
+import threading
+from src.core.bot_runner import BotRunner
+from src.core.run_config import RunConfig
+from src.core.state import BotState
+from src.mock_site.server import MockSettings, start_mock_server
+from src.utils.state_timing import load_history, funnel_report
+
+FINAL_STATES = (BotState.BOOKING_CONFIRMED.name, BotState.FATAL_ERROR.name, BotState.STOPPED.name)
+
+def build_benchmark_config(base_url, bots, headless=True, extra_preferences=None, booking_file=None):
+    config = {}
+    if booking_file:
+        with open(booking_file, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    preferences = dict(config.get("preferences", {}))
+    preferences.update({"browser_count": bots, "headless": headless, "timed": False, "base_url": base_url})
+    preferences.update(extra_preferences or {})
+    config["preferences"] = preferences
+    config["logins"] = [{"username": f"benchuser{i}", "password": "benchpass"} for i in range(1, bots + 1)]
+    return config
+
+def run_benchmark(bots=1, until=BotState.AT_DASHBOARD.name, timeout=120, settings=None, headless=True, extra_preferences=None, booking_file=None):
+    """Returns {'run_id', 'reached': {instance_id: seconds}, 'wall_seconds'}."""
+    server, base_url = start_mock_server(0, settings)
+    print(f"[Benchmark] Mock site at {base_url}, {bots} bot(s), until {until}.")
+    # The mock site ignores dates, so only formats are checked (strict=False)
+    runner = BotRunner(RunConfig.from_dict(build_benchmark_config(base_url, bots, headless, extra_preferences, booking_file), strict=False))
+    reached = {}
+    start = time.monotonic()
+    run_thread = threading.Thread(target=runner.start, daemon=True)
+    run_thread.start()
+    try:
+        while run_thread.is_alive() and time.monotonic() - start < timeout:
+            for instance_id, state in list(runner.statuses.items()):
+                if state == until and instance_id not in reached:
+                    reached[instance_id] = time.monotonic() - start
+                    print(f"[Benchmark] Bot {instance_id} reached {until} after {reached[instance_id]:.2f}s.")
+            if runner.statuses and len(reached) >= len(runner.statuses):
+                break
+            if runner.statuses and all(s in FINAL_STATES for s in runner.statuses.values()):
+                break
+            time.sleep(0.05)
+    finally:
+        runner.stop()
+        run_thread.join(timeout=30)
+        server.shutdown()
+    return {'run_id': runner.run_id, 'reached': reached, 'wall_seconds': time.monotonic() - start}
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark against the mock IRCTC site.")
+    parser.add_argument("--bots", type=int, default=1)
+    parser.add_argument("--until", default=BotState.AT_DASHBOARD.name, choices=[s.name for s in BotState])
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--spinner-ms", type=int, default=0)
+    parser.add_argument("--popup-rate", type=float, default=0.0)
+    parser.add_argument("--captcha-mode", choices=("any", "exact"), default="any")
+    parser.add_argument("--booking-file", help="Saved booking JSON to take train/passengers from.")
+    parser.add_argument("--show-browser", action="store_true")
+    args = parser.parse_args()
+
+    settings = MockSettings(args.latency_ms, args.jitter_ms, args.spinner_ms, args.popup_rate, args.captcha_mode)
+    result = run_benchmark(args.bots, args.until, args.timeout, settings, headless=not args.show_browser, booking_file=args.booking_file)
+
+    times = sorted(result['reached'].values())
+    print(f"[Benchmark] {len(times)}/{args.bots} bot(s) reached {args.until} in {result['wall_seconds']:.2f}s wall time.")
+    if times:
+        print(f"[Benchmark] Fastest {times[0]:.2f}s, slowest {times[-1]:.2f}s.")
+    print(funnel_report(load_history(run_id=result['run_id'])))
+
+if __name__ == "__main__":
+    main()
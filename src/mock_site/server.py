@@ -0,0 +1,213 @@
+"""
+A local stand-in for the IRCTC booking site.
+
+It serves a single page app whose DOM matches what `src/core/selectors.py`
+targets (login modal with captcha, journey form, train list, passenger form,
+review with captcha, payment, PNR dialog). Every page transition is one
+request to the server, which can add latency; the page shows the
+`div.pre-load-new` spinner while waiting and can inject the Aadhaar and DISHA
+popups the bots have to close. Captcha answers, login state, the passenger
+master list (`/nget/profile/master-list`) and availability refresh counts are
+kept per browser, keyed by a `mock_session` cookie the server hands out, so
+several local bots don't share a session.
+
+    python3 -m src.mock_site.server --port 8765 --latency-ms 300 --popup-rate 0.3
+"""
+import os
+import io
+import json
+import time
+import base64
+import random
+import string
+import secrets
+import argparse
+import threading
+from http.cookies import SimpleCookie, CookieError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SESSION_COOKIE = "mock_session"
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.html")
+
+# 1x1 white PNG, used when Pillow is not available to draw a real captcha.
+BLANK_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
+
+DEFAULT_TRAINS = [
+    {"number": "12834", "name": "HWH ADI SUF EXP", "classes": [
+        {"code": "SL", "availability": "AVAILABLE-0042", "fare": "865"},
+        {"code": "3A", "availability": "AVAILABLE-0012", "fare": "2245"},
+        {"code": "2A", "availability": "WL 3", "fare": "3230"},
+    ]},
+    {"number": "12637", "name": "PANDIAN EXP", "classes": [
+        {"code": "SL", "availability": "WL 12", "fare": "415"},
+        {"code": "3A", "availability": "AVAILABLE-0004", "fare": "1085"},
+    ]},
+]
+
+class MockSettings:
+    def __init__(self, latency_ms=0, jitter_ms=0, spinner_ms=0, popup_rate=0.0, captcha_mode="any", trains=None, waitlist_clears_after=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.spinner_ms = spinner_ms
+        self.popup_rate = popup_rate
+        self.captcha_mode = captcha_mode  # "any" accepts any non-empty answer, "exact" needs the drawn text
+        self.trains = trains or DEFAULT_TRAINS
+        self.waitlist_clears_after = waitlist_clears_after  # A waitlisted class turns AVAILABLE after this many refreshes (0: never)
+
+def _draw_captcha(text):
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return "data:image/png;base64," + BLANK_PNG
+    img = Image.new("RGB", (160, 50), "white")
+    ImageDraw.Draw(img).text((20, 18), " ".join(text), fill="black")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+class MockIRCTCHandler(BaseHTTPRequestHandler):
+    settings = MockSettings()
+    captchas = {}  # session id -> expected answer
+    sessions = {}  # session id -> {'logged_in': bool, 'master_list': [passenger, ...]}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if self._new_client:
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={self.client}; Path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _delay(self):
+        s = self.settings
+        delay = s.latency_ms + (random.uniform(0, s.jitter_ms) if s.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+
+    def _identify(self):
+        """Sets `self.client` from the session cookie, issuing a new id when the browser has none."""
+        try:
+            morsel = SimpleCookie(self.headers.get("Cookie", "")).get(SESSION_COOKIE)
+        except CookieError:
+            morsel = None
+        self.client = morsel.value if morsel and morsel.value else secrets.token_hex(8)
+        self._new_client = not (morsel and morsel.value)
+
+    def _session(self):
+        with self.lock:
+            return self.sessions.setdefault(self.client, {'logged_in': False, 'master_list': []})
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            return {}
+
+    def do_GET(self):
+        self._identify()
+        if self.path == "/api/config":
+            s = self.settings
+            return self._send(200, {"latency_ms": s.latency_ms, "spinner_ms": s.spinner_ms, "popup_rate": s.popup_rate,
+                                    "logged_in": self._session()['logged_in']})
+        if self.path.startswith("/api/"):
+            return self._send(405, {"error": "use POST"})
+        with open(INDEX_FILE, "rb") as f:
+            self._send(200, f.read(), "text/html; charset=utf-8")
+
+    def do_POST(self):
+        step = self.path[len("/api/"):] if self.path.startswith("/api/") else ""
+        body = self._read_json()
+        self._identify()
+        client = self.client
+        if step == "captcha":
+            text = "".join(random.choices(string.ascii_letters + string.digits, k=5))
+            with self.lock:
+                self.captchas[client] = text
+            return self._send(200, {"image": _draw_captcha(text)})
+
+        self._delay()
+        if step in ("login", "review"):
+            answer = (body.get("captcha") or "").strip()
+            with self.lock:
+                expected = self.captchas.get(client)
+            if not answer or (self.settings.captcha_mode == "exact" and answer != expected):
+                return self._send(200, {"ok": False, "error": "Invalid Captcha...."})
+            if step == "login" and not body.get("userid"):
+                return self._send(200, {"ok": False, "error": "Bad credentials"})
+            if step == "login":
+                self._session()['logged_in'] = True
+            return self._send(200, {"ok": True})
+        if step == "trains":
+            return self._send(200, {"ok": True, "trains": self.settings.trains})
+        if step == "availability":
+            train = next((t for t in self.settings.trains if t["number"] == body.get("train")), None)
+            cls = next((c for c in train["classes"] if c["code"] == body.get("code")), None) if train else None
+            if not cls:
+                return self._send(200, {"ok": False, "error": "No such train or class"})
+            polls = self._session().setdefault('availability_polls', {})
+            key = f"{train['number']}/{cls['code']}"
+            with self.lock:
+                polls[key] = polls.get(key, 0) + 1
+                count = polls[key]
+            clears_after = self.settings.waitlist_clears_after
+            availability = cls["availability"]
+            if clears_after and count >= clears_after and not availability.startswith("AVAILABLE"):
+                availability = "AVAILABLE-0001"
+            return self._send(200, {"ok": True, "availability": availability})
+        if step == "pay":
+            return self._send(200, {"ok": True, "pnr": "".join(random.choices(string.digits, k=10))})
+        if step == "logout":
+            self._session()['logged_in'] = False
+            return self._send(200, {"ok": True})
+        if step == "master-list":
+            return self._send(200, {"ok": True, "passengers": self._session()['master_list']})
+        if step == "master-list/add":
+            passenger = {k: body.get(k, "") for k in ("name", "age", "gender", "berth")}
+            if not passenger["name"]:
+                return self._send(200, {"ok": False, "error": "Name is required"})
+            self._session()['master_list'].append(passenger)
+            return self._send(200, {"ok": True, "passengers": self._session()['master_list']})
+        if step in ("book", "passengers"):
+            return self._send(200, {"ok": True})
+        self._send(404, {"ok": False, "error": f"unknown step '{step}'"})
+
+def start_mock_server(port=0, settings=None):
+    """Starts the mock site on a background thread. Returns (server, base_url)."""
+    handler = type("ConfiguredMockIRCTCHandler", (MockIRCTCHandler,), {"settings": settings or MockSettings(), "captchas": {}, "sessions": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the IRCTC booking site.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Server delay added to every page transition.")
+    parser.add_argument("--jitter-ms", type=int, default=0, help="Random extra delay on top of --latency-ms.")
+    parser.add_argument("--spinner-ms", type=int, default=0, help="How long the loading spinner stays after a response.")
+    parser.add_argument("--popup-rate", type=float, default=0.0, help="Chance (0-1) of injecting a popup on each page.")
+    parser.add_argument("--captcha-mode", choices=("any", "exact"), default="any")
+    parser.add_argument("--waitlist-clears-after", type=int, default=0,
+                        help="Waitlisted classes turn AVAILABLE after this many availability refreshes (0: never).")
+    args = parser.parse_args()
+
+    settings = MockSettings(args.latency_ms, args.jitter_ms, args.spinner_ms, args.popup_rate, args.captcha_mode,
+                            waitlist_clears_after=args.waitlist_clears_after)
+    server, base_url = start_mock_server(args.port, settings)
+    print(f"[MockIRCTC] Serving on {base_url}/nget/train-search (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ import subprocess
 import pandas as pd
 import glob
 from datetime import date, datetime, timedelta
-from streamlit_autorefresh import st_autorefresh
 
 # Selenium imports are moved into the functions that use them to speed up UI loading.
 
@@ -19,6 +18,16 @@ os.makedirs(SAVE_DIR, exist_ok=True)
 os.makedirs(LOGIN_DIR, exist_ok=True)
 LOGIN_FILE = os.path.join(LOGIN_DIR, "user_credentials.json")
 
+# Streamlit only puts the script's own folder on the path; allow `src.*` imports.
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+@st.cache_resource
+def get_booking_store():
+    """Indexed store of saved bookings and credentials; imports the existing JSON files once."""
+    from src.utils.booking_store import BookingStore
+    return BookingStore(SAVE_DIR, credentials_file=LOGIN_FILE)
+
 # ---------- Styling & Branding ----------
 st.markdown("""
 <style>
@@ -40,18 +49,24 @@ st.markdown("<div class='branding'>IRCTC Tatkal Booking Form</div>", unsafe_allo
 st.markdown("<p style='color: navy; font-weight:bold'>Made by Niladri Ghoshal</p>", unsafe_allow_html=True)
 
 # ---------- Load station list ----------
-with open("src/ui/railwayStationsList.json", "r", encoding="utf-8") as f:
-    stations_data = json.load(f)["stations"]
-
-STATION_OPTIONS = []
-for station in stations_data:
-    code = station['stnCode'].upper()
-    name = station['stnName']
-    display_text = f"{name} ({code})"
-    search_text = f"{code} {name}".lower()
-    STATION_OPTIONS.append({"display": display_text, "search": search_text, "code": code})
-
-STATION_OPTIONS.sort(key=lambda x: x["code"])
+@st.cache_data
+def load_station_options():
+    """Parses the station list once per process instead of on every rerun."""
+    with open("src/ui/railwayStationsList.json", "r", encoding="utf-8") as f:
+        stations_data = json.load(f)["stations"]
+
+    options = []
+    for station in stations_data:
+        code = station['stnCode'].upper()
+        name = station['stnName']
+        display_text = f"{name} ({code})"
+        search_text = f"{code} {name}".lower()
+        options.append({"display": display_text, "search": search_text, "code": code})
+
+    options.sort(key=lambda x: x["code"])
+    return options
+
+STATION_OPTIONS = load_station_options()
 STATION_DISPLAY_OPTIONS = [""] + [s["display"] for s in STATION_OPTIONS]
 
 # ---------- Session defaults ----------
@@ -120,20 +135,19 @@ browser_count = st.sidebar.slider("Browser Count", min_value=1, max_value=25, va
 # ---------- Sidebar: Saved details list with ↪ and 🗑 ----------
 st.sidebar.subheader("Saved Booking Files")
 # Filter out the 'config.json' file from the list of saved files to prevent clutter
-saved_files = sorted([f for f in os.listdir(SAVE_DIR) if f.endswith(".json") and f != "config.json"], reverse=True)
+saved_files = get_booking_store().names()
 with st.sidebar:
     st.markdown('<div class="sidebar-scroll">', unsafe_allow_html=True)
     for sf in saved_files:
         cols = st.columns([0.65, 0.15, 0.2])
         cols[0].markdown(f"<div class='file-name'>{sf}</div>", unsafe_allow_html=True)
         if cols[1].button("↪", key=f"load_{sf}"):
-            with open(os.path.join(SAVE_DIR, sf), "r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            data = get_booking_store().get(sf)
             # store loaded data for next run (so assignment happens before widgets)
             st.session_state["_loaded_data"] = {"data": data, "filename": sf}
             st.rerun()
         if cols[2].button("🗑", key=f"del_{sf}"):
-            os.remove(os.path.join(SAVE_DIR, sf))
+            get_booking_store().delete(sf)
             st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -143,12 +157,10 @@ st.sidebar.subheader("User Credentials")
 # This initialization block now runs ONCE per session, loading the full list of credentials.
 if 'saved_logins' not in st.session_state:
     st.session_state.saved_logins = []
-    if os.path.exists(LOGIN_FILE):
-        try:
-            with open(LOGIN_FILE, "r", encoding="utf-8") as fh:
-                st.session_state.saved_logins = json.load(fh)
-        except Exception as e:
-            st.warning(f"Could not load credentials file: {e}")
+    try:
+        st.session_state.saved_logins = get_booking_store().load_credentials()
+    except Exception as e:
+        st.warning(f"Could not load saved credentials: {e}")
 
 # This block ensures the displayed login fields match the browser count
 # without losing or truncating the underlying data.
@@ -178,50 +190,46 @@ for i in range(browser_count):
         st.session_state.logins[i] = {"username": u, "password": p}
 
 if st.sidebar.button("Save Credentials"):
-    with open(LOGIN_FILE, "w", encoding="utf-8") as fh:
-        json.dump(st.session_state.logins, fh, indent=2, ensure_ascii=False)
+    get_booking_store().save_credentials(st.session_state.logins)
     st.sidebar.success("Saved credentials to saved_logins/user_credentials.json")
 
 # ---------- Selenium for train name ----------
-def init_driver():
-    import undetected_chromedriver as uc
-    options = uc.ChromeOptions()
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    return uc.Chrome(options=options)
-
-if "driver" not in st.session_state:
-    try:
-        st.session_state.driver = init_driver()
-    except Exception:
-        st.session_state.driver = None
+@st.cache_resource
+def get_train_lookup_pool():
+    """
+    One headless browser pool for the whole Streamlit process. Chrome is only
+    started on the first lookup and is quit again after it sits idle.
+    """
+    from src.utils.train_info import SharedDriverPool
+    return SharedDriverPool(idle_timeout=300)
+
+@st.cache_resource
+def get_train_cache():
+    """Disk-backed train name cache, seeded from the bundled sample and saved bookings; other trains are fetched."""
+    from src.utils.train_cache import TrainCache
+    cache = TrainCache()
+    cache.seed_from_bundle()
+    cache.seed_from_saved_details(SAVE_DIR)
+    return cache
 
 def cb_fetch_train_name():
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
+    from src.utils.train_info import lookup_train_name, FETCH_ERROR, TRAIN_NOT_FOUND
+    from src.utils.train_cache import UNRESOLVED_NAME
 
     st.session_state["train_name"] = "" # Reset train name
     tn = st.session_state.get("train_no_input","")
 
-    if not st.session_state.get("driver"):
-        st.error("Browser driver not initialized. Cannot fetch train name.")
-        return
-
     if tn and tn.isdigit():
         try:
-            st.info("Fetching train name...")
-            url = f"https://www.railyatri.in/time-table/{tn}"
-            d = st.session_state.driver
-            d.get(url)
-            heading = WebDriverWait(d, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.timetable_lts_timeline_title__7Patt h1"))
-            )
-            text = heading.text.strip()
-            m = re.match(r"(.+?\(\d+\))", text)
-            st.session_state["train_name"] = (m.group(1).strip() if m else text.replace("Train Time Table","").strip())
+            cache = get_train_cache()
+            if not cache.get_name(tn):
+                st.info("Fetching train name...")
+            name = lookup_train_name(tn, cache=cache, pool=get_train_lookup_pool())
+            if name in (FETCH_ERROR, TRAIN_NOT_FOUND):
+                raise RuntimeError(name)
+            st.session_state["train_name"] = name
         except Exception as e:
-            st.session_state["train_name"] = "Could not fetch name."
+            st.session_state["train_name"] = UNRESOLVED_NAME
             st.error(f"Error fetching train name for {tn}: {e}")
 
 # ---------- Helper callbacks ----------
@@ -451,15 +459,11 @@ with col_save[0]:
                 "saved_at": datetime.now().isoformat(timespec="seconds")
             }
             if st.session_state.get("loaded_file"):
-                out_path = os.path.join(SAVE_DIR, st.session_state.loaded_file)
-                with open(out_path, "w", encoding="utf-8") as fh:
-                    json.dump(booking_data, fh, indent=2, ensure_ascii=False)
+                get_booking_store().save(st.session_state.loaded_file, booking_data)
                 st.success(f"Overwrote {st.session_state.loaded_file}")
             else:
-                filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_booking.json"
-                out_path = os.path.join(SAVE_DIR, filename)
-                with open(out_path, "w", encoding="utf-8") as fh:
-                    json.dump(booking_data, fh, indent=2, ensure_ascii=False)
+                filename = get_booking_store().next_available_name(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_booking.json")
+                get_booking_store().save(filename, booking_data)
                 st.success(f"Saved {filename}")
                 st.session_state.loaded_file = filename
             st.rerun()
@@ -475,7 +479,10 @@ with col_save[2]:
         st.rerun()
 
 # ---------- Start BOT (sidebar) ----------
-if st.sidebar.button("Start BOT", use_container_width=True):
+start_bot = st.sidebar.button("Start BOT", use_container_width=True)
+# A running bot watches config.json, so this updates it in place (passengers, payment, fire offset, more browsers)
+apply_to_running = st.sidebar.button("Apply to Running BOT", use_container_width=True)
+if start_bot or apply_to_running:
     # First, ensure the latest details are saved, so the bot uses the most recent info.
     # This re-uses the validation and save logic from the main "Save" button.
     required_ok = all([
@@ -514,13 +521,26 @@ if st.sidebar.button("Start BOT", use_container_width=True):
             },
             "saved_at": datetime.now().isoformat(timespec="seconds")
         }
+        # Catch a bad class, date or passenger now instead of inside the booking window
+        from src.core.run_config import RunConfig, ConfigError
+        try:
+            RunConfig.from_dict(booking_data)
+        except ConfigError as e:
+            st.sidebar.error("Fix these before starting the bot:\n\n" + "\n".join(f"- {p}" for p in e.problems))
+            st.stop()
+
         # Always save to a consistent 'config.json' for the bot to pick up.
         # This file is ignored by the saved files list to avoid clutter.
         filename = "config.json"
         out_path = os.path.join(SAVE_DIR, filename)
-        with open(out_path, "w", encoding="utf-8") as fh:
+        # Write then rename, so a running bot never reads a half-written file
+        with open(out_path + ".tmp", "w", encoding="utf-8") as fh:
             json.dump(booking_data, fh, indent=2, ensure_ascii=False)
+        os.replace(out_path + ".tmp", out_path)
         st.sidebar.info("Saved current settings to config.json")
+        if apply_to_running:
+            st.sidebar.success("Running bot will pick up the changes within a second.")
+            st.stop()
 
         # --- Launch the bot script as a background process ---
         try:
@@ -541,13 +561,14 @@ if st.sidebar.button("Start BOT", use_container_width=True):
 st.markdown("---")
 st.subheader("Live Bot Status")
 
-# Auto-refresh the page every 3 seconds
-st_autorefresh(interval=3000, limit=None, key="dashboard_refresh")
-
+# Only this fragment re-runs every 3 seconds; the booking form above is left alone
+# so editing passengers during a run does not stutter.
+@st.fragment(run_every=3)
 def display_status_dashboard():
     """
     Scans for bot status files and displays them in a structured, detailed way.
     This function is now designed to parse the new log format which is a list of actions.
+    Runs as a fragment so that a refresh only recomputes the status panel.
     """
     log_files = glob.glob(os.path.join('logs', '*_status.json'))
 
@@ -580,10 +601,18 @@ def display_status_dashboard():
                     last_update_dt = datetime.fromisoformat(last_update_raw)
                     last_update_str = last_update_dt.strftime('%H:%M:%S')
                 except ValueError:
+                    last_update_dt = None
                     last_update_str = "Invalid Time"
 
+                # Session age is stamped on each entry; advance it by the time since that entry
+                delta_str = f"Last Update: {last_update_str}"
+                session_age = latest_log.get('session_age')
+                if session_age is not None and last_update_dt:
+                    session_age += (datetime.now() - last_update_dt).total_seconds()
+                    delta_str += f" · Session: {int(session_age // 60)}m {int(session_age % 60):02d}s"
+
                 # Display the main status card
-                st.metric(label=f"🤖 Browser Instance {instance_id}", value=current_state, delta=f"Last Update: {last_update_str}")
+                st.metric(label=f"🤖 Browser Instance {instance_id}", value=current_state, delta=delta_str)
 
                 # Display the detailed log in an expander
                 with st.expander("Show Detailed Log"):
@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import glob
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_FILENAME = "bookings.sqlite"
+BOT_CONFIG_FILENAME = "config.json"  # Hand-off file for run_bot.py, never listed as a saved booking
+
+class BookingStore:
+    """
+    SQLite index of saved booking files and login credentials for one
+    saved-details folder, kept next to the files as `bookings.sqlite`.
+
+    Bookings are indexed by save time and by (train, date), so the newest
+    booking, the sidebar listing and free file names come from index lookups
+    instead of listing and stat-ing the folder. The JSON files are still
+    written alongside so run_bot.py and older tools can read them.
+
+    On first open the existing JSON files (and, if given, a credentials file)
+    are imported. Each row keeps its file's mtime, and reads compare them with
+    the folder (one directory listing), so files added, edited in place or
+    removed by hand or by older tools are re-imported or dropped. Saved
+    credentials are also written back to that file, which run_batch.py
+    --accounts and older tools read.
+    """
+    def __init__(self, save_dir, credentials_file=None):
+        self.save_dir = save_dir
+        self.credentials_file = credentials_file
+        os.makedirs(save_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(save_dir, DB_FILENAME), check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS bookings ("
+            " name TEXT PRIMARY KEY,"
+            " saved_at TEXT NOT NULL,"
+            " train_no TEXT,"
+            " journey_date TEXT,"
+            " data TEXT NOT NULL,"
+            " file_mtime INTEGER);"
+            "CREATE INDEX IF NOT EXISTS idx_bookings_saved_at ON bookings (saved_at);"
+            "CREATE INDEX IF NOT EXISTS idx_bookings_train_date ON bookings (train_no, journey_date);"
+            "CREATE TABLE IF NOT EXISTS credentials ("
+            " slot INTEGER PRIMARY KEY,"
+            " username TEXT,"
+            " password TEXT);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+        )
+        if "file_mtime" not in {r[1] for r in self._conn.execute("PRAGMA table_info(bookings)")}:
+            self._conn.execute("ALTER TABLE bookings ADD COLUMN file_mtime INTEGER")  # Stores from before per-file sync
+        self._conn.commit()
+        if self._get_meta("migrated_at") is None:
+            self.migrate(credentials_file)
+        else:
+            self.sync()
+
+    # ---------- Bookings ----------
+    def save(self, name, data, write_file=True):
+        """Stores a booking under `name` (its JSON file name), replacing any previous one."""
+        path = os.path.join(self.save_dir, name)
+        if write_file:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=2, ensure_ascii=False)
+        self._store(name, data, self._file_mtime(path))
+        return path
+
+    def _store(self, name, data, file_mtime):
+        saved_at = data.get("saved_at") or datetime.now().isoformat(timespec="seconds")
+        train = data.get("train", {})
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO bookings (name, saved_at, train_no, journey_date, data, file_mtime) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, saved_at, str(train.get("train_no", "")), train.get("date", ""), json.dumps(data, ensure_ascii=False), file_mtime)
+            )
+            self._conn.commit()
+
+    def get(self, name):
+        self.sync()
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM bookings WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, name):
+        with self._lock:
+            self._conn.execute("DELETE FROM bookings WHERE name = ?", (name,))
+            self._conn.commit()
+        try:
+            os.remove(os.path.join(self.save_dir, name))
+        except FileNotFoundError:
+            pass
+
+    def names(self, newest_first=True):
+        order = "DESC" if newest_first else "ASC"
+        self.sync()
+        with self._lock:
+            return [r[0] for r in self._conn.execute(f"SELECT name FROM bookings ORDER BY saved_at {order}, name {order}")]
+
+    def latest(self):
+        """The most recently saved booking, or None."""
+        self.sync()
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM bookings ORDER BY saved_at DESC, name DESC LIMIT 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, train_no, journey_date=None):
+        """Bookings for a train (and optionally a DDMMYYYY date), newest first, as (name, data) pairs."""
+        self.sync()
+        query, args = "SELECT name, data FROM bookings WHERE train_no = ?", [str(train_no)]
+        if journey_date:
+            query += " AND journey_date = ?"
+            args.append(journey_date)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY saved_at DESC", args).fetchall()
+        return [(name, json.loads(data)) for name, data in rows]
+
+    def next_available_name(self, base_name):
+        """`base_name`, or `<stem>_<n><ext>` with the first free n, looked up through the name index."""
+        self.sync()
+        stem, ext = os.path.splitext(base_name)
+        prefix = f"{stem}_"
+        with self._lock:
+            if not self._conn.execute("SELECT 1 FROM bookings WHERE name = ?", (base_name,)).fetchone():
+                return base_name
+            # Range scan over the primary key instead of probing _1, _2, ... one by one
+            taken = {
+                r[0] for r in self._conn.execute(
+                    "SELECT name FROM bookings WHERE name >= ? AND name < ?", (prefix, prefix[:-1] + "`")
+                )
+            }
+        i = 1
+        while f"{prefix}{i}{ext}" in taken:
+            i += 1
+        return f"{prefix}{i}{ext}"
+
+    # ---------- Credentials ----------
+    def load_credentials(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT username, password FROM credentials ORDER BY slot").fetchall()
+        return [{"username": u or "", "password": p or ""} for u, p in rows]
+
+    def save_credentials(self, logins):
+        with self._lock:
+            self._conn.execute("DELETE FROM credentials")
+            self._conn.executemany(
+                "INSERT INTO credentials (slot, username, password) VALUES (?, ?, ?)",
+                [(i, l.get("username", ""), l.get("password", "")) for i, l in enumerate(logins)]
+            )
+            self._conn.commit()
+        if self.credentials_file:
+            if os.path.dirname(self.credentials_file):
+                os.makedirs(os.path.dirname(self.credentials_file), exist_ok=True)
+            with open(self.credentials_file, "w", encoding="utf-8") as fh:
+                json.dump(list(logins), fh, indent=2, ensure_ascii=False)
+
+    # ---------- Migration ----------
+    def migrate(self, credentials_file=None):
+        """
+        Syncs the store with the folder's JSON booking files (see `sync`) and, when
+        the store has no credentials, imports the given credentials file. Returns
+        the number of bookings imported.
+        """
+        imported = self.sync()
+        if credentials_file and os.path.exists(credentials_file) and not self.load_credentials():
+            try:
+                with open(credentials_file, "r", encoding="utf-8") as fh:
+                    self.save_credentials(json.load(fh))
+            except Exception:
+                pass
+        self._set_meta("migrated_at", datetime.now().isoformat(timespec="seconds"))
+        return imported
+
+    def sync(self):
+        """
+        Imports JSON files that are new or whose mtime differs from the one stored
+        with their row, and drops bookings whose file is gone. Returns the number
+        of bookings imported.
+        """
+        files = {}
+        for path in glob.glob(os.path.join(self.save_dir, "*.json")):
+            name = os.path.basename(path)
+            if name != BOT_CONFIG_FILENAME:
+                files[name] = self._file_mtime(path)
+        with self._lock:
+            known = dict(self._conn.execute("SELECT name, file_mtime FROM bookings"))
+        gone = set(known) - set(files)
+        if gone:
+            with self._lock:
+                self._conn.executemany("DELETE FROM bookings WHERE name = ?", [(n,) for n in gone])
+                self._conn.commit()
+        imported = 0
+        for name, mtime in files.items():
+            if mtime is None or known.get(name) == mtime:
+                continue
+            path = os.path.join(self.save_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except Exception:
+                continue  # Half-written or not a booking; retried when its mtime changes
+            if not isinstance(data, dict):
+                continue
+            if not data.get("saved_at"):
+                data["saved_at"] = datetime.fromtimestamp(mtime / 1e9).isoformat(timespec="seconds")
+            self._store(name, data, mtime)
+            imported += 1
+        return imported
+
+    @staticmethod
+    def _file_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+if __name__ == "__main__":
+    # Re-import JSON files dropped into a folder by other tools:
+    #   python -m src.utils.booking_store saved_details [saved_logins/user_credentials.json]
+    store = BookingStore(sys.argv[1])
+    print(f"Imported {store.migrate(sys.argv[2] if len(sys.argv) > 2 else None)} booking file(s) into {os.path.join(sys.argv[1], DB_FILENAME)}")
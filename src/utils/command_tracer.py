@@ -0,0 +1,118 @@
+import json
+import time
+import threading
+from collections import deque, defaultdict
+from contextlib import contextmanager
+
+class CommandTracer:
+    """
+    Records the latency of every WebDriver command a driver issues.
+
+    `install(driver)` wraps `driver.execute`, which every find_element, element
+    call, ActionChains.perform and execute_script goes through, so each HTTP
+    round trip to chromedriver is timed with the command name, selector and the
+    caller's state (from `state_getter`). Compound operations such as a
+    WebDriverWait can be timed with `span()`.
+
+    Results are aggregated per state and can be dumped as a text report or as
+    Chrome trace-event JSON (open in chrome://tracing or Perfetto).
+    """
+    def __init__(self, state_getter=None, process_id=0, max_events=20000):
+        self.state_getter = state_getter
+        self.process_id = process_id
+        self.events = deque(maxlen=max_events)
+        self._stats = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0.0]))  # state -> name -> [count, total, max]
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def install(self, driver):
+        original_execute = driver.execute
+        def traced_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                selector = params.get("value") if isinstance(params, dict) and "using" in params else None
+                self._record(driver_command, selector, start, time.perf_counter(), "command")
+        driver.execute = traced_execute
+        return driver
+
+    @contextmanager
+    def span(self, name, selector=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, selector, start, time.perf_counter(), "span")
+
+    def _current_state(self):
+        if self.state_getter:
+            try:
+                return str(self.state_getter())
+            except Exception: pass
+        return "UNKNOWN"
+
+    def _record(self, name, selector, start, end, kind):
+        state = self._current_state()
+        duration = end - start
+        event = {
+            'name': name, 'selector': selector, 'state': state, 'kind': kind,
+            'thread': threading.current_thread().name, 'tid': threading.get_ident(),
+            'start': start - self._origin, 'duration': duration,
+        }
+        with self._lock:
+            self.events.append(event)
+            stat = self._stats[state][f"{kind}:{name}"]
+            stat[0] += 1
+            stat[1] += duration
+            stat[2] = max(stat[2], duration)
+
+    def summary(self):
+        """Returns {state: {name: {'count', 'total_ms', 'avg_ms', 'max_ms'}}}."""
+        with self._lock:
+            return {
+                state: {
+                    name: {'count': c, 'total_ms': t * 1000, 'avg_ms': t * 1000 / c, 'max_ms': m * 1000}
+                    for name, (c, t, m) in names.items()
+                }
+                for state, names in self._stats.items()
+            }
+
+    def report(self):
+        lines = []
+        summary = self.summary()
+        # Spans wrap commands, so only raw commands count towards a state's total.
+        def command_ms(names):
+            return sum(v['total_ms'] for name, v in names.items() if name.startswith("command:"))
+        for state, names in sorted(summary.items(), key=lambda kv: -command_ms(kv[1])):
+            lines.append(f"{state}: {command_ms(names):.1f} ms in WebDriver commands")
+            for name, v in sorted(names.items(), key=lambda kv: -kv[1]['total_ms']):
+                lines.append(f"    {name:<40} n={v['count']:<5} total={v['total_ms']:9.1f} ms  avg={v['avg_ms']:7.1f} ms  max={v['max_ms']:7.1f} ms")
+        return "\n".join(lines)
+
+    def to_trace_events(self):
+        with self._lock:
+            events = list(self.events)
+        thread_names = {e['tid']: e['thread'] for e in events}
+        trace = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.process_id, 'tid': tid, 'args': {'name': name}}
+            for tid, name in thread_names.items()
+        ]
+        trace.extend(
+            {
+                'name': e['name'], 'cat': e['state'], 'ph': 'X',
+                'ts': e['start'] * 1e6, 'dur': e['duration'] * 1e6,
+                'pid': self.process_id, 'tid': e['tid'],
+                'args': {'selector': e['selector'], 'kind': e['kind']},
+            }
+            for e in events
+        )
+        return {'traceEvents': trace}
+
+    def dump(self, report_path=None, trace_path=None):
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                f.write(self.report())
+        if trace_path:
+            with open(trace_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_trace_events(), f)
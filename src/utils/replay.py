@@ -0,0 +1,123 @@
+"""
+Replays a recorded bot run (see RunRecorder) offline.
+
+    python3 -m src.utils.replay logs/run_20250825_100000_bot_1.zip [--states] [--gpu]
+
+Captchas: every recorded image is solved again with the current OCR code and
+compared with what was recorded. A captcha whose login succeeded is treated as
+ground truth, so accuracy is measured on those.
+
+States (--states): every recorded page snapshot is loaded into a headless
+browser and run through `detect_page_state`, and the detected state is
+compared with the state the bot recorded at that moment.
+"""
+import os
+import sys
+import time
+import base64
+import argparse
+import tempfile
+from src.utils.run_recorder import load_archive
+
+def replay_captchas(events, archive, use_gpu=False):
+    from src.core.ocr_solver import solve_captcha
+    outcomes = {e['captcha_seq']: e['success'] for e in events if e['type'] == 'login_outcome' and e.get('captcha_seq')}
+    rows = []
+    for event in events:
+        if event['type'] != 'captcha' or 'file' not in event:
+            continue
+        ext = os.path.splitext(event['file'])[1].lstrip('.') or 'png'
+        data_uri = f"data:image/{ext};base64," + base64.b64encode(archive.read(event['file'])).decode('ascii')
+        start = time.monotonic()
+        text = solve_captcha(data_uri, use_gpu=use_gpu)
+        rows.append({
+            'seq': event['seq'], 'recorded': event.get('ocr_text'), 'replayed': text,
+            'recorded_seconds': event.get('solve_seconds'), 'replayed_seconds': time.monotonic() - start,
+            'login_success': outcomes.get(event['seq']),
+        })
+    return rows
+
+def replay_states(events, archive):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from src.core.bot import detect_page_state
+    from src.core.webdriver_factory import create_webdriver
+
+    driver = create_webdriver("replay", is_headless=True)
+    if not driver:
+        raise RuntimeError("Could not start a browser for state replay.")
+
+    def is_visible(by, selector):
+        try:
+            WebDriverWait(driver, 0.1).until(EC.visibility_of_element_located((by, selector)))
+            return True
+        except Exception:
+            return False
+
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for event in events:
+                if event['type'] != 'state' or 'file' not in event:
+                    continue
+                path = os.path.join(tmp, os.path.basename(event['file']))
+                with open(path, 'wb') as f:
+                    f.write(archive.read(event['file']))
+                driver.get("file://" + path)
+                start = time.monotonic()
+                detected = detect_page_state(is_visible)
+                rows.append({
+                    'seq': event['seq'], 'recorded': event['state'],
+                    'detected': detected.name if detected else None,
+                    'detect_seconds': time.monotonic() - start,
+                })
+    finally:
+        driver.quit()
+    return rows
+
+def print_captcha_report(rows):
+    if not rows:
+        print("No captcha images in archive.")
+        return
+    known = [r for r in rows if r['login_success']]
+    changed = [r for r in rows if r['replayed'] != r['recorded']]
+    avg = lambda key: sum(r[key] for r in rows if r[key] is not None) / max(1, sum(1 for r in rows if r[key] is not None))
+    print(f"Captchas: {len(rows)} replayed, {len(changed)} read differently than recorded.")
+    if known:
+        correct = sum(1 for r in known if r['replayed'] == r['recorded'])
+        print(f"Accuracy on captchas with a successful login: {correct}/{len(known)} ({100 * correct / len(known):.1f}%)")
+    print(f"OCR latency: recorded avg {avg('recorded_seconds'):.3f}s, replayed avg {avg('replayed_seconds'):.3f}s")
+    for r in changed:
+        print(f"    #{r['seq']}: recorded '{r['recorded']}' -> now '{r['replayed']}' (login success: {r['login_success']})")
+
+def print_state_report(rows):
+    if not rows:
+        print("No page snapshots in archive.")
+        return
+    # Transitional states (e.g. STARTING, RECOVERING) have no page of their own; only compare page states.
+    comparable = [r for r in rows if r['detected'] is not None or r['recorded'] in ('LOGGED_OUT', 'LOGIN_STARTED', 'AT_DASHBOARD')]
+    matched = sum(1 for r in comparable if r['detected'] == r['recorded'])
+    print(f"States: {matched}/{len(comparable)} page snapshots detected as recorded.")
+    for r in comparable:
+        if r['detected'] != r['recorded']:
+            print(f"    #{r['seq']}: recorded {r['recorded']}, detected {r['detected']}")
+    print(f"Detection latency avg {sum(r['detect_seconds'] for r in rows) / len(rows):.3f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded bot run offline.")
+    parser.add_argument("archive")
+    parser.add_argument("--states", action="store_true", help="Also replay page snapshots through state detection (starts a headless browser).")
+    parser.add_argument("--gpu", action="store_true", help="Run OCR on the GPU.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        print(f"Error: archive not found at '{args.archive}'.")
+        sys.exit(1)
+    events, archive = load_archive(args.archive)
+    with archive:
+        print_captcha_report(replay_captchas(events, archive, use_gpu=args.gpu))
+        if args.states:
+            print_state_report(replay_states(events, archive))
+
+if __name__ == "__main__":
+    main()
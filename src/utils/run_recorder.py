@@ -0,0 +1,79 @@
+import io
+import json
+import time
+import base64
+import zipfile
+import threading
+from datetime import datetime
+
+class RunRecorder:
+    """
+    Records a bot run into one compact zip archive for offline replay:
+
+        events.jsonl          one JSON object per captcha, login outcome and state change
+        captchas/NNNN.png     captcha images (decoded from their data URIs)
+        pages/NNNN_STATE.html page HTML at each state transition
+
+    `src/utils/replay.py` feeds an archive back into the OCR and state
+    detection code.
+    """
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        self._zip = zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._events = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+
+    def _next(self):
+        self._seq += 1
+        return self._seq
+
+    def _add(self, event, name=None, data=None):
+        with self._lock:
+            if self._zip is None:
+                return None
+            seq = self._next()
+            event = dict(event, seq=seq, t=time.monotonic() - self._origin, timestamp=datetime.now().isoformat())
+            if name is not None:
+                entry = name.format(seq=seq)
+                self._zip.writestr(entry, data)
+                event['file'] = entry
+            self._events.append(event)
+            return seq
+
+    def record_captcha(self, image_source, solved_text, solve_seconds, context="login"):
+        """Stores a captcha image and what OCR made of it. Returns the captcha's sequence id."""
+        event = {'type': 'captcha', 'context': context, 'ocr_text': solved_text, 'solve_seconds': solve_seconds}
+        if image_source and image_source.lower().startswith("data:image/"):
+            header, b64_data = image_source.split(",", 1)
+            ext = header.split("/", 1)[1].split(";", 1)[0] or "png"
+            return self._add(event, f"captchas/{{seq:04d}}.{ext}", base64.b64decode(b64_data.strip()))
+        return self._add(dict(event, source=image_source))
+
+    def record_login_outcome(self, captcha_seq, success, message=""):
+        self._add({'type': 'login_outcome', 'captcha_seq': captcha_seq, 'success': success, 'message': message})
+
+    def record_state(self, state_name, page_html=None, url=None):
+        event = {'type': 'state', 'state': state_name, 'url': url}
+        if page_html is None:
+            self._add(event)
+        else:
+            self._add(event, f"pages/{{seq:04d}}_{state_name}.html", page_html.encode("utf-8"))
+
+    def close(self):
+        with self._lock:
+            if self._zip is None:
+                return
+            buf = io.StringIO()
+            for event in self._events:
+                buf.write(json.dumps(event) + "\n")
+            self._zip.writestr("events.jsonl", buf.getvalue())
+            self._zip.close()
+            self._zip = None
+
+def load_archive(archive_path):
+    """Returns (events, open ZipFile) for a recorded run."""
+    archive = zipfile.ZipFile(archive_path, "r")
+    events = [json.loads(line) for line in archive.read("events.jsonl").decode("utf-8").splitlines() if line.strip()]
+    return events, archive
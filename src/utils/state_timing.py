@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from collections import defaultdict
+
+HISTORY_FILE = os.path.join("logs", "state_timings.jsonl")
+LOGIN_DONE_STATES = ("LOGIN_SUCCESSFUL", "AT_DASHBOARD")
+
+class StateTimeline:
+    """
+    Opens a timed span (monotonic clock) each time the bot enters a state and
+    closes it on the next transition. `summary()` gives the per-run numbers:
+    time in each state, how often each state was re-entered (retries), time to
+    login and, for timed bookings, when each state was first reached relative
+    to the Tatkal window opening.
+    """
+    def __init__(self, instance_id, run_id=None, window_open=None):
+        self.instance_id = instance_id
+        self.run_id = run_id
+        self.window_open = window_open  # datetime of the booking window, if timed
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self._wall_origin = datetime.now()
+        self.spans = []  # [state, start, end] relative to _origin
+        self._open = None
+
+    def enter(self, state_name):
+        now = time.monotonic() - self._origin
+        with self._lock:
+            if self._open:
+                self._open[2] = now
+            self._open = [state_name, now, None]
+            self.spans.append(self._open)
+
+    def close(self):
+        with self._lock:
+            if self._open and self._open[2] is None:
+                self._open[2] = time.monotonic() - self._origin
+            self._open = None
+
+    def summary(self):
+        with self._lock:
+            spans = [list(s) for s in self.spans]
+        now = time.monotonic() - self._origin
+        time_in_state = defaultdict(float)
+        entries = defaultdict(int)
+        first_entry = {}
+        for state, start, end in spans:
+            time_in_state[state] += (end if end is not None else now) - start
+            entries[state] += 1
+            first_entry.setdefault(state, start)
+
+        start_at = first_entry.get("STARTING", 0.0)
+        login_at = min((first_entry[s] for s in LOGIN_DONE_STATES if s in first_entry), default=None)
+        from_window = {}
+        if self.window_open:
+            window_offset = (self.window_open - self._wall_origin).total_seconds()
+            from_window = {s: t - window_offset for s, t in first_entry.items() if t >= window_offset}
+
+        return {
+            'run_id': self.run_id,
+            'instance_id': self.instance_id,
+            'started_at': self._wall_origin.isoformat(),
+            'time_in_state': dict(time_in_state),
+            'retries': {s: n - 1 for s, n in entries.items() if n > 1},
+            'time_to_login': None if login_at is None else login_at - start_at,
+            'from_window_open': from_window,
+        }
+
+    def append_to_history(self, path=HISTORY_FILE):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.summary()) + "\n")
+
+def load_history(path=HISTORY_FILE, run_id=None):
+    if not os.path.exists(path):
+        return []
+    runs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if run_id is None or run.get('run_id') == run_id:
+                runs.append(run)
+    return runs
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return None
+    k = (len(values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def aggregate(runs):
+    """Combines per-bot summaries into p50/p95 for every metric."""
+    series = defaultdict(list)
+    for run in runs:
+        for state, seconds in run.get('time_in_state', {}).items():
+            series[f"time_in_state.{state}"].append(seconds)
+        for state, count in run.get('retries', {}).items():
+            series[f"retries.{state}"].append(count)
+        for state, seconds in run.get('from_window_open', {}).items():
+            series[f"from_window_open.{state}"].append(seconds)
+        if run.get('time_to_login') is not None:
+            series["time_to_login"].append(run['time_to_login'])
+    return {
+        metric: {'n': len(v), 'p50': _percentile(v, 50), 'p95': _percentile(v, 95), 'max': max(v)}
+        for metric, v in series.items()
+    }
+
+def funnel_report(runs):
+    if not runs:
+        return "No state timings recorded."
+    lines = [f"State timings over {len(runs)} bot run(s):"]
+    for metric, v in sorted(aggregate(runs).items()):
+        lines.append(f"    {metric:<50} n={v['n']:<4} p50={v['p50']:8.2f}  p95={v['p95']:8.2f}  max={v['max']:8.2f}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    import sys
+    print(funnel_report(load_history(run_id=sys.argv[1] if len(sys.argv) > 1 else None)))
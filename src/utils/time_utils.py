@@ -34,3 +34,13 @@ def get_synchronized_target_time(hour, minute, second=0, offset_seconds=0, logge
     if logger: logger.info(f"Server-Local time difference is {time_diff.total_seconds():.3f} seconds.")
     target_local_time = datetime.datetime.now().replace(hour=hour, minute=minute, second=second, microsecond=0) - time_diff + datetime.timedelta(seconds=offset_seconds)
     return target_local_time
+
+def booking_window_open(prefs, day=None):
+    """The local datetime the Tatkal window opens for a timed booking (10:00 AC, 11:00 SL), else None."""
+    if not prefs.get("timed", False):
+        return None
+    hour = 10 if prefs.get("ac", False) else 11 if prefs.get("sl", False) else None
+    if hour is None:
+        return None
+    day = day or datetime.date.today()
+    return datetime.datetime.combine(day, datetime.time(hour=hour))
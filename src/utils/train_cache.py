@@ -0,0 +1,136 @@
+import os
+import json
+import glob
+import time
+import sqlite3
+import threading
+
+CACHE_DIR = "cache"
+DEFAULT_DB_PATH = os.path.join(CACHE_DIR, "train_cache.sqlite")
+BUNDLED_TRAINS_FILE = os.path.join("src", "ui", "trainsList.json")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+# What the UI and train_info store when a lookup fails; never a real train name
+UNRESOLVED_NAME = "Could not fetch name."
+UNRESOLVED_NAMES = (UNRESOLVED_NAME, "Error fetching train name.")
+
+class TrainCache:
+    """
+    Disk-backed cache of train number -> name/route/classes, consulted before
+    any network lookup. Rows live in SQLite; hits are also kept in an in-memory
+    dict so repeat lookups never touch the disk.
+
+    The bundled `src/ui/trainsList.json` is only a seed (the project's sample
+    train), not offline coverage: in practice the cache answers for trains
+    already in saved bookings or looked up before, and everything else goes to
+    the network. Seed rows never expire. Rows taken from saved bookings and
+    fetched rows expire after `ttl` seconds.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH, ttl=DEFAULT_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._memory = {}
+        self._lock = threading.Lock()
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS trains ("
+            " train_no TEXT PRIMARY KEY,"
+            " name TEXT NOT NULL,"
+            " from_code TEXT,"
+            " to_code TEXT,"
+            " classes TEXT,"
+            " expires_at REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, train_no):
+        """Returns a dict for a known, unexpired train or None."""
+        train_no = str(train_no).strip()
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(train_no)
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT name, from_code, to_code, classes, expires_at FROM trains WHERE train_no = ?",
+                    (train_no,)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = {
+                    'train_no': train_no, 'name': row[0], 'from_code': row[1], 'to_code': row[2],
+                    'classes': json.loads(row[3]) if row[3] else [], 'expires_at': row[4]
+                }
+                self._memory[train_no] = entry
+            if entry['expires_at'] is not None and entry['expires_at'] < now:
+                self._memory.pop(train_no, None)
+                return None
+            return entry
+
+    def get_name(self, train_no):
+        entry = self.get(train_no)
+        return entry['name'] if entry else None
+
+    def put(self, train_no, name, from_code=None, to_code=None, classes=None, permanent=False):
+        train_no = str(train_no).strip()
+        expires_at = None if permanent else time.time() + self.ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO trains (train_no, name, from_code, to_code, classes, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (train_no, name, from_code, to_code, json.dumps(classes or []), expires_at)
+            )
+            self._conn.commit()
+            self._memory.pop(train_no, None)
+
+    def seed_from_bundle(self, path=BUNDLED_TRAINS_FILE):
+        """
+        Loads a `{"trains": [...]}` file as permanent rows; by default the bundled
+        seed. Existing rows are kept.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            trains = json.load(f).get("trains", [])
+        rows = [
+            (str(t['trainNo']), t['trainName'], t.get('fromStnCode'), t.get('toStnCode'), json.dumps(t.get('classes', [])), None)
+            for t in trains if t.get('trainNo') and t.get('trainName')
+        ]
+        return self._insert_missing(rows)
+
+    def seed_from_saved_details(self, save_dir):
+        """
+        Picks up train names already resolved in saved booking files. Failed-lookup
+        placeholders are skipped (and dropped if an older version cached them).
+        """
+        expires_at = time.time() + self.ttl
+        rows = []
+        for path in glob.glob(os.path.join(save_dir, "*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    train = json.load(f).get("train", {})
+            except Exception:
+                continue
+            name = str(train.get("train_name") or "").strip()
+            if train.get("train_no") and name and name not in UNRESOLVED_NAMES:
+                rows.append((str(train["train_no"]), name, train.get("from_code"), train.get("to_code"), json.dumps([]), expires_at))
+        with self._lock:
+            self._conn.execute(f"DELETE FROM trains WHERE name IN ({', '.join('?' * len(UNRESOLVED_NAMES))})", UNRESOLVED_NAMES)
+            self._conn.commit()
+            self._memory.clear()
+        return self._insert_missing(rows)
+
+    def _insert_missing(self, rows):
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO trains (train_no, name, from_code, to_code, classes, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,25 +1,216 @@
 import re
-import undetected_chromedriver as uc
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from html.parser import HTMLParser
+import requests
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+FETCH_ERROR = "Error fetching train name."
+TRAIN_NOT_FOUND = "No train with this number."
+TIMETABLE_URL = "https://www.railyatri.in/time-table/{train_no}"
+TITLE_CLASS_PREFIX = "timetable_lts_timeline_title"
+NOT_FOUND_CLASS_PREFIX = "search_no_result"
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
 def init_persistent_driver():
+    import undetected_chromedriver as uc
     options = uc.ChromeOptions()
     options.add_argument("--headless=new")
     options.add_argument("--disable-blink-features=AutomationControlled")
     driver = uc.Chrome(options=options)
     return driver
 
+class SharedDriverPool:
+    """
+    A process-wide, lazily started headless browser for train lookups.
+    The browser is only launched on the first `acquire()`, is shared by every
+    caller (one Streamlit tab or many), and is quit after `idle_timeout` seconds
+    without use or when the process exits.
+    """
+    def __init__(self, factory=init_persistent_driver, idle_timeout=300):
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self._driver = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._closed = False
+        atexit.register(self.shutdown)
+
+    @contextmanager
+    def acquire(self):
+        """Yields the shared driver, starting it if needed. Callers are serialized."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Driver pool has been shut down.")
+            if self._driver is None:
+                self._driver = self.factory()
+                self._start_reaper()
+            try:
+                yield self._driver
+            except Exception:
+                # A crashed browser is dropped so the next caller gets a fresh one.
+                self._quit_driver()
+                raise
+            finally:
+                self._last_used = time.monotonic()
+
+    def _start_reaper(self):
+        if self._reaper and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(target=self._reap_idle, daemon=True)
+        self._reaper.start()
+
+    def _reap_idle(self):
+        while not self._closed:
+            time.sleep(min(self.idle_timeout, 30))
+            with self._lock:
+                if self._driver is None:
+                    return
+                if time.monotonic() - self._last_used >= self.idle_timeout:
+                    self._quit_driver()
+                    return
+
+    def _quit_driver(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception: pass
+            self._driver = None
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            self._quit_driver()
+
+def _clean_train_title(text):
+    text = " ".join(text.split())
+    match = re.match(r"(.+?\(\d+\))", text)
+    return match.group(1).strip() if match else text.replace("Train Time Table", "").strip()
+
+class _TimetableTitleParser(HTMLParser):
+    """Collects the text of the <h1> inside the timetable title div, and notes the site's "no such train" page."""
+    def __init__(self):
+        super().__init__()
+        self._div_depth = 0
+        self._in_h1 = False
+        self.title = None
+        self.not_found = False
+        self._chunks = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.title is not None:
+            return
+        if tag == "div":
+            classes = dict(attrs).get("class") or ""
+            if NOT_FOUND_CLASS_PREFIX in classes:
+                self.not_found = True
+            if self._div_depth:
+                self._div_depth += 1
+            elif TITLE_CLASS_PREFIX in classes:
+                self._div_depth = 1
+        elif tag == "h1" and self._div_depth:
+            self._in_h1 = True
+
+    def handle_endtag(self, tag):
+        if tag == "h1" and self._in_h1:
+            self._in_h1 = False
+            self.title = "".join(self._chunks).strip()
+        elif tag == "div" and self._div_depth:
+            self._div_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_h1:
+            self._chunks.append(data)
+
+def parse_train_name(html):
+    """Extracts the train name from a railyatri timetable page, or None."""
+    parser = _TimetableTitleParser()
+    parser.feed(html)
+    if not parser.title:
+        return None
+    return _clean_train_title(parser.title)
+
+def get_http_session():
+    """A process-wide requests.Session so lookups reuse pooled keep-alive connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(HTTP_HEADERS)
+        return _session
+
+def fetch_train_name_http(train_no: str, base_url=TIMETABLE_URL, timeout=5, session=None):
+    """
+    Plain HTTP fetch + parse. Returns TRAIN_NOT_FOUND when the site says there is
+    no such train, and None when the page can't be fetched or read, so callers
+    can fall back.
+    """
+    session = session or get_http_session()
+    try:
+        response = session.get(base_url.format(train_no=train_no), timeout=timeout)
+        response.raise_for_status()
+        parser = _TimetableTitleParser()
+        parser.feed(response.text)
+    except Exception:
+        return None
+    if parser.title:
+        return _clean_train_title(parser.title)
+    return TRAIN_NOT_FOUND if parser.not_found else None
+
 def fetch_train_name(driver, train_no: str):
-    url = f"https://www.railyatri.in/time-table/{train_no}"
+    """
+    Reads the name from the timetable page in the browser. Returns FETCH_ERROR if the
+    page has no title; browser errors are raised so SharedDriverPool replaces the driver.
+    """
+    url = TIMETABLE_URL.format(train_no=train_no)
     try:
         driver.get(url)
         heading = WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div.timetable_lts_timeline_title__7Patt h1"))
         )
-        text = heading.text.strip()
-        match = re.match(r"(.+?\(\d+\))", text)
-        return match.group(1).strip() if match else text.replace("Train Time Table", "").strip()
+        return _clean_train_title(heading.text.strip())
+    except TimeoutException:
+        return FETCH_ERROR
+    except WebDriverException:
+        raise  # Crashed or disconnected browser
     except Exception:
-        return "Error fetching train name."
+        return FETCH_ERROR
+
+def lookup_train_name(train_no: str, cache=None, pool=None):
+    """
+    Resolves a train name from the cache first, then with a single HTTP request,
+    and only drives the browser (through a SharedDriverPool) when the request fails
+    or its page can't be read. Returns TRAIN_NOT_FOUND straight away when the site
+    says the train does not exist. Successful fetches are cached.
+    """
+    if cache:
+        name = cache.get_name(train_no)
+        if name:
+            return name
+    name = fetch_train_name_http(train_no)
+    if name == TRAIN_NOT_FOUND:
+        return name
+    if not name:
+        if pool is None:
+            return FETCH_ERROR
+        try:
+            with pool.acquire() as driver:
+                name = fetch_train_name(driver, train_no)
+        except WebDriverException:
+            return FETCH_ERROR  # The pool has dropped the broken browser; the next lookup starts a new one
+    if cache and name != FETCH_ERROR:
+        cache.put(train_no, name)
+    return name
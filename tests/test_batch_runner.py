@@ -0,0 +1,99 @@
+import io
+import sys
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import src.core.batch_runner as batch_runner
+from src.core.batch_runner import BatchRunner, ProgressStream
+from src.core.run_config import RunConfig, Account
+from src.core.state import BotState
+import src.utils.logger as logger
+from src.utils.logger import setup_logger
+
+def raw_job(class_code="3A", **prefs):
+    return {
+        "train": {"from_code": "HWH", "to_code": "ADI", "date": (date.today() + timedelta(days=2)).strftime("%d%m%Y"),
+                  "train_no": "12834", "class": class_code, "quota": "TATKAL"},
+        "passengers": [{"name": "Asha Rao", "age": 34, "sex": "Female"}],
+        "preferences": prefs,
+    }
+
+class FakeBot:
+    created = []
+
+    def __init__(self, config, instance_id=0, launch_slot=None, browser_pool=None):
+        self.instance_id = instance_id
+        self.state_listeners = []
+        FakeBot.created.append(self)
+
+@pytest.fixture
+def runner(monkeypatch):
+    FakeBot.created = []
+    monkeypatch.setattr(batch_runner, "IRCTCBot", FakeBot)
+    config = RunConfig.from_dict(raw_job())
+    account = Account("user1", "secret")
+    runner = BatchRunner([("job", config)], browsers=1, accounts=[account], progress=ProgressStream(io.StringIO()))
+    runner._plan()
+    return runner
+
+def test_task_taken_after_job_won_is_dropped(runner):
+    task = runner._next_task()
+    runner.channel.register("job", 99, None, "other")
+    runner.channel.report("job", 99, "BOOKING_CONFIRMED")
+    runner._run_task(task)
+    assert FakeBot.created == []
+    assert runner.busy_accounts == set()
+    assert runner.job_remaining["job"] == 0
+    assert runner.running == {}
+    assert '"bot_dropped"' in runner.progress.out.getvalue()
+
+@pytest.mark.parametrize("class_code, hour", [("3A", 10), ("CC", 10), ("SL", 11), ("2S", 11), ("FC", 11), ("GN", 11)])
+def test_window_defaults_by_class(class_code, hour):
+    raw = raw_job(class_code)
+    config = batch_runner.with_window_defaults(raw, RunConfig.from_dict(raw))
+    assert config.window_open.hour == hour
+
+def test_window_defaults_keep_explicit_choice():
+    raw = raw_job("SL", timed=True, ac=True)
+    config = batch_runner.with_window_defaults(raw, RunConfig.from_dict(raw))
+    assert config.window_open.hour == 10
+
+class ChattyBot(FakeBot):
+    """Logs and prints to the console like a real bot while it runs."""
+    def __init__(self, config, instance_id=0, launch_slot=None, browser_pool=None):
+        super().__init__(config, instance_id, launch_slot, browser_pool)
+        self.outcome = None
+        self.current_state = BotState.BOOKING_FAILED
+
+    def run(self):
+        setup_logger(f"progress_test_{self.instance_id}").info("Opening the login page")
+        print("[WebDriverFactory] Launching Chrome.")
+        for listener in self.state_listeners:
+            listener(self.instance_id, BotState.BOOKING_FAILED)
+
+    def stop(self):
+        pass
+
+def test_progress_lines_stay_json_when_bots_log(monkeypatch, tmp_path):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    monkeypatch.setattr(sys, "stderr", stderr)
+    monkeypatch.setattr(logger, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(batch_runner, "IRCTCBot", ChattyBot)
+    progress = batch_runner.open_progress()
+    runner = BatchRunner([("job", RunConfig.from_dict(raw_job()))], browsers=1, accounts=[Account("user1", "secret")], progress=progress)
+    runner._plan()
+    runner._run_task(runner._next_task())
+    events = [json.loads(line)["event"] for line in stdout.getvalue().splitlines()]
+    assert events == ["job_scheduled", "bot_started", "state", "bot_finished", "job_finished"]
+    assert "Opening the login page" in stderr.getvalue() and "Launching Chrome" in stderr.getvalue()
+
+def test_progress_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(sys, "stdout", io.StringIO())
+    path = tmp_path / "progress.jsonl"
+    progress = batch_runner.open_progress(str(path))
+    progress.emit("batch_finished", jobs={})
+    progress.out.close()
+    assert json.loads(path.read_text())["event"] == "batch_finished"
@@ -0,0 +1,84 @@
+import os
+import json
+
+import pytest
+
+from src.utils.booking_store import BookingStore
+
+LOGINS = [{"username": "user1", "password": "secret1"}, {"username": "user2", "password": "secret2"}]
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "saved_details"
+    folder.mkdir()
+    return folder
+
+def test_saved_credentials_written_to_file(folder, tmp_path):
+    credentials_file = tmp_path / "saved_logins" / "user_credentials.json"
+    store = BookingStore(str(folder), credentials_file=str(credentials_file))
+    store.save_credentials(LOGINS)
+    assert store.load_credentials() == LOGINS
+    assert json.loads(credentials_file.read_text()) == LOGINS
+    store.close()
+
+def test_credentials_file_imported_on_first_open(folder, tmp_path):
+    credentials_file = tmp_path / "user_credentials.json"
+    credentials_file.write_text(json.dumps(LOGINS))
+    store = BookingStore(str(folder), credentials_file=str(credentials_file))
+    assert store.load_credentials() == LOGINS
+    store.close()
+
+def write_booking(folder, name, saved_at, train_no="12834"):
+    (folder / name).write_text(json.dumps({"saved_at": saved_at, "train": {"train_no": train_no, "date": "20102026"}}))
+
+def test_existing_files_imported_on_first_open(folder):
+    write_booking(folder, "a.json", "2026-10-01T10:00:00")
+    (folder / "config.json").write_text("{}")
+    store = BookingStore(str(folder))
+    assert store.names() == ["a.json"]
+    store.close()
+
+def test_files_added_later_are_picked_up(folder):
+    store = BookingStore(str(folder))
+    assert store.names() == []
+    write_booking(folder, "b.json", "2026-10-02T10:00:00")
+    assert store.names() == ["b.json"]
+    assert store.latest()["saved_at"] == "2026-10-02T10:00:00"
+    store.close()
+
+def test_files_removed_by_hand_are_dropped(folder):
+    write_booking(folder, "a.json", "2026-10-01T10:00:00")
+    write_booking(folder, "b.json", "2026-10-02T10:00:00")
+    store = BookingStore(str(folder))
+    (folder / "b.json").unlink()
+    assert store.names() == ["a.json"]
+    store.close()
+
+def test_changes_seen_by_a_new_store(folder):
+    BookingStore(str(folder)).close()
+    write_booking(folder, "c.json", "2026-10-03T10:00:00", train_no="12637")
+    store = BookingStore(str(folder))
+    assert [name for name, _ in store.find("12637")] == ["c.json"]
+    store.close()
+
+def test_next_available_name_sees_new_files(folder):
+    store = BookingStore(str(folder))
+    write_booking(folder, "trip.json", "2026-10-01T10:00:00")
+    assert store.next_available_name("trip.json") == "trip_1.json"
+    store.close()
+
+def test_files_edited_in_place_are_reimported(folder):
+    write_booking(folder, "a.json", "2026-10-01T10:00:00")
+    store = BookingStore(str(folder))
+    assert store.get("a.json")["train"]["train_no"] == "12834"
+    write_booking(folder, "a.json", "2026-10-01T10:00:00", train_no="12637")
+    os.utime(folder / "a.json", ns=(1, 1))  # Same size, new mtime, even on coarse-mtime filesystems
+    assert store.get("a.json")["train"]["train_no"] == "12637"
+    assert [name for name, _ in store.find("12637")] == ["a.json"]
+    store.close()
+
+def test_own_saves_are_not_reimported(folder):
+    store = BookingStore(str(folder))
+    store.save("a.json", {"saved_at": "2026-10-01T10:00:00", "train": {"train_no": "12834"}})
+    assert store.sync() == 0
+    store.close()
@@ -0,0 +1,128 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import src.core.bot as bot_module
+from src.core.bot import IRCTCBot
+from src.core.train_list import is_bookable
+from src.core.state import BotState
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("logs")
+    return IRCTCBot({"account": {"username": "user1", "password": "secret"}, "preferences": {"driver_arbiter": False}})
+
+def test_stop_twice_reports_the_run_once(bot, monkeypatch):
+    appended = []
+    monkeypatch.setattr(bot.timeline, "append_to_history", lambda: appended.append(bot.timeline.summary()))
+    bot.stop()
+    bot.stop()
+    assert len(appended) == 1
+    assert bot.current_state == BotState.STOPPED
+    assert bot.outcome == BotState.INITIALIZED
+
+def test_typing_timings_reported_on_stop(bot, monkeypatch):
+    messages = []
+    monkeypatch.setattr(bot.logger, "info", messages.append)
+    bot.typing_timings = {("username", "chunked"): [0.1, 0.3], ("captcha", "human"): [0.5]}
+    bot.stop()
+    report = [m for m in messages if m.startswith("Typing time")]
+    assert report == ["Typing time per field/strategy: {'captcha/human': '1x, avg 500 ms', 'username/chunked': '2x, avg 200 ms'}"]
+
+class FakeDriver:
+    def __init__(self, url):
+        self.current_url = url
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+
+def test_dashboard_opens_train_search(bot):
+    bot.driver = FakeDriver("https://www.irctc.co.in/nget/profile/dashboard")
+    bot._handle_dashboard_flow()
+    assert bot.driver.visited == [bot.train_search_url]
+
+def test_dashboard_stays_on_train_search(bot):
+    bot.driver = FakeDriver(bot.train_search_url)
+    bot._handle_dashboard_flow()
+    assert bot.driver.visited == []
+    assert bot.action_log[-1]['message'] == "Logged in on the train search page"
+
+def test_waits_for_fire_time(bot):
+    from datetime import datetime, timedelta
+    bot.fire_at = datetime.now() + timedelta(milliseconds=300)
+    assert bot._wait_for_fire_time()
+    assert datetime.now() >= bot.fire_at
+
+def test_fire_wait_ends_on_cancel(bot):
+    import threading
+    from datetime import datetime, timedelta
+    bot.fire_at = datetime.now() + timedelta(seconds=30)
+    threading.Timer(0.2, bot.request_cancel, args=("test",)).start()
+    assert not bot._wait_for_fire_time()
+    assert datetime.now() < bot.fire_at
+
+class FakeThread:
+    def __init__(self, alive):
+        self.name = "worker"
+        self.alive = alive
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return self.alive
+
+class FakePool:
+    def __init__(self):
+        self.released, self.discarded = [], []
+
+    def release(self, slot_id, driver):
+        self.released.append(driver)
+
+    def discard(self, driver):
+        self.discarded.append(driver)
+
+@pytest.mark.parametrize("alive", [False, True])
+def test_pooled_driver_recycled_only_after_threads_exit(bot, alive):
+    driver = FakeDriver(bot.train_search_url)
+    bot.driver, bot.pool_slot, bot.browser_pool = driver, 1, FakePool()
+    bot._threads = [FakeThread(alive)]
+    bot.stop()
+    assert bot.browser_pool.discarded == ([driver] if alive else [])
+    assert bot.browser_pool.released == ([] if alive else [driver])
+
+@pytest.fixture
+def train_list(bot, monkeypatch):
+    """Stubs the train list page: the class shows `availability`; records which booking call ran."""
+    calls = []
+    journey = SimpleNamespace(train_no="12834", class_code="3A", class_selector="td.3A")
+    monkeypatch.setattr(bot, "config", SimpleNamespace(journey=journey))
+    bot.prefs["confirm_only"] = True
+
+    def show(availability, refreshed=None):
+        monkeypatch.setattr(bot, "_read_train_class", lambda j, s: ({"book": "book"}, {"cell": "cell", "availability": availability}))
+        monkeypatch.setattr(bot_module, "select_and_book", lambda d, cell, book: calls.append("select_and_book") or True)
+        def refresh(driver, train_no, class_code, timeout=10, book=True, confirmed_only=False):
+            calls.append(("refresh_availability", confirmed_only))
+            return {"availability": refreshed, "elapsed_ms": 400, "booked": is_bookable(refreshed, confirmed_only), "error": None}
+        monkeypatch.setattr(bot_module, "refresh_availability", refresh)
+    return show, calls
+
+def test_confirm_only_books_available_without_refresh(bot, train_list):
+    show, calls = train_list
+    show("AVAILABLE-0012")
+    bot._handle_train_selection_flow()
+    assert calls == ["select_and_book"]
+
+@pytest.mark.parametrize("availability, refreshed", [("RAC 12", None), ("", "RAC 3")])
+def test_confirm_only_does_not_book_rac(bot, train_list, availability, refreshed):
+    show, calls = train_list
+    show(availability, refreshed)
+    bot._handle_train_selection_flow()
+    assert "select_and_book" not in calls
+    assert calls == ([] if availability else [("refresh_availability", True)])
+    assert "not bookable with confirm_only" in bot.action_log[-1]['message']
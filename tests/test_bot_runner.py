@@ -0,0 +1,112 @@
+import time
+import threading
+from types import SimpleNamespace
+from datetime import date, timedelta
+
+import pytest
+
+import src.core.bot as bot_module
+import src.core.bot_runner as bot_runner
+from src.core.bot import IRCTCBot
+from src.core.bot_runner import BotRunner
+from src.core.run_config import RunConfig
+from src.core.state import BotState
+
+def raw_config(usernames, browser_count):
+    return {
+        "train": {"from_code": "HWH", "to_code": "ADI", "date": (date.today() + timedelta(days=2)).strftime("%d%m%Y"),
+                  "train_no": "12834", "class": "3A", "quota": "TATKAL"},
+        "passengers": [{"name": "Asha Rao", "age": 34, "sex": "Female"}],
+        "logins": [{"username": u, "password": "secret"} for u in usernames],
+        "preferences": {"browser_count": browser_count},
+    }
+
+@pytest.fixture
+def runner(monkeypatch):
+    runner = BotRunner(raw_config(["alice", "bob", "carol"], 2))
+    runner.mode = "thread"
+    launched = []
+
+    def fake_launch(instance_id, credentials, browser_pool=None):
+        runner.launched_ids.add(instance_id)
+        runner.launched_accounts[credentials.username] = instance_id
+        launched.append((instance_id, credentials.username))
+
+    monkeypatch.setattr(runner, "_launch_thread", fake_launch)
+    for instance_id, credentials in runner._instances_to_launch():
+        runner._launch_thread(instance_id, credentials)
+    runner.launched = launched
+    return runner
+
+def test_reordered_logins_do_not_reuse_busy_accounts(runner):
+    runner.reload_config(RunConfig.from_dict(raw_config(["carol", "bob", "alice", "dave"], 3)))
+    assert runner.launched == [(1, "alice"), (2, "bob"), (3, "carol")]
+
+def test_browser_count_caps_extra_bots(runner):
+    runner.reload_config(RunConfig.from_dict(raw_config(["dave", "erin", "alice", "bob"], 3)))
+    assert runner.launched == [(1, "alice"), (2, "bob"), (3, "dave")]
+
+def test_duplicate_login_is_not_launched_twice():
+    runner = BotRunner(raw_config(["alice", "alice", "bob"], 3))
+    assert [(i, c.username) for i, c in runner._instances_to_launch()] == [(1, "alice"), (3, "bob")]
+
+def _scripted_run(bot):
+    """Stands in for IRCTCBot.run in a spawned process: reports readiness and walks to a booking."""
+    for listener in bot.ready_listeners:
+        listener(bot.instance_id, 0.5)
+    booked = isinstance(bot.config, RunConfig) and bot.config.journey.train_no == "12834"
+    for state in (BotState.STARTING, BotState.LOGGED_OUT, BotState.BOOKING_CONFIRMED if booked else BotState.FATAL_ERROR):
+        bot.current_state = state
+
+def scripted_bot_process(*args, **kwargs):
+    """Process target: the real bot entry point, with the browser work scripted."""
+    IRCTCBot.run = _scripted_run
+    bot_runner._run_bot_process(*args, **kwargs)
+
+def test_process_mode_reports_through_the_channel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    monkeypatch.setattr(bot_runner, "_run_bot_process", scripted_bot_process)
+    raw = raw_config(["alice"], 1)
+    raw["preferences"].update(execution_mode="process", driver_arbiter=False)
+    runner = BotRunner(raw)
+    result = runner.start()
+    assert runner.startup_times == {1: 0.5}
+    assert runner.statuses == runner.results == {1: "BOOKING_CONFIRMED"}
+    assert result["booked"]
+    assert result["winner"]["instance_id"] == 1 and result["winner"]["account"] == "alice"
+
+class LaunchRecorder:
+    """A create_webdriver stand-in that records how many browsers start at once."""
+    def __init__(self):
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, instance_id, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.1)
+        with self.lock:
+            self.active -= 1
+        return SimpleNamespace(quit=lambda: None)
+
+def _launch_only_run(bot):
+    """Stands in for IRCTCBot.run: only starts the browser, then ends the run."""
+    bot.driver = bot._launch_driver()
+    bot.current_state = BotState.BOOKING_FAILED
+
+def test_thread_mode_bounds_concurrent_launches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    recorder = LaunchRecorder()
+    monkeypatch.setattr(bot_module, "create_webdriver", recorder)
+    monkeypatch.setattr(IRCTCBot, "run", _launch_only_run)
+    raw = raw_config(["alice", "bob", "carol", "dave", "erin"], 5)
+    raw["preferences"].update(launch_concurrency=2, driver_arbiter=False)
+    runner = BotRunner(raw)
+    runner.start()
+    assert recorder.peak == 2
+    assert sorted(runner.startup_times) == [1, 2, 3, 4, 5]
+    assert all(seconds >= 0.1 for seconds in runner.startup_times.values())
+    assert runner.results == {i: "BOOKING_FAILED" for i in range(1, 6)}
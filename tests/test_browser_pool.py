@@ -0,0 +1,117 @@
+import threading
+import time
+
+from urllib.parse import urlsplit
+
+import pytest
+
+import src.core.browser_pool as browser_pool
+from src.core.browser_pool import BrowserPool
+
+class FakeDriver:
+    def __init__(self, script_delay=0.0):
+        self.quit_called = False
+        self.script_delay = script_delay
+        self.fail_scripts = False
+        self.origin = "http://127.0.0.1"
+        self.storage = {}  # origin -> items left in local/session storage
+        self.visited, self.cdp = [], []
+
+    def get(self, url):
+        self.visited.append(url)
+        self.origin = "{0.scheme}://{0.netloc}".format(urlsplit(url))
+
+    def delete_all_cookies(self):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def execute_script(self, script):
+        if script == browser_pool.CLEAR_STORAGE_SCRIPT:
+            self.storage.pop(self.origin, None)
+            return self.origin
+        time.sleep(self.script_delay)
+        if self.fail_scripts:
+            raise RuntimeError("browser gone")
+        return "complete"
+
+    def quit(self):
+        self.quit_called = True
+
+def started_pool(monkeypatch, size=1, script_delay=0.0, **kwargs):
+    drivers = []
+    def factory(instance_id, **_):
+        assert instance_id.startswith("pool-")
+        drivers.append(FakeDriver(script_delay))
+        return drivers[-1]
+    monkeypatch.setattr(browser_pool, "create_webdriver", factory)
+    pool = BrowserPool(size, warm_url="http://127.0.0.1/", **kwargs)
+    pool.start()
+    return pool, drivers
+
+def test_release_after_shutdown_quits_driver(monkeypatch):
+    pool, drivers = started_pool(monkeypatch)
+    slot_id, driver = pool.acquire(timeout=2)
+    pool.shutdown()
+    driver.quit_called = False
+    pool.release(slot_id, driver)
+    assert driver.quit_called
+    assert pool._idle == []
+
+def test_released_driver_is_reused(monkeypatch):
+    pool, drivers = started_pool(monkeypatch)
+    slot_id, driver = pool.acquire(timeout=2)
+    pool.release(slot_id, driver)
+    assert pool.acquire(timeout=1) == (slot_id, driver)
+    pool.shutdown()
+
+def test_keepalive_check_does_not_block_release(monkeypatch):
+    pool, drivers = started_pool(monkeypatch, size=2, script_delay=0.5, keepalive_interval=0.05)
+    first = pool.acquire(timeout=2)
+    time.sleep(0.15)  # The keep-alive is now inside the slow check of the idle browser
+    start = time.monotonic()
+    pool.release(*first)
+    assert time.monotonic() - start < 0.3
+    pool.shutdown()
+
+def test_acquire_waits_for_browser_being_checked(monkeypatch):
+    pool, drivers = started_pool(monkeypatch, size=1, script_delay=0.3, keepalive_interval=0.05)
+    assert pool.acquire(timeout=2)[1] is drivers[0]
+    pool.release(1, drivers[0])
+    time.sleep(0.1)
+    assert pool.acquire(timeout=2)[1] is drivers[0]
+    pool.shutdown()
+
+def test_stale_browser_is_quit(monkeypatch):
+    pool, drivers = started_pool(monkeypatch, keepalive_interval=0.05)
+    pool.acquire(timeout=2)
+    pool.release(1, drivers[0])
+    drivers[0].fail_scripts = True
+    time.sleep(0.3)
+    assert drivers[0].quit_called
+    assert pool.acquire(timeout=0.2) == (None, None)
+    pool.shutdown()
+
+def test_shared_launch_slot_bounds_pool_launches(monkeypatch):
+    slot = threading.BoundedSemaphore(1)
+    slot.acquire()  # Held elsewhere, e.g. by a bot starting its own browser
+    pool, drivers = started_pool(monkeypatch, size=2, launch_slot=slot)
+    time.sleep(0.1)
+    assert drivers == []
+    slot.release()
+    assert pool.acquire(timeout=2)[1] is not None
+    pool.shutdown()
+
+@pytest.mark.parametrize("last_page", ["http://127.0.0.1/nget/booking", "https://payments.example/upi"])
+def test_release_clears_previous_session(monkeypatch, last_page):
+    pool, drivers = started_pool(monkeypatch)
+    slot_id, driver = pool.acquire(timeout=2)
+    driver.get(last_page)
+    driver.storage["http://127.0.0.1"] = {"token": "user1"}
+    pool.release(slot_id, driver)
+    assert driver.storage == {}
+    assert driver.cdp == [("Network.clearBrowserCookies", {}),
+                          ("Storage.clearDataForOrigin", {"origin": "http://127.0.0.1", "storageTypes": "all"})]
+    assert driver.visited[-1] == "http://127.0.0.1/"
+    pool.shutdown()
@@ -0,0 +1,33 @@
+import pytest
+
+from src.core.driver_arbiter import DriverArbiter
+
+def test_outside_critical_section_releases_and_restores():
+    arbiter = DriverArbiter()
+    with arbiter.critical_section():
+        with arbiter.outside_critical_section():
+            assert arbiter._critical_sections == 0
+        assert arbiter._critical_sections == 1
+    assert arbiter._critical_sections == 0
+
+def test_outside_without_critical_section_keeps_count():
+    arbiter = DriverArbiter()
+    with arbiter.outside_critical_section():
+        assert arbiter._critical_sections == 0
+        with arbiter.critical_section():  # e.g. another booking action starts meanwhile
+            assert arbiter._critical_sections == 1
+    assert arbiter._critical_sections == 0
+
+def test_doubled_exit_is_refused():
+    arbiter = DriverArbiter()
+    with arbiter.critical_section():
+        with arbiter.outside_critical_section():
+            with arbiter.outside_critical_section():  # Nothing left to release
+                assert arbiter._critical_sections == 0
+    assert arbiter._critical_sections == 0
+
+def test_unbalanced_exit_raises():
+    arbiter = DriverArbiter()
+    with pytest.raises(AssertionError):
+        arbiter._leave_critical_section()
+    assert arbiter._critical_sections == 0
@@ -0,0 +1,28 @@
+from src.core.form_filler import verify_passenger_form
+
+WANTED = [{"name": "Asha Rao", "age": 34, "sex": "Male", "berth": "Lower", "nationality": "Indian"}]
+
+def read_back(**row):
+    base = {"name": "Asha Rao", "age": "34", "sex": "Male", "berth": "LOWER", "nationality": "India"}
+    base.update(row)
+    return {"rows": [base], "mobile": "9876543210"}
+
+def test_matching_form_verifies():
+    assert verify_passenger_form(read_back(), WANTED, "9876543210") == []
+
+def test_female_is_not_male():
+    assert verify_passenger_form(read_back(sex="Female"), WANTED, "9876543210") == ["passenger 1 gender is 'Female'"]
+
+def test_side_lower_is_not_lower():
+    assert verify_passenger_form(read_back(berth="Side Lower"), WANTED, "9876543210") == ["passenger 1 berth is 'Side Lower'"]
+
+def test_nationality_checked():
+    problems = verify_passenger_form(read_back(nationality="Nepal"), WANTED, "9876543210")
+    assert problems == ["passenger 1 nationality is 'Nepal'"]
+
+def test_missing_nationality_dropdown_not_reported():
+    assert verify_passenger_form(read_back(nationality=None), WANTED, "9876543210") == []
+
+def test_name_age_and_mobile_mismatches():
+    problems = verify_passenger_form(read_back(name="Asha", age="43"), WANTED, "9876500000")
+    assert problems == ["passenger 1 name is 'Asha'", "passenger 1 age is '43'", "mobile is '9876543210'"]
@@ -0,0 +1,39 @@
+import pytest
+
+from src.core.input_strategies import TypingConfig, type_text
+
+def test_field_setting_beats_state_beats_default():
+    typing = TypingConfig.from_preferences({"typing": {
+        "default": "single", "states": {"LOGIN_STARTED": "chunked"}, "fields": {"captcha": "js"}}})
+    assert typing.strategy_for("captcha", "LOGIN_STARTED") == "js"
+    assert typing.strategy_for("username", "LOGIN_STARTED") == "chunked"
+    assert typing.strategy_for("username", "AT_DASHBOARD") == "single"
+
+def test_defaults_without_preferences():
+    typing = TypingConfig.from_preferences({})
+    assert typing.strategy_for("password", "LOGIN_STARTED") == "human"
+    assert typing.chunk_size == 4
+
+class FakeElement:
+    def __init__(self):
+        self.sent = []
+
+    def click(self):
+        pass
+
+    def clear(self):
+        pass
+
+    def send_keys(self, text):
+        self.sent.append(text)
+
+@pytest.mark.parametrize("chunk_size, sent", [(4, ["ABCD", "EF"]), (1, list("ABCDEF")), (10, ["ABCDEF"])])
+def test_chunked_typing_respects_chunk_size(chunk_size, sent):
+    element = FakeElement()
+    type_text(None, element, "ABCDEF", "chunked", chunk_size)
+    assert element.sent == sent
+
+def test_single_typing_sends_once():
+    element = FakeElement()
+    type_text(None, element, "ABCDEF", "single")
+    assert element.sent == ["ABCDEF"]
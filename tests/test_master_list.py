@@ -0,0 +1,91 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from src.core.master_list import ADD_MASTER_SCRIPT, MASTER_SELECTORS, register_master_passengers
+from src.mock_site.server import start_mock_server, MockSettings
+
+PASSENGER = {"name": "Asha Rao", "age": 34, "sex": "Female", "berth": "Lower"}
+
+# Just enough DOM for ADD_MASTER_SCRIPT: inputs, the two <select>s of the mock
+# master list form and a submit button that records the click.
+NODE_DOM = r"""
+class HTMLInputElement { get value() { return this._value || ''; } set value(v) { this._value = v; } }
+class HTMLSelectElement { get value() { return this._value || ''; } set value(v) { this._value = v; } }
+class Event { constructor(type) { this.type = type; } }
+function element(proto, tagName, extra) {
+    var el = Object.assign(Object.create(proto), {tagName: tagName, dispatchEvent: function () {},
+                                                  querySelector: function () { return null; }, click: function () {}}, extra);
+    return el;
+}
+function select(options) {
+    return element(HTMLSelectElement.prototype, 'SELECT', {selectedIndex: 0, options: options.map(function (o) {
+        return {value: o[0], text: o[1]};
+    })});
+}
+var submitted = false;
+var elements = {
+    name: element(HTMLInputElement.prototype, 'INPUT'), age: element(HTMLInputElement.prototype, 'INPUT'),
+    gender: select([['', 'Gender'], ['M', 'Male'], ['F', 'Female'], ['T', 'Transgender']]),
+    berth: select([['', 'No Preference'], ['LB', 'LOWER'], ['MB', 'MIDDLE'], ['UB', 'UPPER']]),
+    submit: element(HTMLInputElement.prototype, 'BUTTON', {click: function () { submitted = true; }})
+};
+var sel = JSON.parse(process.argv[1]);
+var document = {
+    querySelector: function (s) { return Object.keys(sel).filter(function (k) { return sel[k] === s; }).map(function (k) { return elements[k]; })[0] || null; },
+    querySelectorAll: function () { return []; }
+};
+var result = (function () { %s }).apply(null, JSON.parse(process.argv[2]));
+console.log(JSON.stringify({result: result, submitted: submitted, gender: elements.gender.value, berth: elements.berth.value}));
+"""
+
+def run_add_master(passenger):
+    node = shutil.which("node")
+    if not node:
+        pytest.skip("node is not installed")
+    script = NODE_DOM % ADD_MASTER_SCRIPT
+    out = subprocess.run([node, "-e", script, json.dumps(MASTER_SELECTORS), json.dumps([MASTER_SELECTORS, passenger])],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+def test_add_master_sets_select_elements():
+    out = run_add_master(PASSENGER)
+    assert out == {"result": {"missing": []}, "submitted": True, "gender": "F", "berth": "LB"}
+
+def test_add_master_reports_unset_fields_without_submitting():
+    out = run_add_master(dict(PASSENGER, sex="Other", berth="Side Lower"))
+    assert out["result"] == {"missing": ["gender", "berth"]}
+    assert not out["submitted"]
+
+@pytest.fixture
+def chrome():
+    webdriver = pytest.importorskip("selenium.webdriver")
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        pytest.skip(f"Chrome is not available: {e}")
+    yield driver
+    driver.quit()
+
+def test_register_master_passengers_on_mock_site(chrome):
+    server, base_url = start_mock_server(0, MockSettings())
+    try:
+        chrome.get(base_url)
+        chrome.execute_async_script("""
+            var done = arguments[arguments.length - 1];
+            var post = function (step, body) {
+                return fetch('/api/' + step, {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(body)});
+            };
+            post('captcha', {}).then(function () { return post('login', {userid: 'user1', captcha: 'x'}); }).then(function () { done(); });
+        """)
+        assert register_master_passengers(chrome, base_url, [PASSENGER]) == ["Asha Rao"]
+        (session,) = server.RequestHandlerClass.sessions.values()
+        assert session["master_list"] == [{"name": "Asha Rao", "age": "34", "gender": "Female", "berth": "LOWER"}]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,60 @@
+import json
+import urllib.request
+
+import pytest
+
+from src.mock_site.server import start_mock_server, MockSettings
+
+@pytest.fixture
+def mock_site():
+    server, base_url = start_mock_server(0, MockSettings(captcha_mode="exact", waitlist_clears_after=2))
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+class Browser:
+    """Just enough of a browser: keeps the session cookie between calls."""
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.cookie = None
+
+    def post(self, step, body=None):
+        request = urllib.request.Request(self.base_url + "/api/" + step, data=json.dumps(body or {}).encode(),
+                                         headers={"Content-Type": "application/json"})
+        if self.cookie:
+            request.add_header("Cookie", self.cookie)
+        with urllib.request.urlopen(request) as response:
+            if response.headers.get("Set-Cookie"):
+                self.cookie = response.headers["Set-Cookie"].split(";", 1)[0]
+            return json.load(response)
+
+def test_exact_captchas_are_per_browser(mock_site):
+    server, base_url = mock_site
+    first, second = Browser(base_url), Browser(base_url)
+    first.post("captcha")
+    second.post("captcha")
+    assert first.cookie and second.cookie and first.cookie != second.cookie
+    captchas = server.RequestHandlerClass.captchas
+    answer = captchas[first.cookie.split("=", 1)[1]]
+    assert first.post("login", {"userid": "user1", "captcha": answer})["ok"]
+    assert captchas[second.cookie.split("=", 1)[1]] != answer
+    assert not second.post("login", {"userid": "user2", "captcha": answer})["ok"]
+
+def test_login_state_is_per_browser(mock_site):
+    server, base_url = mock_site
+    first, second = Browser(base_url), Browser(base_url)
+    first.post("captcha")
+    second.post("captcha")
+    answer = server.RequestHandlerClass.captchas[first.cookie.split("=", 1)[1]]
+    first.post("login", {"userid": "user1", "captcha": answer})
+    sessions = server.RequestHandlerClass.sessions
+    assert sessions[first.cookie.split("=", 1)[1]]["logged_in"]
+    assert not sessions.get(second.cookie.split("=", 1)[1], {}).get("logged_in")
+
+def test_availability_refreshes_counted_per_browser(mock_site):
+    _, base_url = mock_site
+    first, second = Browser(base_url), Browser(base_url)
+    wanted = {"train": "12834", "code": "2A"}
+    assert first.post("availability", wanted)["availability"] == "WL 3"
+    assert second.post("availability", wanted)["availability"] == "WL 3"
+    assert first.post("availability", wanted)["availability"] == "AVAILABLE-0001"
@@ -0,0 +1,31 @@
+import pytest
+
+from src.core.run_config import RunConfig, ConfigError
+
+def config_with_typing(typing):
+    return {"preferences": {"typing": typing}}
+
+@pytest.mark.parametrize("typing", [
+    {"default": "chunked", "chunk_size": 2, "fields": {"captcha": "single"}, "states": {"LOGIN_STARTED": "js"}},
+    {"default": "human"},
+    {},
+])
+def test_valid_typing_preferences(typing):
+    config = RunConfig.from_dict(config_with_typing(typing), strict=False)
+    assert config.preferences["typing"] == typing
+
+@pytest.mark.parametrize("typing, problem", [
+    ({"default": "fast"}, "preferences.typing.default 'fast'"),
+    ({"fields": {"password": "paste"}}, "preferences.typing.fields.password 'paste'"),
+    ({"states": {"LOGIN_STARTED": "slow"}}, "preferences.typing.states.LOGIN_STARTED 'slow'"),
+    ({"states": {"LOGGING_IN": "js"}}, "preferences.typing.states.LOGGING_IN is not a bot state"),
+    ({"chunk_size": 0}, "preferences.typing.chunk_size '0'"),
+    ({"chunk_size": -3}, "preferences.typing.chunk_size '-3'"),
+    ({"chunk_size": "big"}, "preferences.typing.chunk_size 'big'"),
+    ({"delay": 5}, "preferences.typing.delay is not one of"),
+    ("js", "preferences.typing 'js' is not a settings object"),
+])
+def test_invalid_typing_preferences_rejected(typing, problem):
+    with pytest.raises(ConfigError) as error:
+        RunConfig.from_dict(config_with_typing(typing), strict=False)
+    assert any(p.startswith(problem) for p in error.value.problems)
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.core.session_manager import SessionKeeper
+
+WINDOW = datetime(2026, 10, 20, 10, 0, 0)
+
+def logged_in_keeper(at, **kwargs):
+    keeper = SessionKeeper(window_open=WINDOW, **kwargs)
+    keeper.on_state("AT_DASHBOARD", now=at)
+    return keeper
+
+def test_keepalive_after_interval_before_window():
+    start = WINDOW - timedelta(minutes=30)
+    keeper = logged_in_keeper(start, keepalive_interval=120)
+    assert keeper.next_action(now=start + timedelta(seconds=60)) is None
+    assert keeper.next_action(now=start + timedelta(seconds=120)) == 'keepalive'
+
+def test_pre_window_touch_once():
+    keeper = logged_in_keeper(WINDOW - timedelta(seconds=60), pre_window_touch=45)
+    assert keeper.next_action(now=WINDOW - timedelta(seconds=40)) == 'keepalive'
+    assert keeper.next_action(now=WINDOW - timedelta(seconds=39)) is None
+
+def test_nothing_once_window_opens():
+    keeper = logged_in_keeper(WINDOW - timedelta(minutes=30), keepalive_interval=120)
+    assert keeper.next_action(now=WINDOW) is None
+    assert keeper.next_action(now=WINDOW + timedelta(minutes=5)) is None
+
+def test_relogin_when_session_would_expire_in_window():
+    keeper = logged_in_keeper(WINDOW - timedelta(minutes=50), max_session_age=3500, relogin_lead=180)
+    assert keeper.next_action(now=WINDOW - timedelta(seconds=170)) == 'relogin'
+    assert keeper.expected_logout
+    assert keeper.on_state("LOGGED_OUT", now=WINDOW - timedelta(seconds=160)) is None
+
+def test_unexpected_logout_shortens_idle_timeout():
+    start = WINDOW - timedelta(hours=2)
+    keeper = logged_in_keeper(start, keepalive_interval=120, idle_timeout=900)
+    message = keeper.on_state("LOGGED_OUT", now=start + timedelta(seconds=600))
+    assert message
+    assert keeper.idle_timeout == 600
+    assert keeper.keepalive_interval == 120
+
+def test_repeated_state_does_not_count_as_activity():
+    start = WINDOW - timedelta(hours=1)
+    keeper = logged_in_keeper(start)
+    keeper.on_state("AT_DASHBOARD", now=start + timedelta(seconds=100))
+    assert keeper.last_activity_at == start
+
+def test_window_callable_is_asked_every_tick():
+    start = WINDOW - timedelta(minutes=30)
+    window = []
+    keeper = SessionKeeper(window_open=lambda: window[0] if window else None, keepalive_interval=120)
+    keeper.on_state("AT_DASHBOARD", now=start)
+    assert keeper.next_action(now=WINDOW + timedelta(minutes=1)) == 'keepalive'
+    window.append(WINDOW)  # e.g. a booking saved after the keeper started
+    assert keeper.next_action(now=WINDOW + timedelta(minutes=1)) is None
+
+def test_login_helper_uses_the_booking_window(monkeypatch):
+    login = pytest.importorskip("Automation.login")
+    helper = login.IRCTCLogin.__new__(login.IRCTCLogin)
+    monkeypatch.setattr(helper, "get_latest_json", lambda: {
+        "train": {"date": "21102026"}, "preferences": {"timed": True, "ac": True}})
+    assert helper._booking_window_open() == WINDOW
@@ -0,0 +1,47 @@
+import json
+import time
+
+import pytest
+
+from src.utils.train_cache import TrainCache, UNRESOLVED_NAME
+
+def save_booking(folder, name, train_no, train_name):
+    (folder / name).write_text(json.dumps({"train": {"train_no": train_no, "train_name": train_name}}))
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TrainCache(str(tmp_path / "trains.sqlite"), ttl=60)
+    yield cache
+    cache.close()
+
+def test_saved_names_are_seeded_with_ttl(cache, tmp_path):
+    saved = tmp_path / "saved"
+    saved.mkdir()
+    save_booking(saved, "a.json", "12834", "HWH ADI SF Express (12834)")
+    assert cache.seed_from_saved_details(str(saved)) == 1
+    entry = cache.get("12834")
+    assert entry["name"] == "HWH ADI SF Express (12834)"
+    assert time.time() < entry["expires_at"] <= time.time() + 60
+
+def test_placeholder_names_are_not_seeded(cache, tmp_path):
+    saved = tmp_path / "saved"
+    saved.mkdir()
+    save_booking(saved, "a.json", "12834", UNRESOLVED_NAME)
+    save_booking(saved, "b.json", "12637", "Error fetching train name.")
+    save_booking(saved, "c.json", "12301", "  ")
+    assert cache.seed_from_saved_details(str(saved)) == 0
+    assert cache.get("12834") is None
+
+def test_placeholder_cached_earlier_is_dropped(cache, tmp_path):
+    cache.put("12834", UNRESOLVED_NAME, permanent=True)
+    saved = tmp_path / "saved"
+    saved.mkdir()
+    cache.seed_from_saved_details(str(saved))
+    assert cache.get("12834") is None
+
+def test_fetched_names_expire(cache):
+    cache.put("12834", "HWH ADI SF Express (12834)")
+    cache.ttl = -1
+    cache.put("12637", "Pandian Express (12637)")
+    assert cache.get_name("12834")
+    assert cache.get_name("12637") is None
@@ -0,0 +1,112 @@
+import os
+import threading
+from contextlib import contextmanager
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import src.utils.train_info as train_info
+from src.utils.train_info import parse_train_name, fetch_train_name_http, lookup_train_name, TRAIN_NOT_FOUND, FETCH_ERROR, SharedDriverPool
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Served at /time-table/<train_no>; any other train number is a 404
+PAGES = {"12834": "timetable_12834.html", "99999": "timetable_not_found.html", "55555": "timetable_blocked.html"}
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+class TimetableHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        page = PAGES.get(self.path.rsplit("/", 1)[-1])
+        body = fixture(page).encode("utf-8") if page else b"Not Found"
+        self.send_response(200 if page else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture(scope="module")
+def timetable_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TimetableHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/time-table/{{train_no}}"
+    server.shutdown()
+    server.server_close()
+
+def test_parse_train_name():
+    assert parse_train_name(fixture("timetable_12834.html")) == "HWH ADI SF Express (12834)"
+
+def test_parse_train_name_not_found_page():
+    assert parse_train_name(fixture("timetable_not_found.html")) is None
+
+def test_fetch_train_name_http(timetable_url):
+    assert fetch_train_name_http("12834", base_url=timetable_url) == "HWH ADI SF Express (12834)"
+
+def test_fetch_train_name_http_not_found_page(timetable_url):
+    assert fetch_train_name_http("99999", base_url=timetable_url) == TRAIN_NOT_FOUND
+
+def test_fetch_train_name_http_unreadable_page(timetable_url):
+    assert fetch_train_name_http("55555", base_url=timetable_url) is None
+
+def test_fetch_train_name_http_404(timetable_url):
+    assert fetch_train_name_http("11111", base_url=timetable_url) is None
+
+class FakePool:
+    """Stands in for SharedDriverPool; its browser always finds the name."""
+    def __init__(self):
+        self.acquired = 0
+
+    @contextmanager
+    def acquire(self):
+        self.acquired += 1
+        yield None
+
+@pytest.fixture
+def lookup(timetable_url, monkeypatch):
+    monkeypatch.setattr(train_info, "fetch_train_name_http", partial(fetch_train_name_http, base_url=timetable_url))
+    monkeypatch.setattr(train_info, "fetch_train_name", lambda driver, train_no: "FROM BROWSER")
+    pool = FakePool()
+    return lambda train_no: lookup_train_name(train_no, pool=pool), pool
+
+@pytest.mark.parametrize("train_no, name, browser_used", [
+    ("12834", "HWH ADI SF Express (12834)", False),
+    ("99999", TRAIN_NOT_FOUND, False),
+    ("55555", "FROM BROWSER", True),
+    ("11111", "FROM BROWSER", True),
+])
+def test_lookup_uses_browser_only_when_http_fails(lookup, train_no, name, browser_used):
+    fetch, pool = lookup
+    assert fetch(train_no) == name
+    assert pool.acquired == int(browser_used)
+
+def test_lookup_without_pool_reports_fetch_error(timetable_url, monkeypatch):
+    monkeypatch.setattr(train_info, "fetch_train_name_http", partial(fetch_train_name_http, base_url=timetable_url))
+    assert lookup_train_name("55555") == FETCH_ERROR
+
+class CrashedDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def get(self, url):
+        raise WebDriverException("chrome not reachable")
+
+    def quit(self):
+        self.quit_called = True
+
+def test_crashed_browser_is_replaced(monkeypatch):
+    monkeypatch.setattr(train_info, "fetch_train_name_http", lambda train_no: None)
+    drivers = []
+    pool = SharedDriverPool(factory=lambda: drivers.append(CrashedDriver()) or drivers[-1], idle_timeout=300)
+    try:
+        assert lookup_train_name("12834", pool=pool) == FETCH_ERROR
+        assert lookup_train_name("12834", pool=pool) == FETCH_ERROR
+        assert len(drivers) == 2
+        assert drivers[0].quit_called
+    finally:
+        pool.shutdown()
@@ -0,0 +1,78 @@
+import pytest
+
+from src.core.train_list import is_bookable, AvailabilityPoller
+
+@pytest.mark.parametrize("status", [
+    "AVAILABLE-0042", "AVAILABLE 12", "available-0001", "AVL 5", "CURR_AVBL-0012", "RAC 12", "RAC12", " AVAILABLE-0001",
+])
+def test_bookable_statuses(status):
+    assert is_bookable(status)
+
+@pytest.mark.parametrize("status", [
+    "NOT AVAILABLE", "REGRET/WL", "REGRET", "WL 3", "GNWL12/WL5", "RLWL 4", "PQWL 2", "TQWL 9",
+    "TRAIN DEPARTED", "RACE", "", None,
+])
+def test_not_bookable_statuses(status):
+    assert not is_bookable(status)
+
+def poller(**overrides):
+    settings = dict(min_interval=0.5, max_interval=5.0, load_factor=2.0, max_backoff=30.0, request_timeout=10.0, timeout=900.0)
+    settings.update(overrides)
+    return AvailabilityPoller(**settings)
+
+def test_poller_off_without_preference():
+    assert AvailabilityPoller.from_preferences({}) is None
+    assert AvailabilityPoller.from_preferences({"poll_availability": False}) is None
+
+def test_poller_preferences_override_defaults():
+    p = AvailabilityPoller.from_preferences({"poll_availability": {"min_interval": 1, "timeout": 60}})
+    assert p.min_interval == 1.0
+    assert p.timeout == 60.0
+    assert p.max_interval == 5.0
+
+def test_delay_starts_at_min_interval():
+    assert poller().next_delay() == 0.5
+
+def test_delay_follows_smoothed_response_time():
+    p = poller(smoothing=0.5)
+    p.record(1.0, True)
+    assert p.next_delay() == pytest.approx(2.0)
+    p.record(2.0, True)
+    assert p.response_time == pytest.approx(1.5)
+    assert p.next_delay() == pytest.approx(3.0)
+
+def test_delay_clamped_to_bounds():
+    p = poller()
+    p.record(0.01, True)
+    assert p.next_delay() == 0.5
+    p = poller()
+    p.record(60, True)
+    assert p.next_delay() == 5.0
+
+def test_errors_back_off_and_reset():
+    p = poller()
+    p.record(1.0, True)
+    delays = []
+    for _ in range(3):
+        p.record(10, False)
+        delays.append(p.next_delay())
+    assert p.errors == 3
+    assert p.response_time == 1.0  # failed refreshes don't feed the average
+    for n, delay in enumerate(delays, start=1):
+        assert 2.0 * 2 ** n * 0.8 <= delay <= 2.0 * 2 ** n * 1.2
+    for _ in range(10):
+        p.record(10, False)
+    assert p.next_delay() <= 30.0
+    p.record(1.0, True)
+    assert p.errors == 0
+    assert p.next_delay() == pytest.approx(2.0)
+
+def test_polls_counted():
+    p = poller()
+    p.record(0.2, True)
+    p.record(0.2, False)
+    assert p.polls == 2
+
+@pytest.mark.parametrize("status, bookable", [("AVAILABLE-0042", True), ("CURR_AVBL-0012", True), ("RAC 12", False), ("WL 3", False)])
+def test_confirmed_only_statuses(status, bookable):
+    assert is_bookable(status, confirmed_only=True) is bookable
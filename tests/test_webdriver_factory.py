@@ -0,0 +1,23 @@
+from fnmatch import fnmatch
+
+from src.config import DEFAULT_BLOCKING_PROFILE
+from src.core.webdriver_factory import build_blocked_urls, driver_kwargs_from_preferences
+
+def test_resource_types_expand_to_patterns():
+    blocked = build_blocked_urls({"url_patterns": ["*ads*"], "resource_types": ["font"]})
+    assert blocked[0] == "*ads*"
+    assert "*.woff2*" in blocked
+
+def test_duplicates_removed():
+    assert build_blocked_urls({"url_patterns": ["*.css*"], "resource_types": ["stylesheet"]}) == ["*.css*"]
+
+def test_default_profile_leaves_captcha_images_reachable():
+    blocked = build_blocked_urls(DEFAULT_BLOCKING_PROFILE)
+    for url in ("https://www.irctc.co.in/eticketing/captcha.png", "https://www.irctc.co.in/nget/assets/captcha.jpg"):
+        assert not any(fnmatch(url, pattern) for pattern in blocked)
+
+def test_blocking_only_when_asked():
+    assert driver_kwargs_from_preferences({})["blocking_profile"] is None
+    profile = driver_kwargs_from_preferences({"block_resources": True, "blocking_profile": {"resource_types": []}})["blocking_profile"]
+    assert profile["resource_types"] == []
+    assert profile["url_patterns"] == DEFAULT_BLOCKING_PROFILE["url_patterns"]